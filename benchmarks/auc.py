@@ -0,0 +1,91 @@
+import time
+
+import fire
+import numpy as np
+from scipy.sparse import csr_matrix, random as sparse_random
+import torch
+
+from collie_recs.metrics import auc
+
+
+def _previous_auc(targets, user_ids, preds) -> float:
+    """The previous implementation of ``auc``, calling ``torchmetrics`` once for each user."""
+    from torchmetrics.functional import auroc
+
+    agg = 0
+    for i, user_id in enumerate(user_ids):
+        target_tensor = torch.tensor(
+            targets[user_id].toarray(),
+            device=preds.device,
+            dtype=torch.long
+        ).view(-1)
+        agg += auroc(torch.sigmoid(preds[i, :]), target=target_tensor, pos_label=1)
+
+    return (agg/len(user_ids)).item()
+
+
+def run_auc_benchmark(n_users: int = 100_000,
+                      n_items: int = 1_000,
+                      density: float = 0.01,
+                      batch_size: int = 1_000,
+                      gpus: int = 0) -> None:
+    """
+    Compare the value and total time of ``auc`` with its previous per-user implementation, scoring
+    ``n_users`` users in batches of ``batch_size`` as ``evaluate_in_batches`` would.
+
+    From the terminal, you can run this script with:
+
+    .. code-block:: bash
+
+        python benchmarks/auc.py run_auc_benchmark --n_users 100000
+
+    Parameters
+    ----------
+    n_users: int
+        Total number of users to evaluate
+    n_items: int
+        Number of items scored for each user
+    density: float
+        Fraction of items that are positive for each user
+    batch_size: int
+        Number of users scored at once
+    gpus: int
+        Whether to benchmark on the GPU or the CPU
+
+    """
+    device = 'cuda' if gpus else 'cpu'
+
+    # every user needs at least one positive item for AUC to be defined
+    targets = (
+        sparse_random(n_users, n_items, density=density, format='csr', random_state=42)
+        + csr_matrix((np.ones(n_users), (np.arange(n_users), np.arange(n_users) % n_items)),
+                     shape=(n_users, n_items))
+    )
+    targets.data[:] = 1
+
+    for name, auc_function in [('previous', _previous_auc), ('current', auc)]:
+        # both implementations score the same ``preds``
+        torch.manual_seed(42)
+        total_score, total_seconds = 0.0, 0.0
+
+        for start in range(0, n_users, batch_size):
+            user_ids = np.arange(start, min(start + batch_size, n_users))
+            preds = torch.randn(len(user_ids), n_items, device=device)
+
+            if device == 'cuda':
+                torch.cuda.synchronize()
+            start_time = time.perf_counter()
+
+            score = auc_function(targets=targets, user_ids=user_ids, preds=preds)
+
+            if device == 'cuda':
+                torch.cuda.synchronize()
+            total_seconds += time.perf_counter() - start_time
+
+            total_score += score * len(user_ids)
+
+        print(f'{name:<10} AUC: {total_score / n_users:.6f}    seconds: {total_seconds:.3f}')
+
+
+if __name__ == '__main__':
+    fire.Fire()
@@ -0,0 +1,138 @@
+import resource
+import subprocess
+import sys
+import time
+
+import fire
+import torch
+
+from collie_recs.interactions import Interactions, InteractionsDataLoader
+from collie_recs.model import (CollieMinimalTrainer,
+                               MatrixFactorizationModel,
+                               NeuralCollaborativeFiltering)
+from collie_recs.movielens import read_movielens_df
+from collie_recs.utils import convert_to_implicit
+
+
+MODELS = {
+    'mf': MatrixFactorizationModel,
+    'ncf': NeuralCollaborativeFiltering,
+}
+
+
+def run_single_benchmark(model: str = 'mf',
+                         precision: str = '32',
+                         epochs: int = 3,
+                         embedding_dim: int = 64,
+                         batch_size: int = 1024,
+                         gpus: int = 0) -> None:
+    """
+    Train a single model on MovieLens 100K and print its mean epoch time, peak memory, and loss.
+
+    Since peak memory can only be measured once per process, ``run_mixed_precision_benchmark``
+    runs this function in a fresh subprocess for each configuration.
+
+    """
+    torch.manual_seed(42)
+
+    df = convert_to_implicit(read_movielens_df(decrement_ids=True))
+    interactions = Interactions(users=df['user_id'],
+                                items=df['item_id'],
+                                num_negative_samples=10,
+                                allow_missing_ids=True)
+    train_loader = InteractionsDataLoader(interactions, batch_size=batch_size, shuffle=True)
+
+    model_kwargs = {'embedding_dim': embedding_dim, 'lr_scheduler_func': None}
+    if model == 'ncf':
+        model_kwargs['num_layers'] = 3
+    model = MODELS[model](train=train_loader, **model_kwargs)
+
+    trainer = CollieMinimalTrainer(model=model,
+                                   max_epochs=epochs,
+                                   gpus=gpus,
+                                   early_stopping_patience=None,
+                                   verbosity=0,
+                                   precision=precision)
+
+    # the first epoch includes one-time setup costs, so we exclude it from the timings
+    trainer.max_epochs = 1
+    trainer.fit(model)
+
+    if gpus:
+        torch.cuda.synchronize()
+        torch.cuda.reset_peak_memory_stats()
+
+    start_time = time.perf_counter()
+    trainer.max_epochs = epochs
+    trainer.fit(model)
+    if gpus:
+        torch.cuda.synchronize()
+    seconds_per_epoch = (time.perf_counter() - start_time) / (epochs - 1)
+
+    if gpus:
+        peak_memory_mb = torch.cuda.max_memory_allocated() / 1024 ** 2
+    else:
+        # ``ru_maxrss`` is reported in kilobytes on Linux
+        peak_memory_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    print(f'{seconds_per_epoch},{peak_memory_mb},{trainer.best_epoch_loss[1]}')
+
+
+def run_mixed_precision_benchmark(epochs: int = 3,
+                                  embedding_dim: int = 64,
+                                  batch_size: int = 1024,
+                                  gpus: int = 0) -> None:
+    """
+    Compare epoch time and peak memory of ``CollieMinimalTrainer`` across ``precision`` settings.
+
+    From the terminal, you can run this script with:
+
+    .. code-block:: bash
+
+        python benchmarks/mixed_precision.py run_mixed_precision_benchmark --gpus 0
+
+    Parameters
+    ----------
+    epochs: int
+        Number of epochs to train each model for, the first of which is not timed
+    embedding_dim: int
+        Embedding dimension of each model
+    batch_size: int
+        Number of interactions in each training batch
+    gpus: int
+        Whether to benchmark on the GPU, where ``precision = 16`` is also benchmarked, or the CPU
+
+    """
+    precisions = ['32', 'bf16', '16'] if gpus else ['32', 'bf16']
+
+    print(f'{"model":<6}{"precision":>10}{"sec / epoch":>14}{"peak MB":>12}{"loss":>10}')
+
+    for model in MODELS:
+        for precision in precisions:
+            output = subprocess.run(
+                [
+                    sys.executable,
+                    __file__,
+                    'run_single_benchmark',
+                    f'--model={model}',
+                    f'--precision={precision}',
+                    f'--epochs={epochs}',
+                    f'--embedding_dim={embedding_dim}',
+                    f'--batch_size={batch_size}',
+                    f'--gpus={gpus}',
+                ],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout.strip().splitlines()[-1]
+
+            seconds_per_epoch, peak_memory_mb, loss = map(float, output.split(','))
+
+            print(
+                f'{model:<6}{precision:>10}{seconds_per_epoch:>14.3f}{peak_memory_mb:>12.1f}'
+                f'{loss:>10.4f}'
+            )
+
+
+if __name__ == '__main__':
+    fire.Fire()
@@ -0,0 +1,154 @@
+import time
+from typing import Callable, Tuple
+
+import fire
+import torch
+
+from collie_recs.loss import warp_loss
+
+
+def _previous_warp_loss(positive_scores: torch.tensor,
+                        many_negative_scores: torch.tensor,
+                        num_items: int) -> torch.tensor:
+    """
+    The previous implementation of ``warp_loss`` (without metadata), which builds two
+    ``batch_size x (num_negative_samples + 1)`` copies of the hinge losses to find the first
+    ranking-violating negative item of each row.
+
+    """
+    device = positive_scores.device
+
+    positive_scores = positive_scores.view(len(positive_scores), 1)
+    many_negative_scores = torch.transpose(many_negative_scores, 0, 1)
+
+    batch_size, max_trials = many_negative_scores.size(0), many_negative_scores.size(1)
+
+    flattened_new_row_indices = torch.arange(0, batch_size, 1).long().to(device) * (max_trials + 1)
+    tensor_of_ones = torch.ones(batch_size, 1).float().to(device)
+
+    hinge_loss = 1 - positive_scores + many_negative_scores
+
+    initial_loss_with_ones = torch.cat([hinge_loss, tensor_of_ones], dim=1)
+    initial_loss_with_ones_binary = torch.cat([hinge_loss, tensor_of_ones], dim=1)
+
+    initial_loss_with_ones_binary[initial_loss_with_ones_binary < 0] = 0
+    initial_loss_with_ones_binary[initial_loss_with_ones_binary > 0] = 1
+    reverse_indices = torch.arange(initial_loss_with_ones_binary.shape[1], 0, -1).to(device)
+    min_index_of_good_loss = initial_loss_with_ones_binary * reverse_indices
+    number_of_tries = torch.argmax(min_index_of_good_loss, 1, keepdim=True).flatten()
+
+    prediction_index_for_flattened_predictions = number_of_tries + flattened_new_row_indices
+
+    number_of_tries = (number_of_tries + 1).float()
+
+    loss_weights = torch.log((num_items / number_of_tries))
+
+    should_we_count_loss = (number_of_tries <= max_trials).float()
+
+    loss = (
+        loss_weights
+        * (
+            initial_loss_with_ones.flatten()[prediction_index_for_flattened_predictions]
+        )
+        * should_we_count_loss
+    )
+
+    return (loss.sum() + loss.pow(2).sum()) / len(positive_scores)
+
+
+def _time_loss(loss_function: Callable,
+               positive_scores: torch.tensor,
+               many_negative_scores: torch.tensor,
+               num_items: int,
+               repeats: int) -> Tuple[float, float, float]:
+    """Get the loss value, mean milliseconds per forward and backward pass, and peak CUDA MB."""
+    def _forward_and_backward() -> torch.tensor:
+        positive_scores.grad, many_negative_scores.grad = None, None
+
+        loss = loss_function(positive_scores, many_negative_scores, num_items=num_items)
+        loss.backward()
+
+        return loss
+
+    # warm up before timing
+    loss = _forward_and_backward()
+
+    is_cuda = positive_scores.is_cuda
+    if is_cuda:
+        torch.cuda.synchronize()
+        torch.cuda.reset_peak_memory_stats()
+
+    start_time = time.perf_counter()
+    for _ in range(repeats):
+        _forward_and_backward()
+    if is_cuda:
+        torch.cuda.synchronize()
+    milliseconds = (time.perf_counter() - start_time) / repeats * 1000
+
+    peak_memory_mb = torch.cuda.max_memory_allocated() / 1024 ** 2 if is_cuda else float('nan')
+
+    return loss.item(), milliseconds, peak_memory_mb
+
+
+def run_warp_loss_benchmark(batch_size: int = 1024,
+                            num_items: int = 10_000,
+                            repeats: int = 100,
+                            gpus: int = 0) -> None:
+    """
+    Compare the loss value, speed, and peak memory of ``warp_loss`` with its previous
+    implementation for 10, 100, and 1000 negative samples.
+
+    From the terminal, you can run this script with:
+
+    .. code-block:: bash
+
+        python benchmarks/warp_loss.py run_warp_loss_benchmark --gpus 0
+
+    Parameters
+    ----------
+    batch_size: int
+        Number of positive scores in each batch
+    num_items: int
+        Total number of items used to weight the loss
+    repeats: int
+        Number of timed forward and backward passes for each configuration
+    gpus: int
+        Whether to benchmark on the GPU, where peak memory is also reported, or the CPU
+
+    """
+    device = 'cuda' if gpus else 'cpu'
+
+    print(
+        f'{"negatives":<10}{"implementation":>16}{"loss":>12}{"ms / step":>12}{"peak MB":>10}'
+    )
+
+    for num_negative_samples in [10, 100, 1000]:
+        torch.manual_seed(42)
+
+        positive_scores = torch.randn(batch_size, device=device, requires_grad=True)
+        many_negative_scores = torch.randn(num_negative_samples,
+                                           batch_size,
+                                           device=device,
+                                           requires_grad=True)
+
+        losses = list()
+        for name, loss_function in [('previous', _previous_warp_loss), ('current', warp_loss)]:
+            loss, milliseconds, peak_memory_mb = _time_loss(loss_function,
+                                                            positive_scores,
+                                                            many_negative_scores,
+                                                            num_items=num_items,
+                                                            repeats=repeats)
+            losses.append(loss)
+
+            print(
+                f'{num_negative_samples:<10}{name:>16}{loss:>12.4f}{milliseconds:>12.3f}'
+                f'{peak_memory_mb:>10.1f}'
+            )
+
+        assert abs(losses[0] - losses[1]) <= 1e-4 * abs(losses[0]), (
+            f'Loss values differ for {num_negative_samples} negative samples: {losses}'
+        )
+
+
+if __name__ == '__main__':
+    fire.Fire()
@@ -1,10 +1,59 @@
 from ._version import __version__
 
-from collie_recs.config import *
-from collie_recs.cross_validation import *
-from collie_recs.interactions import *
-from collie_recs.loss import *
-from collie_recs.metrics import *
-from collie_recs.model import *
-from collie_recs.movielens import *
-from collie_recs.utils import *
+from collie_recs import _lazy, interactions, loss, model, movielens
+
+
+__getattr__, __dir__, __all__ = _lazy.attach(
+    __name__,
+    {
+        'config': ['DATA_PATH'],
+        'cross_validation': ['random_split', 'stratified_split'],
+        'inference': [
+            'SPEC_FILENAME',
+            'SPEC_FORMAT_VERSION',
+            'SCORERS',
+            'InferenceModel',
+            'write_inference_spec',
+        ],
+        'interactions': interactions.__all__,
+        'loss': loss.__all__,
+        'metrics': [
+            'get_preds',
+            'DeviceTargets',
+            'EvaluationBatch',
+            'mapk',
+            'ndcgk',
+            'precisionk',
+            'recallk',
+            'hit_ratek',
+            'coverage',
+            'mrr',
+            'auc',
+            'evaluate_in_batches',
+            'evaluate_quantization_drift',
+            'sample_evaluation_negatives',
+            'evaluate_sampled',
+        ],
+        'model': model.__all__,
+        'movielens': movielens.__all__,
+        'utils': [
+            'NEWLINE_CHARACTER',
+            'FOUR_SPACES',
+            'NEWLINE_CHARACTER_FOUR_SPACES',
+            'get_random_seed',
+            'create_ratings_matrix',
+            'df_to_interactions',
+            'convert_to_implicit',
+            'remove_users_with_fewer_than_n_interactions',
+            'trunc_normal',
+            'get_init_arguments',
+            'pandas_df_to_hdf5',
+            'df_to_html',
+            'Timer',
+            'StageProfiler',
+            'record_function',
+            'merge_docstrings',
+            'lazy_merge_docstrings',
+        ],
+    },
+)
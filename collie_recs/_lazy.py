@@ -0,0 +1,74 @@
+import importlib
+import sys
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+
+def attach(package_name: str,
+           submodule_attributes: Dict[str, Iterable[str]]) -> Tuple[Callable[[str], Any],
+                                                                    Callable[[], List[str]],
+                                                                    List[str]]:
+    """
+    Create module-level ``__getattr__`` and ``__dir__`` functions (see PEP 562) that defer
+    importing a package's submodules until one of their attributes is first accessed.
+
+    Importing a heavy dependency like PyTorch Lightning can take seconds, so packages in Collie
+    only import a submodule once something defined in it is actually used, e.g. ``import
+    collie_recs`` alone imports almost nothing, while accessing ``collie_recs.model.CollieTrainer``
+    imports ``collie_recs.model.base.trainer`` and its dependencies.
+
+    Parameters
+    ----------
+    package_name: str
+        Name of the package, i.e. ``__name__`` in the package's ``__init__.py``
+    submodule_attributes: dict
+        Keys are submodule names relative to the package and values are the names of public
+        attributes defined in that submodule. Each submodule is also accessible as an attribute of
+        the package itself
+
+    Returns
+    -------
+    __getattr__: function
+    __dir__: function
+    __all__: list
+        Names of all attributes in ``submodule_attributes``, used by ``from package import *``
+
+    Example
+    -------
+    .. code-block:: python
+
+        # in ``package/__init__.py``
+        from collie_recs import _lazy
+
+
+        __getattr__, __dir__, __all__ = _lazy.attach(__name__, {'module': ['function_a']})
+
+    """
+    attribute_to_submodule = {
+        attribute: submodule
+        for submodule, attributes in submodule_attributes.items()
+        for attribute in attributes
+    }
+
+    def __getattr__(name: str) -> Any:
+        if name in submodule_attributes:
+            return importlib.import_module(f'{package_name}.{name}')
+
+        if name not in attribute_to_submodule:
+            raise AttributeError(f'module {package_name!r} has no attribute {name!r}')
+
+        submodule = importlib.import_module(f'{package_name}.{attribute_to_submodule[name]}')
+        value = getattr(submodule, name)
+
+        # cache the attribute on the package so ``__getattr__`` is only called once per name
+        setattr(sys.modules[package_name], name, value)
+
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(
+            set(vars(sys.modules[package_name])) | set(submodule_attributes) | set(__all__)
+        )
+
+    __all__ = list(attribute_to_submodule)
+
+    return __getattr__, __dir__, __all__
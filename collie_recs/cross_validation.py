@@ -3,10 +3,8 @@ import functools
 import operator
 from typing import Any, Iterable, Optional, Tuple
 
-from joblib import delayed, Parallel
 import numpy as np
 from scipy.sparse import coo_matrix
-from sklearn.model_selection import train_test_split
 
 from collie_recs.interactions import Interactions
 from collie_recs.utils import get_random_seed
@@ -225,6 +223,8 @@ def _stratified_split(interactions: Interactions,
             for user in unique_users
         ]
     else:
+        from joblib import delayed, Parallel
+
         # run the function below in parallel for each user
         # by setting the seed to ``seed + user``, we get a balance between reproducability and
         # actual randomness so users with the same number of interactions are not split the exact
@@ -251,6 +251,8 @@ def _stratified_split(interactions: Interactions,
 
 def _stratified_split_parallel_worker(idxs_to_split: Iterable[Any],
                                       test_p: float, seed: int) -> np.array:
+    from sklearn.model_selection import train_test_split
+
     _, test_idxs = train_test_split(idxs_to_split,
                                     test_size=test_p,
                                     random_state=seed,
@@ -0,0 +1,426 @@
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Tuple, Union
+
+import numpy as np
+
+
+SPEC_FILENAME = 'spec.json'
+SPEC_FORMAT_VERSION = 1
+
+
+def _sigmoid(x: np.array) -> np.array:
+    # numerically stable for large negative inputs, unlike ``1 / (1 + np.exp(-x))``
+    return 0.5 * (1.0 + np.tanh(0.5 * x))
+
+
+def _relu(x: np.array) -> np.array:
+    return np.maximum(x, 0)
+
+
+def _leaky_relu(x: np.array, negative_slope: float = 0.01) -> np.array:
+    return np.where(x >= 0, x, x * negative_slope)
+
+
+def _linear(tables: Dict[str, np.array], name: str, x: np.array) -> np.array:
+    return x @ tables[f'{name}.weight'].T + tables[f'{name}.bias']
+
+
+def _sequential_linear_layer_names(tables: Dict[str, np.array], prefix: str) -> List[str]:
+    """Names of all ``nn.Linear`` layers in a ``nn.Sequential`` named ``prefix``, in order."""
+    layer_indices = sorted(
+        int(key[len(prefix) + 1:-len('.weight')])
+        for key in tables
+        if key.startswith(f'{prefix}.') and key.endswith('.weight')
+    )
+
+    return [f'{prefix}.{idx}' for idx in layer_indices]
+
+
+def _numbered_layer_names(tables: Dict[str, np.array], prefix: str) -> List[str]:
+    """Names of all layers added as ``{prefix}_0``, ``{prefix}_1``, ... submodules, in order."""
+    num_layers = sum(
+        1 for key in tables if key.startswith(f'{prefix}_') and key.endswith('.weight')
+    )
+
+    return [f'{prefix}_{idx}' for idx in range(num_layers)]
+
+
+def _lookup(tables: Dict[str, np.array], name: str, ids: np.array) -> np.array:
+    embeddings = np.asarray(tables[f'{name}.weight'][ids], dtype=np.float32)
+
+    # tables exported from a model quantized to ``int8`` are dequantized only for looked-up rows
+    scale = tables.get(f'{name}.scale')
+    if scale is not None:
+        if embeddings.shape[1] == 1:
+            # bias tables share a single scale rather than having one scale per row
+            embeddings = embeddings * float(np.asarray(scale).reshape(-1)[0])
+        else:
+            embeddings = embeddings * scale[ids].reshape(-1, 1)
+
+    return embeddings
+
+
+def _apply_y_range(preds: np.array, hparams: Dict[str, Any]) -> np.array:
+    y_range = hparams.get('y_range')
+    if y_range is not None:
+        preds = _sigmoid(preds) * (y_range[1] - y_range[0]) + y_range[0]
+
+    return preds
+
+
+def _apply_final_layer(preds: np.array, hparams: Dict[str, Any]) -> np.array:
+    final_layer = hparams.get('final_layer')
+    if final_layer == 'sigmoid':
+        preds = _sigmoid(preds)
+    elif final_layer == 'relu':
+        preds = _relu(preds)
+    elif final_layer == 'leaky_relu':
+        preds = _leaky_relu(preds)
+    elif final_layer is not None:
+        raise ValueError(f'{final_layer} not valid final layer value!')
+
+    return preds
+
+
+def _biases(tables: Dict[str, np.array], users: np.array, items: np.array) -> np.array:
+    return (
+        _lookup(tables, 'user_biases', users).reshape(-1)
+        + _lookup(tables, 'item_biases', items).reshape(-1)
+    )
+
+
+def _score_matrix_factorization(tables: Dict[str, np.array],
+                                hparams: Dict[str, Any],
+                                users: np.array,
+                                items: np.array) -> np.array:
+    preds = (
+        (_lookup(tables, 'user_embeddings', users) * _lookup(tables, 'item_embeddings', items))
+        .sum(axis=1)
+        + _biases(tables, users, items)
+    )
+
+    return _apply_y_range(preds, hparams)
+
+
+def _score_collaborative_metric_learning(tables: Dict[str, np.array],
+                                         hparams: Dict[str, Any],
+                                         users: np.array,
+                                         items: np.array) -> np.array:
+    # matches ``torch.nn.functional.pairwise_distance`` with its default ``eps=1e-6``
+    difference = (
+        _lookup(tables, 'user_embeddings', users) - _lookup(tables, 'item_embeddings', items) + 1e-6
+    )
+
+    return np.sqrt((difference ** 2).sum(axis=1))
+
+
+def _score_mlp_matrix_factorization(tables: Dict[str, np.array],
+                                    hparams: Dict[str, Any],
+                                    users: np.array,
+                                    items: np.array) -> np.array:
+    mlp_output = np.concatenate((_lookup(tables, 'user_embeddings', users),
+                                 _lookup(tables, 'item_embeddings', items)), axis=1)
+    for layer_name in _sequential_linear_layer_names(tables, 'mlp_layers'):
+        mlp_output = _relu(_linear(tables, layer_name, mlp_output))
+
+    preds = (
+        _sigmoid(_linear(tables, 'predict_layer', mlp_output)).reshape(-1)
+        + _biases(tables, users, items)
+    )
+
+    return _apply_y_range(preds, hparams)
+
+
+def _score_nonlinear_matrix_factorization(tables: Dict[str, np.array],
+                                          hparams: Dict[str, Any],
+                                          users: np.array,
+                                          items: np.array) -> np.array:
+    user_embeddings = _lookup(tables, 'user_embeddings', users)
+    for layer_name in _numbered_layer_names(tables, 'user_dense_layer'):
+        user_embeddings = _leaky_relu(_linear(tables, layer_name, user_embeddings))
+
+    item_embeddings = _lookup(tables, 'item_embeddings', items)
+    for layer_name in _numbered_layer_names(tables, 'item_dense_layer'):
+        item_embeddings = _leaky_relu(_linear(tables, layer_name, item_embeddings))
+
+    preds = (user_embeddings * item_embeddings).sum(axis=1) + _biases(tables, users, items)
+
+    return _apply_y_range(preds, hparams)
+
+
+def _score_neural_collaborative_filtering(tables: Dict[str, np.array],
+                                          hparams: Dict[str, Any],
+                                          users: np.array,
+                                          items: np.array) -> np.array:
+    output_cf = (
+        _lookup(tables, 'user_embeddings_cf', users) * _lookup(tables, 'item_embeddings_cf', items)
+    )
+
+    output_mlp = np.concatenate((_lookup(tables, 'user_embeddings_mlp', users),
+                                 _lookup(tables, 'item_embeddings_mlp', items)), axis=1)
+    for layer_name in _sequential_linear_layer_names(tables, 'mlp_layers'):
+        output_mlp = _relu(_linear(tables, layer_name, output_mlp))
+
+    preds = _linear(tables, 'predict_layer', np.concatenate((output_cf, output_mlp), axis=1))
+
+    return _apply_final_layer(preds, hparams).reshape(-1)
+
+
+def _score_deep_fm(tables: Dict[str, np.array],
+                   hparams: Dict[str, Any],
+                   users: np.array,
+                   items: np.array) -> np.array:
+    user_embeddings = _lookup(tables, 'user_embeddings', users)
+    item_embeddings = _lookup(tables, 'item_embeddings', items)
+
+    fm_output = (
+        (user_embeddings + item_embeddings) - (user_embeddings ** 2 + item_embeddings ** 2)
+    ).sum(axis=1)
+
+    mlp_output = np.concatenate((user_embeddings, item_embeddings), axis=1)
+    for layer_name in _sequential_linear_layer_names(tables, 'mlp_layers'):
+        mlp_output = _relu(_linear(tables, layer_name, mlp_output))
+    mlp_output = _linear(tables, 'predict_layer', mlp_output).reshape(-1)
+
+    return _apply_final_layer(fm_output + mlp_output, hparams).reshape(-1)
+
+
+def _score_hybrid_pretrained(tables: Dict[str, np.array],
+                             hparams: Dict[str, Any],
+                             users: np.array,
+                             items: np.array) -> np.array:
+    metadata_output = np.asarray(tables['item_metadata'][items], dtype=np.float32)
+    for layer_name in _numbered_layer_names(tables, 'metadata_layer'):
+        metadata_output = _leaky_relu(_linear(tables, layer_name, metadata_output))
+
+    combined_output = np.concatenate((_lookup(tables, 'embeddings.0', users),
+                                      _lookup(tables, 'embeddings.1', items),
+                                      metadata_output), axis=1)
+    combined_layer_names = _numbered_layer_names(tables, 'combined_layer')
+    for layer_name in combined_layer_names[:-1]:
+        combined_output = _leaky_relu(_linear(tables, layer_name, combined_output))
+
+    return _linear(tables, combined_layer_names[-1], combined_output).reshape(-1)
+
+
+SCORERS: Dict[str, Callable[..., np.array]] = {
+    'MatrixFactorizationModel': _score_matrix_factorization,
+    'CollaborativeMetricLearningModel': _score_collaborative_metric_learning,
+    'MLPMatrixFactorizationModel': _score_mlp_matrix_factorization,
+    'NonlinearMatrixFactorizationModel': _score_nonlinear_matrix_factorization,
+    'NeuralCollaborativeFiltering': _score_neural_collaborative_filtering,
+    'DeepFM': _score_deep_fm,
+    'HybridPretrainedModel': _score_hybrid_pretrained,
+    # deprecated alias of ``HybridPretrainedModel`` with an identical architecture
+    'HybridModel': _score_hybrid_pretrained,
+}
+
+
+class InferenceModel(object):
+    """
+    Score and rank items with a model exported with ``BasePipeline.export_inference``.
+
+    Nothing in this module imports PyTorch or PyTorch Lightning - each weight table is a ``.npy``
+    file loaded with NumPy and the architecture is described by a small JSON spec, so serving a
+    model only requires NumPy. Example usage may look like:
+
+    .. code-block:: python
+
+        # in the training environment
+        model.export_inference('exported_model')
+
+        # in the serving environment, only NumPy is required
+        from collie_recs.inference import InferenceModel
+
+
+        inference_model = InferenceModel('exported_model')
+        scores = inference_model.score(users=[0, 0, 1], items=[10, 11, 12])
+        top_items, top_scores = inference_model.recommend(user_ids=[0, 1], k=10)
+
+    Parameters
+    ----------
+    path: str or Path
+        Directory containing the output of ``BasePipeline.export_inference``
+    mmap: bool
+        Whether to memory-map the weight tables (``np.load(..., mmap_mode='r')``) rather than read
+        them fully into memory. Memory-mapped tables are shared across processes through the OS
+        page cache and only the rows that are actually looked up are ever read from disk
+
+    """
+    def __init__(self, path: Union[str, Path], mmap: bool = True):
+        self.path = str(path)
+
+        with open(os.path.join(self.path, SPEC_FILENAME), 'r') as f:
+            self.spec = json.load(f)
+
+        model_class = self.spec['model_class']
+        if model_class not in SCORERS:
+            raise ValueError(f'No inference scorer is available for model class {model_class}.')
+
+        self.model_class = model_class
+        self.hparams = self.spec['hparams']
+        self.num_users = self.spec['num_users']
+        self.num_items = self.spec['num_items']
+
+        mmap_mode = 'r' if mmap else None
+        self.tables = {
+            name: np.load(os.path.join(self.path, table_info['filename']), mmap_mode=mmap_mode)
+            for name, table_info in self.spec['tables'].items()
+        }
+
+        self._scorer = SCORERS[model_class]
+
+    def __repr__(self) -> str:
+        """String representation of ``InferenceModel`` class."""
+        return (
+            f'InferenceModel object for a {self.model_class} with {self.num_users} users and'
+            f' {self.num_items} items, loaded from {self.path}'
+        )
+
+    def score(self, users: Iterable[int], items: Iterable[int]) -> np.array:
+        """
+        Score (user ID, item ID) pairs, equivalent to calling the exported model's ``forward``.
+
+        Parameters
+        ----------
+        users: array-like, 1-d
+            User IDs
+        items: array-like, 1-d
+            Item IDs, the same length as ``users``
+
+        Returns
+        -------
+        scores: np.array, 1-d
+            Predicted score for each (user ID, item ID) pair
+
+        """
+        users = np.asarray(users, dtype=np.int64).reshape(-1)
+        items = np.asarray(items, dtype=np.int64).reshape(-1)
+
+        if len(users) != len(items):
+            raise ValueError(
+                f'``users`` and ``items`` must be the same length, not {len(users)} and'
+                f' {len(items)}.'
+            )
+
+        return np.asarray(self._scorer(self.tables, self.hparams, users, items), dtype=np.float32)
+
+    def score_all_items(self, user_ids: Iterable[int]) -> np.array:
+        """
+        Score every item in the catalog for each user in ``user_ids``.
+
+        Parameters
+        ----------
+        user_ids: array-like, 1-d
+            User IDs to score
+
+        Returns
+        -------
+        scores: np.array, 2-d
+            Array of shape ``len(user_ids) x num_items``
+
+        """
+        user_ids = np.asarray(user_ids, dtype=np.int64).reshape(-1)
+
+        users = np.repeat(user_ids, self.num_items)
+        items = np.tile(np.arange(self.num_items, dtype=np.int64), len(user_ids))
+
+        return self.score(users, items).reshape(len(user_ids), self.num_items)
+
+    def recommend(self, user_ids: Iterable[int], k: int = 10) -> Tuple[np.array, np.array]:
+        """
+        Get the ``k`` highest-scoring items for each user in ``user_ids``.
+
+        Parameters
+        ----------
+        user_ids: array-like, 1-d
+            User IDs to get recommendations for
+        k: int
+            Number of items to recommend per user
+
+        Returns
+        -------
+        item_ids: np.array, 2-d
+            Array of shape ``len(user_ids) x k`` with item IDs sorted by descending score
+        scores: np.array, 2-d
+            Array of shape ``len(user_ids) x k`` with the score for each item in ``item_ids``
+
+        """
+        if k > self.num_items:
+            raise ValueError(f'``k`` ({k}) must be <= the number of items ({self.num_items}).')
+
+        scores = self.score_all_items(user_ids)
+
+        # ``argpartition`` finds the top ``k`` in linear time, so only ``k`` items are sorted
+        top_k_unsorted = np.argpartition(-scores, kth=k - 1, axis=1)[:, :k]
+        top_k_scores_unsorted = np.take_along_axis(scores, top_k_unsorted, axis=1)
+        order = np.argsort(-top_k_scores_unsorted, axis=1, kind='stable')
+
+        item_ids = np.take_along_axis(top_k_unsorted, order, axis=1)
+        top_k_scores = np.take_along_axis(top_k_scores_unsorted, order, axis=1)
+
+        return item_ids, top_k_scores
+
+
+def write_inference_spec(path: Union[str, Path],
+                         model_class: str,
+                         hparams: Dict[str, Any],
+                         tables: Dict[str, np.array]) -> None:
+    """
+    Write weight tables and a JSON spec in the format read by ``InferenceModel``.
+
+    Most users will not need to call this directly - see ``BasePipeline.export_inference``.
+
+    Parameters
+    ----------
+    path: str or Path
+        Existing directory to write files into
+    model_class: str
+        Name of the model class, used to select the scoring function on load
+    hparams: dict
+        Model hyperparameters. Only values that can be serialized to JSON are kept
+    tables: dict
+        Keys are table names and values are ``np.array`` weight tables
+
+    """
+    path = str(path)
+
+    tables_spec = {}
+    for name, table in tables.items():
+        filename = f'{name}.npy'
+        np.save(os.path.join(path, filename), np.ascontiguousarray(table))
+        tables_spec[name] = {
+            'filename': filename,
+            'shape': list(table.shape),
+            'dtype': str(table.dtype),
+        }
+
+    spec = {
+        'format_version': SPEC_FORMAT_VERSION,
+        'model_class': model_class,
+        'num_users': int(hparams['num_users']),
+        'num_items': int(hparams['num_items']),
+        'hparams': _json_serializable_hparams(hparams),
+        'tables': tables_spec,
+    }
+
+    with open(os.path.join(path, SPEC_FILENAME), 'w') as f:
+        json.dump(spec, f, indent=2)
+
+
+def _json_serializable_hparams(hparams: Dict[str, Any]) -> Dict[str, Any]:
+    serializable_hparams = {}
+    for key, value in hparams.items():
+        if isinstance(value, tuple):
+            value = list(value)
+
+        try:
+            json.dumps(value)
+        except TypeError:
+            continue
+
+        serializable_hparams[key] = value
+
+    return serializable_hparams
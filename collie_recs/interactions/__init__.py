@@ -1,3 +1,19 @@
-from collie_recs.interactions.datasets import *
-from collie_recs.interactions.samplers import *
-from collie_recs.interactions.dataloaders import *
+from collie_recs import _lazy
+
+
+__getattr__, __dir__, __all__ = _lazy.attach(
+    __name__,
+    {
+        'datasets': ['Interactions', 'HDF5Interactions'],
+        'samplers': ['ApproximateNegativeSampler', 'HDF5Sampler'],
+        'dataloaders': [
+            'BaseInteractionsDataLoader',
+            'InteractionsDataLoader',
+            'ApproximateNegativeSamplingInteractionsDataLoader',
+            'HDF5InteractionsDataLoader',
+            'TensorInteractionsDataLoader',
+            'PrecomputedInteractionsDataLoader',
+            'PrefetchedNegativesInteractionsDataLoader',
+        ],
+    },
+)
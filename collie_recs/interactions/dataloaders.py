@@ -1,13 +1,21 @@
+import inspect
+import math
 import multiprocessing
+from pathlib import Path
+import tempfile
 import textwrap
-from typing import Iterable, Optional, Union
+from typing import Iterable, Iterator, Optional, Tuple, Union
 
 import numpy as np
 from scipy.sparse import coo_matrix
 import torch
 
 from collie_recs.interactions.datasets import HDF5Interactions, Interactions
-from collie_recs.interactions.samplers import ApproximateNegativeSampler, HDF5Sampler
+from collie_recs.interactions.samplers import (_get_num_replicas_and_rank,
+                                               _get_replica_batch_idxs,
+                                               _validate_replicas,
+                                               ApproximateNegativeSampler,
+                                               HDF5Sampler)
 
 
 class BaseInteractionsDataLoader(torch.utils.data.DataLoader):
@@ -374,3 +382,699 @@ class HDF5InteractionsDataLoader(BaseInteractionsDataLoader):
             size {self.hdf5_sampler.batch_size}.
             '''
         ).replace('\n', ' ').strip()
+
+
+class TensorInteractionsDataLoader(BaseInteractionsDataLoader):
+    """
+    A ``DataLoader`` for ``Interactions`` data that holds every user and item ID as a tensor on
+    ``device``, building batches entirely with tensor operations.
+
+    Each epoch, the order of data is shuffled with a single ``torch.randperm`` and batches are
+    returned as slices of the shuffled tensors, so no worker processes, collation, or per-batch
+    Python objects are involved. Negative items are sampled on ``device`` with ``torch.randint``.
+    When ``max_number_of_samples_to_consider > 0``, negative samples are made exact by looking up
+    every sampled user, item ID pair in a sorted tensor of all positive user, item ID pairs with
+    ``torch.searchsorted`` and resampling any pairs that are positive interactions, for up to
+    ``max_number_of_samples_to_consider`` rounds. Any negative items that are still positive after
+    this will be returned as approximate negatives. Unlike ``InteractionsDataLoader``, negative
+    items for an interaction are not guaranteed to be unique.
+
+    This is the fastest ``DataLoader`` for data that fits in memory (or in GPU memory, with
+    ``device = 'cuda'``), typically up to tens of millions of interactions.
+
+    When ``num_replicas > 1``, batches are dealt out round-robin across replicas in the same way as
+    ``ApproximateNegativeSampler``, with every replica returning the same number of batches and
+    shuffling seeded by ``seed`` and the epoch set with ``set_epoch``.
+
+    Parameters
+    ----------
+    interactions: Interactions
+        If not provided, an ``Interactions`` object will be created with ``mat`` or all of
+        ``users``, ``items``, and ``ratings`` with ``max_number_of_samples_to_consider=0``, since a
+        positive item lookup set is not needed for exact negative sampling here
+    mat: scipy.sparse.coo_matrix or numpy.array, 2-dimensional
+        If ``interactions is None``, will be used instead of ``users``, ``items``, and ``ratings``
+        arguments to create an ``Interactions`` object
+    users: Iterable[int], 1-d
+        If ``interactions is None and mat is None``, array of user IDs, starting at 0
+    items: Iterable[int], 1-d
+        If ``interactions is None and mat is None``, array of corresponding item IDs to ``users``,
+        starting at 0
+    ratings: Iterable[int], 1-d
+        If ``interactions is None and mat is None``, array of corresponding ratings to both
+        ``users`` and ``items``. If ``None``, will default to each user in ``user`` interacting with
+        an item with a rating value of 1
+    batch_size: int
+        Number of samples per batch to load
+    shuffle: bool
+        Whether to shuffle the order of data returned or not. This is especially useful for training
+        data to ensure the model does not overfit to a specific order of data
+    device: str or torch.device
+        Device to hold data on and return batches on
+    max_number_of_samples_to_consider: int
+        Number of rounds of resampling negative items that are positive interactions before
+        returning approximate negative samples. If ``0``, approximate negative sampling will be used
+        and a sorted positive index will NOT be built. If ``None``, defaults to
+        ``interactions.max_number_of_samples_to_consider`` if ``interactions`` is provided, else the
+        ``Interactions`` default
+    num_replicas: int
+        Number of processes the batches will be partitioned across. If ``None``, defaults to the
+        world size of the default ``torch.distributed`` process group if initialized, else ``1``
+    rank: int
+        Index of the partition of batches for this DataLoader to return, with
+        ``0 <= rank < num_replicas``. If ``None``, defaults to the rank of the current process in
+        the default ``torch.distributed`` process group if initialized, else ``0``
+    **kwargs: keyword arguments
+        Relevant keyword arguments will be passed into ``Interactions`` object creation, if
+        ``interactions is None`` and the keyword argument matches one of
+        ``Interactions.__init__.__code__.co_varnames``. Of the remaining keyword arguments, only
+        ``drop_last`` is used. Since no worker processes are used, ``num_workers`` is ignored
+
+    Attributes
+    ----------
+    interactions: Interactions
+
+    """
+    def __init__(self,
+                 interactions: Interactions = None,
+                 mat: Optional[Union[coo_matrix, np.array]] = None,
+                 users: Optional[Iterable[int]] = None,
+                 items: Optional[Iterable[int]] = None,
+                 ratings: Optional[Iterable[int]] = None,
+                 batch_size: int = 1024,
+                 shuffle: bool = False,
+                 device: Union[str, torch.device] = 'cpu',
+                 max_number_of_samples_to_consider: Optional[int] = None,
+                 num_replicas: Optional[int] = None,
+                 rank: Optional[int] = None,
+                 **kwargs):
+        if num_replicas is not None and rank is not None:
+            _validate_replicas(num_replicas=num_replicas, rank=rank)
+
+        if interactions is None:
+            interactions_only_kwargs = {
+                k: v for k, v in kwargs.items()
+                if k in Interactions.__init__.__code__.co_varnames
+            }
+            kwargs = {
+                k: v for k, v in kwargs.items()
+                if k not in Interactions.__init__.__code__.co_varnames
+                or k in torch.utils.data.DataLoader.__init__.__code__.co_varnames
+            }
+
+            interactions = Interactions(mat=mat,
+                                        users=users,
+                                        items=items,
+                                        ratings=ratings,
+                                        max_number_of_samples_to_consider=0,
+                                        **interactions_only_kwargs)
+
+            if max_number_of_samples_to_consider is None:
+                max_number_of_samples_to_consider = (
+                    inspect.signature(Interactions).parameters['max_number_of_samples_to_consider']
+                    .default
+                )
+        elif max_number_of_samples_to_consider is None:
+            max_number_of_samples_to_consider = interactions.max_number_of_samples_to_consider
+
+        # batches are built in ``__iter__`` in this process, so there is no use for workers
+        kwargs.pop('num_workers', None)
+
+        super().__init__(
+            interactions=interactions,
+            batch_size=batch_size,
+            num_workers=0,
+            **kwargs,
+        )
+
+        self.shuffle = shuffle
+        self.device = torch.device(device)
+        self.max_number_of_samples_to_consider = max_number_of_samples_to_consider
+        self.seed = interactions.seed
+        self.num_replicas = num_replicas
+        self.rank = rank
+        self.epoch = 0
+
+        self.users = torch.from_numpy(interactions.mat.row).long().to(self.device)
+        self.items = torch.from_numpy(interactions.mat.col).long().to(self.device)
+
+        # each positive user, item ID pair is encoded as a single integer key, sorted so that
+        # membership of sampled pairs can be checked with a binary search on ``device``
+        self.positive_keys = None
+        if self.max_number_of_samples_to_consider > 0:
+            self.positive_keys = torch.sort(self.users * self.num_items + self.items).values
+
+        self._generator = torch.Generator(device=self.device)
+        self._generator.manual_seed(self.seed)
+
+    def set_epoch(self, epoch: int) -> None:
+        """Set the epoch used to seed the shuffled order of data when ``num_replicas > 1``."""
+        self.epoch = epoch
+
+    def __iter__(self) -> Iterator[Tuple[Tuple[torch.tensor, torch.tensor], torch.tensor]]:
+        """Iterate through batches of ``((users, items), negative_items)`` tensors."""
+        num_replicas, rank = _get_num_replicas_and_rank(self)
+
+        if num_replicas > 1:
+            # every replica must agree on the order of data, but should sample different negatives
+            self._generator.manual_seed((self.seed + self.epoch) * num_replicas + rank)
+
+        users, items = self.users, self.items
+        if self.shuffle:
+            if num_replicas > 1:
+                shuffle_generator = torch.Generator(device=self.device)
+                shuffle_generator.manual_seed(self.seed + self.epoch)
+            else:
+                shuffle_generator = self._generator
+
+            iteration_order = torch.randperm(len(users),
+                                             generator=shuffle_generator,
+                                             device=self.device)
+            users, items = users[iteration_order], items[iteration_order]
+
+        batch_idxs = _get_replica_batch_idxs(num_batches=self._num_batches(),
+                                             num_replicas=num_replicas,
+                                             rank=rank)
+        for batch_idx in batch_idxs:
+            start_idx = batch_idx * self.batch_size
+            batch_users = users[start_idx:(start_idx + self.batch_size)]
+            batch_items = items[start_idx:(start_idx + self.batch_size)]
+
+            yield (batch_users, batch_items), self._negative_sample(batch_users)
+
+    def _negative_sample(self, users: torch.tensor) -> torch.tensor:
+        """Sample ``num_negative_samples`` negative items for each user in ``users``."""
+        negative_items = torch.randint(low=0,
+                                       high=self.num_items,
+                                       size=(len(users), self.num_negative_samples),
+                                       generator=self._generator,
+                                       device=self.device)
+
+        if self.positive_keys is None:
+            return negative_items
+
+        users = users.unsqueeze(1).expand_as(negative_items)
+        for _ in range(self.max_number_of_samples_to_consider):
+            is_positive = self._is_positive(users=users, items=negative_items)
+            num_positive = int(is_positive.sum())
+
+            if num_positive == 0:
+                break
+
+            negative_items[is_positive] = torch.randint(low=0,
+                                                        high=self.num_items,
+                                                        size=(num_positive,),
+                                                        generator=self._generator,
+                                                        device=self.device)
+
+        return negative_items
+
+    def _is_positive(self, users: torch.tensor, items: torch.tensor) -> torch.tensor:
+        """Check which user, item ID pairs are positive interactions in ``interactions``."""
+        keys = users * self.num_items + items
+        idxs = torch.searchsorted(self.positive_keys, keys).clamp_(max=len(self.positive_keys) - 1)
+
+        return self.positive_keys[idxs] == keys
+
+    def _num_batches(self) -> int:
+        """Number of batches across all replicas."""
+        if self.drop_last:
+            return len(self.users) // self.batch_size
+
+        return math.ceil(len(self.users) / self.batch_size)
+
+    def __len__(self) -> int:
+        """Number of batches returned by the DataLoader."""
+        num_replicas, rank = _get_num_replicas_and_rank(self)
+
+        return len(_get_replica_batch_idxs(num_batches=self._num_batches(),
+                                           num_replicas=num_replicas,
+                                           rank=rank))
+
+    def __repr__(self) -> str:
+        """String representation of ``TensorInteractionsDataLoader`` class."""
+        return textwrap.dedent(
+            f'''
+            TensorInteractionsDataLoader object with {self.num_interactions} interactions between
+            {self.num_users} users and {self.num_items} items, returning
+            {self.num_negative_samples} negative samples per interaction in
+            {'shuffled' if self.shuffle else 'non-shuffled'} batches of size {self.batch_size}.
+            '''
+        ).replace('\n', ' ').strip()
+
+
+class PrecomputedInteractionsDataLoader(BaseInteractionsDataLoader):
+    """
+    A ``DataLoader`` that samples every batch of another ``Interactions`` DataLoader once, storing
+    all user IDs, item IDs, and negative item IDs in contiguous arrays, and replays those same
+    batches each time it is iterated through.
+
+    This is intended for validation data, where re-sampling negative items every epoch is both
+    costly and adds noise to the validation loss used for early stopping and learning rate
+    scheduling. With precomputed batches, each validation epoch is a cheap, deterministic pass over
+    the same data. Since negative items are never re-sampled, this should NOT be used for training
+    data.
+
+    When ``num_replicas > 1``, batches are dealt out round-robin across replicas in the same way as
+    ``ApproximateNegativeSampler``, with every replica returning the same number of batches.
+
+    Parameters
+    ----------
+    dataloader: Interactions, HDF5Interactions, or an Interactions DataLoader
+        Data to precompute batches from. If an ``Interactions`` or ``HDF5Interactions`` dataset is
+        provided, it will first be wrapped in a non-shuffled ``InteractionsDataLoader`` or
+        ``HDF5InteractionsDataLoader`` with ``batch_size``, respectively
+    batch_size: int
+        If ``dataloader`` is a dataset, number of samples per batch to load
+    cache_path: str or Path
+        If provided, precomputed batches are written to ``.npy`` files in this directory and
+        memory-mapped, rather than held in memory. Any existing files will be overwritten
+    num_replicas: int
+        Number of processes the batches will be partitioned across. If ``None``, defaults to the
+        world size of the default ``torch.distributed`` process group if initialized, else ``1``
+    rank: int
+        Index of the partition of batches for this DataLoader to return, with
+        ``0 <= rank < num_replicas``. If ``None``, defaults to the rank of the current process in
+        the default ``torch.distributed`` process group if initialized, else ``0``
+
+    Attributes
+    ----------
+    interactions: Interactions or HDF5Interactions
+    users: torch.tensor, 1-d
+        User IDs of every interaction in every batch
+    items: torch.tensor, 1-d
+        Item IDs of every interaction in every batch
+    negative_items: torch.tensor, 2-d
+        Negative item IDs of every interaction in every batch, with shape
+        ``len(users) x num_negative_samples``
+    batch_offsets: np.array, 1-d
+        Start index of every batch in the arrays above, followed by the total number of rows
+
+    """
+    def __init__(self,
+                 dataloader: Union[Interactions, HDF5Interactions, BaseInteractionsDataLoader],
+                 batch_size: int = 1024,
+                 cache_path: Optional[Union[str, Path]] = None,
+                 num_replicas: Optional[int] = None,
+                 rank: Optional[int] = None):
+        if num_replicas is not None and rank is not None:
+            _validate_replicas(num_replicas=num_replicas, rank=rank)
+
+        if isinstance(dataloader, Interactions):
+            dataloader = InteractionsDataLoader(interactions=dataloader,
+                                                batch_size=batch_size,
+                                                shuffle=False)
+        elif isinstance(dataloader, HDF5Interactions):
+            dataloader = HDF5InteractionsDataLoader(hdf5_interactions=dataloader,
+                                                    batch_size=batch_size,
+                                                    shuffle=False)
+
+        super().__init__(
+            interactions=dataloader.interactions,
+            num_workers=0,
+            batch_size=None,  # Disable automated batching
+        )
+
+        self.cache_path = cache_path
+        self.num_replicas = num_replicas
+        self.rank = rank
+
+        self._precompute_batches(dataloader)
+
+    def _precompute_batches(self, dataloader: BaseInteractionsDataLoader) -> None:
+        """Sample every batch of ``dataloader`` once into contiguous arrays."""
+        # ``len(interactions)`` is an upper bound for the number of rows, e.g. with ``drop_last``
+        max_num_rows = len(dataloader.interactions)
+        users = self._empty_array('users', shape=(max_num_rows,))
+        items = self._empty_array('items', shape=(max_num_rows,))
+        negative_items = self._empty_array('negative_items',
+                                           shape=(max_num_rows, self.num_negative_samples))
+
+        batch_offsets = [0]
+        for (batch_users, batch_items), batch_negative_items in dataloader:
+            start_idx = batch_offsets[-1]
+            end_idx = start_idx + len(batch_users)
+
+            users[start_idx:end_idx] = np.asarray(batch_users)
+            items[start_idx:end_idx] = np.asarray(batch_items)
+            negative_items[start_idx:end_idx] = np.asarray(batch_negative_items).reshape(
+                len(batch_users), -1
+            )
+
+            batch_offsets.append(end_idx)
+
+        if isinstance(users, np.memmap):
+            for array in (users, items, negative_items):
+                array.flush()
+
+        num_rows = batch_offsets[-1]
+
+        self.users = torch.from_numpy(users[:num_rows])
+        self.items = torch.from_numpy(items[:num_rows])
+        self.negative_items = torch.from_numpy(negative_items[:num_rows])
+        self.batch_offsets = np.array(batch_offsets)
+
+    def _empty_array(self, name: str, shape: Tuple[int, ...]) -> np.array:
+        """Allocate an ``int64`` array in memory, or memory-mapped in ``cache_path``."""
+        if self.cache_path is None:
+            return np.empty(shape, dtype=np.int64)
+
+        Path(self.cache_path).mkdir(parents=True, exist_ok=True)
+
+        return np.lib.format.open_memmap(Path(self.cache_path) / f'{name}.npy',
+                                         mode='w+',
+                                         dtype=np.int64,
+                                         shape=shape)
+
+    def __iter__(self) -> Iterator[Tuple[Tuple[torch.tensor, torch.tensor], torch.tensor]]:
+        """Iterate through the precomputed batches of ``((users, items), negative_items)``."""
+        num_replicas, rank = _get_num_replicas_and_rank(self)
+
+        batch_idxs = _get_replica_batch_idxs(num_batches=len(self.batch_offsets) - 1,
+                                             num_replicas=num_replicas,
+                                             rank=rank)
+        for batch_idx in batch_idxs:
+            start_idx = self.batch_offsets[batch_idx]
+            end_idx = self.batch_offsets[batch_idx + 1]
+
+            yield (
+                (self.users[start_idx:end_idx], self.items[start_idx:end_idx]),
+                self.negative_items[start_idx:end_idx],
+            )
+
+    def __len__(self) -> int:
+        """Number of batches returned by the DataLoader."""
+        num_replicas, rank = _get_num_replicas_and_rank(self)
+
+        return len(_get_replica_batch_idxs(num_batches=len(self.batch_offsets) - 1,
+                                           num_replicas=num_replicas,
+                                           rank=rank))
+
+    def __repr__(self) -> str:
+        """String representation of ``PrecomputedInteractionsDataLoader`` class."""
+        batch_sizes = np.diff(self.batch_offsets)
+        max_batch_size = batch_sizes.max() if len(batch_sizes) > 0 else 0
+
+        return textwrap.dedent(
+            f'''
+            PrecomputedInteractionsDataLoader object with {len(self.users)} interactions between
+            {self.num_users} users and {self.num_items} items, returning
+            {self.num_negative_samples} precomputed negative samples per interaction in
+            non-shuffled batches of size {max_batch_size}.
+            '''
+        ).replace('\n', ' ').strip()
+
+
+class PrefetchedNegativesInteractionsDataLoader(BaseInteractionsDataLoader):
+    """
+    A ``DataLoader`` for ``Interactions`` data that samples negative items for an entire epoch
+    ahead of time in a background process, taking negative sampling off of the training loop
+    entirely.
+
+    While an epoch trains, a background process generates the full
+    ``num_interactions x num_negative_samples`` matrix of negative items for the next epoch in
+    vectorized chunks, writing it to a memory-mapped ``int32`` array on disk. Two of these buffers
+    are alternated between, so that each epoch only has to slice rows out of a buffer that is
+    already written. Negative items for the first epoch are sampled as soon as the DataLoader is
+    created.
+
+    Negative items can be sampled uniformly or weighted by item popularity, and, when
+    ``max_number_of_samples_to_consider > 0``, are made exact by looking up every sampled user,
+    item ID pair in a sorted array of all positive user, item ID pairs and resampling positive pairs
+    for up to ``max_number_of_samples_to_consider`` rounds. Any negative items still positive after
+    this will be returned as approximate negatives.
+
+    This DataLoader cannot be partitioned across processes for ``CollieMinimalTrainer`` training
+    with ``num_processes > 1`` or ``strategy = 'ddp'``.
+
+    Parameters
+    ----------
+    interactions: Interactions
+        If not provided, an ``Interactions`` object will be created with ``mat`` or all of
+        ``users``, ``items``, and ``ratings`` with ``max_number_of_samples_to_consider=0``, since a
+        positive item lookup set is not needed for exact negative sampling here
+    mat: scipy.sparse.coo_matrix or numpy.array, 2-dimensional
+        If ``interactions is None``, will be used instead of ``users``, ``items``, and ``ratings``
+        arguments to create an ``Interactions`` object
+    users: Iterable[int], 1-d
+        If ``interactions is None and mat is None``, array of user IDs, starting at 0
+    items: Iterable[int], 1-d
+        If ``interactions is None and mat is None``, array of corresponding item IDs to ``users``,
+        starting at 0
+    ratings: Iterable[int], 1-d
+        If ``interactions is None and mat is None``, array of corresponding ratings to both
+        ``users`` and ``items``. If ``None``, will default to each user in ``user`` interacting with
+        an item with a rating value of 1
+    batch_size: int
+        Number of samples per batch to load
+    shuffle: bool
+        Whether to shuffle the order of data returned or not. This is especially useful for training
+        data to ensure the model does not overfit to a specific order of data
+    max_number_of_samples_to_consider: int
+        Number of rounds of resampling negative items that are positive interactions before
+        returning approximate negative samples. If ``0``, approximate negative sampling will be
+        used. If ``None``, defaults to ``interactions.max_number_of_samples_to_consider`` if
+        ``interactions`` is provided, else the ``Interactions`` default
+    negative_sampling_distribution: str
+        Distribution to sample negative items from, one of:
+
+        * ``'uniform'``: every item is equally likely to be sampled
+
+        * ``'popularity'``: items are sampled proportional to the number of interactions with them
+          raised to the power ``popularity_alpha``
+
+    popularity_alpha: float
+        If ``negative_sampling_distribution == 'popularity'``, exponent applied to the number of
+        interactions with each item, where ``0`` is uniform sampling and ``1`` is sampling
+        proportional to popularity
+    cache_path: str or Path
+        Directory to write the memory-mapped negative item buffers to. If ``None``, a temporary
+        directory will be created and removed once the DataLoader is garbage collected
+    chunk_size: int
+        Number of interactions to sample negative items for at a time in the background process
+    **kwargs: keyword arguments
+        Relevant keyword arguments will be passed into ``Interactions`` object creation, if
+        ``interactions is None`` and the keyword argument matches one of
+        ``Interactions.__init__.__code__.co_varnames``. All other keyword arguments will be passed
+        into ``torch.utils.data.DataLoader``:
+        https://pytorch.org/docs/stable/data.html#torch.utils.data.DataLoader
+
+    Attributes
+    ----------
+    interactions: Interactions
+
+    """
+    def __init__(self,
+                 interactions: Interactions = None,
+                 mat: Optional[Union[coo_matrix, np.array]] = None,
+                 users: Optional[Iterable[int]] = None,
+                 items: Optional[Iterable[int]] = None,
+                 ratings: Optional[Iterable[int]] = None,
+                 batch_size: int = 1024,
+                 shuffle: bool = False,
+                 max_number_of_samples_to_consider: Optional[int] = None,
+                 negative_sampling_distribution: str = 'uniform',
+                 popularity_alpha: float = 0.75,
+                 cache_path: Optional[Union[str, Path]] = None,
+                 chunk_size: int = 1_000_000,
+                 **kwargs):
+        if negative_sampling_distribution not in ('uniform', 'popularity'):
+            raise ValueError(
+                '``negative_sampling_distribution`` must be one of "uniform" or "popularity", not '
+                f'{negative_sampling_distribution}!'
+            )
+
+        if interactions is None:
+            interactions_only_kwargs = {
+                k: v for k, v in kwargs.items()
+                if k in Interactions.__init__.__code__.co_varnames
+            }
+            kwargs = {
+                k: v for k, v in kwargs.items()
+                if k not in Interactions.__init__.__code__.co_varnames
+                or k in torch.utils.data.DataLoader.__init__.__code__.co_varnames
+            }
+
+            interactions = Interactions(mat=mat,
+                                        users=users,
+                                        items=items,
+                                        ratings=ratings,
+                                        max_number_of_samples_to_consider=0,
+                                        **interactions_only_kwargs)
+
+            if max_number_of_samples_to_consider is None:
+                max_number_of_samples_to_consider = (
+                    inspect.signature(Interactions).parameters['max_number_of_samples_to_consider']
+                    .default
+                )
+        elif max_number_of_samples_to_consider is None:
+            max_number_of_samples_to_consider = interactions.max_number_of_samples_to_consider
+
+        # batches are sliced out of the buffers in ``__iter__``, so there is no use for workers
+        kwargs.pop('num_workers', None)
+
+        super().__init__(
+            interactions=interactions,
+            num_workers=0,
+            batch_size=None,  # Disable automated batching
+            **kwargs,
+        )
+
+        self.prefetch_batch_size = batch_size
+        self.shuffle = shuffle
+        self.max_number_of_samples_to_consider = max_number_of_samples_to_consider
+        self.negative_sampling_distribution = negative_sampling_distribution
+        self.popularity_alpha = popularity_alpha
+        self.chunk_size = chunk_size
+        self.seed = interactions.seed
+
+        if cache_path is None:
+            self._temporary_directory = tempfile.TemporaryDirectory()
+            cache_path = self._temporary_directory.name
+        Path(cache_path).mkdir(parents=True, exist_ok=True)
+        self.cache_path = cache_path
+
+        self._users = interactions.mat.row
+        self._items = interactions.mat.col
+
+        self._positive_keys = None
+        if self.max_number_of_samples_to_consider > 0:
+            self._positive_keys = np.sort(
+                self._users.astype(np.int64) * self.num_items + self._items
+            )
+
+        self._item_probabilities = None
+        if self.negative_sampling_distribution == 'popularity':
+            item_counts = np.bincount(self._items, minlength=self.num_items)
+            self._item_probabilities = item_counts ** self.popularity_alpha
+            self._item_probabilities /= self._item_probabilities.sum()
+
+        self._random_state = np.random.RandomState(self.seed)
+        self._epoch = 0
+        self._prefetch_process = None
+        self._start_prefetch(epoch=self._epoch)
+
+    def _buffer_path(self, epoch: int) -> Path:
+        """Path to the buffer negative items for ``epoch`` are written to."""
+        return Path(self.cache_path) / f'negative_items_{epoch % 2}.npy'
+
+    def _start_prefetch(self, epoch: int) -> None:
+        """Start a background process writing negative items for ``epoch`` to its buffer."""
+        start_methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('fork' if 'fork' in start_methods else None)
+
+        self._prefetch_process = context.Process(
+            target=_write_negative_samples,
+            kwargs={
+                'path': self._buffer_path(epoch),
+                'users': self._users,
+                'num_items': self.num_items,
+                'num_negative_samples': self.num_negative_samples,
+                'seed': (self.seed + epoch) % 2**32,
+                'positive_keys': self._positive_keys,
+                'item_probabilities': self._item_probabilities,
+                'max_number_of_samples_to_consider': self.max_number_of_samples_to_consider,
+                'chunk_size': self.chunk_size,
+            },
+            daemon=True,
+        )
+        self._prefetch_process.start()
+
+    def _wait_for_prefetch(self) -> None:
+        """Wait for the background process to finish writing negative items."""
+        self._prefetch_process.join()
+
+        if self._prefetch_process.exitcode != 0:
+            raise RuntimeError(
+                'Background process sampling negative items failed with exit code '
+                f'{self._prefetch_process.exitcode}!'
+            )
+
+    def __iter__(self) -> Iterator[Tuple[Tuple[torch.tensor, torch.tensor], torch.tensor]]:
+        """Iterate through batches, starting to sample negative items for the next epoch."""
+        self._wait_for_prefetch()
+
+        negative_items = np.load(self._buffer_path(self._epoch), mmap_mode='r')
+
+        # the next epoch's buffer is written while this one is read from
+        self._epoch += 1
+        self._start_prefetch(epoch=self._epoch)
+
+        if self.shuffle:
+            iteration_order = self._random_state.permutation(len(self._users))
+        else:
+            iteration_order = None
+
+        for start_idx in range(0, len(self._users), self.prefetch_batch_size):
+            end_idx = start_idx + self.prefetch_batch_size
+
+            if iteration_order is None:
+                idxs = slice(start_idx, end_idx)
+            else:
+                idxs = iteration_order[start_idx:end_idx]
+
+            # copy rows out of the buffer, since it will be overwritten two epochs from now
+            yield (
+                (torch.from_numpy(self._users[idxs]), torch.from_numpy(self._items[idxs])),
+                torch.from_numpy(np.array(negative_items[idxs])),
+            )
+
+    def __len__(self) -> int:
+        """Number of batches returned by the DataLoader."""
+        return math.ceil(len(self._users) / self.prefetch_batch_size)
+
+    def __repr__(self) -> str:
+        """String representation of ``PrefetchedNegativesInteractionsDataLoader`` class."""
+        return textwrap.dedent(
+            f'''
+            PrefetchedNegativesInteractionsDataLoader object with {self.num_interactions}
+            interactions between {self.num_users} users and {self.num_items} items, returning
+            {self.num_negative_samples} negative samples per interaction in
+            {'shuffled' if self.shuffle else 'non-shuffled'} batches of size
+            {self.prefetch_batch_size}.
+            '''
+        ).replace('\n', ' ').strip()
+
+
+def _write_negative_samples(path: Union[str, Path],
+                            users: np.array,
+                            num_items: int,
+                            num_negative_samples: int,
+                            seed: int,
+                            positive_keys: Optional[np.array] = None,
+                            item_probabilities: Optional[np.array] = None,
+                            max_number_of_samples_to_consider: int = 0,
+                            chunk_size: int = 1_000_000) -> None:
+    """Sample negative items for every user in ``users`` into a memory-mapped ``.npy`` file."""
+    random_state = np.random.RandomState(seed)
+
+    def _sample(size: Union[int, Tuple[int, int]]) -> np.array:
+        if item_probabilities is None:
+            return random_state.randint(low=0, high=num_items, size=size)
+
+        return random_state.choice(num_items, size=size, p=item_probabilities)
+
+    negative_items = np.lib.format.open_memmap(path,
+                                               mode='w+',
+                                               dtype=np.int32,
+                                               shape=(len(users), num_negative_samples))
+
+    for start_idx in range(0, len(users), chunk_size):
+        chunk_users = users[start_idx:(start_idx + chunk_size), np.newaxis].astype(np.int64)
+        chunk_negative_items = _sample((len(chunk_users), num_negative_samples))
+
+        if positive_keys is not None:
+            for _ in range(max_number_of_samples_to_consider):
+                keys = chunk_users * num_items + chunk_negative_items
+                idxs = np.minimum(np.searchsorted(positive_keys, keys), len(positive_keys) - 1)
+                is_positive = positive_keys[idxs] == keys
+
+                num_positive = is_positive.sum()
+                if num_positive == 0:
+                    break
+
+                chunk_negative_items[is_positive] = _sample(num_positive)
+
+        negative_items[start_idx:(start_idx + len(chunk_users))] = chunk_negative_items
+
+    negative_items.flush()
@@ -8,7 +8,6 @@ import numpy as np
 import pandas as pd
 from scipy.sparse import coo_matrix, dok_matrix
 import torch
-from tqdm.auto import tqdm
 
 import collie_recs
 
@@ -405,6 +404,8 @@ class HDF5Interactions(torch.utils.data.Dataset):
                     min_user_id = 1
                     min_item_id = 1
 
+                    from tqdm.auto import tqdm
+
                     # default Pandas ``chunksize`` is 100000, so we will use that too
                     chunksize = 100000
                     for idx in tqdm(range(0, self.num_interactions, chunksize)):
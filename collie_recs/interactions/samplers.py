@@ -1,6 +1,6 @@
 import math
 import random
-from typing import List, Optional, Tuple
+from typing import List, Optional, Tuple, Union
 
 import numpy as np
 import torch
@@ -12,6 +12,16 @@ class ApproximateNegativeSampler(torch.utils.data.sampler.Sampler):
     """
     Custom ``Sampler`` for bulk-sampling approximate negative items in ``Interactions`` data.
 
+    When ``num_replicas > 1``, batches are dealt out round-robin across replicas, with each replica
+    only returning every ``num_replicas``-th batch starting at batch ``rank``. If the number of
+    batches is not divisible by ``num_replicas``, batches from the start are repeated so that every
+    replica returns the same number of batches, as in ``torch.utils.data.DistributedSampler``,
+    since every training step synchronizes gradients across all replicas. Every replica must
+    agree on the order of data for this to partition batches without overlap, so shuffling will
+    instead use a permutation seeded with ``seed`` and the epoch set with ``set_epoch``. By default,
+    batches are partitioned across the ranks of the default ``torch.distributed`` process group
+    whenever one is initialized.
+
     Parameters
     ----------
     interactions: Interactions
@@ -22,46 +32,76 @@ class ApproximateNegativeSampler(torch.utils.data.sampler.Sampler):
         training data to ensure the model does not overfit to a specific order of data
     seed: int
         Seed for shuffling if ``shuffle is True``
+    num_replicas: int
+        Number of processes the batches will be partitioned across. If ``None``, defaults to the
+        world size of the default ``torch.distributed`` process group if initialized, else ``1``
+    rank: int
+        Index of the partition of batches for this sampler to return, with
+        ``0 <= rank < num_replicas``. If ``None``, defaults to the rank of the current process in
+        the default ``torch.distributed`` process group if initialized, else ``0``
 
     """
     def __init__(self,
                  interactions: Interactions,
                  batch_size: int = 1024,
                  shuffle: bool = False,
-                 seed: Optional[int] = None):
+                 seed: Optional[int] = None,
+                 num_replicas: Optional[int] = None,
+                 rank: Optional[int] = None):
+        if num_replicas is not None and rank is not None:
+            _validate_replicas(num_replicas=num_replicas, rank=rank)
+
         self.interactions = interactions
         self.batch_size = batch_size
         self.shuffle = shuffle
         self.seed = seed
+        self.num_replicas = num_replicas
+        self.rank = rank
+        self.epoch = 0
 
         self.iteration_order = np.arange(len(self.interactions))
 
         np.random.seed(self.seed)
 
+    def set_epoch(self, epoch: int) -> None:
+        """Set the epoch used to seed the shuffled order of data when ``num_replicas > 1``."""
+        self.epoch = epoch
+
     def __iter__(self) -> 'ApproximateNegativeSampler':
         """Setup iteration through ``ApproximateNegativeSamplingInteractionsDataLoader`` data."""
+        num_replicas, rank = _get_num_replicas_and_rank(self)
+
         if self.shuffle:
-            np.random.shuffle(self.iteration_order)
+            if num_replicas > 1:
+                random_state = np.random.RandomState((self.seed or 0) + self.epoch)
+                self.iteration_order = random_state.permutation(len(self.interactions))
+            else:
+                np.random.shuffle(self.iteration_order)
 
-        # reset pointer
-        self._pointer = 0
+        # reset pointer to the first batch of this replica's partition
+        self._batch_idxs = iter(_get_replica_batch_idxs(num_batches=self._num_batches(),
+                                                        num_replicas=num_replicas,
+                                                        rank=rank))
 
         return self
 
     def __next__(self) -> np.array:
         """Get the indices for the next batch of data."""
-        if self._pointer >= len(self.interactions):
-            raise StopIteration
+        start_idx = next(self._batch_idxs) * self.batch_size
 
-        idxs = self.iteration_order[self._pointer:(self._pointer + self.batch_size)]
+        return self.iteration_order[start_idx:(start_idx + self.batch_size)]
 
-        self._pointer += self.batch_size
-
-        return idxs
+    def _num_batches(self) -> int:
+        """Number of batches across all replicas."""
+        return math.ceil(len(self.interactions) / self.batch_size)
 
     def __len__(self) -> int:
         """Number of batches returned in the sampler."""
-        return math.ceil(len(self.interactions) / self.batch_size)
+        num_replicas, rank = _get_num_replicas_and_rank(self)
+
+        return len(_get_replica_batch_idxs(num_batches=self._num_batches(),
+                                           num_replicas=num_replicas,
+                                           rank=rank))
 
 
 class HDF5Sampler(torch.utils.data.sampler.Sampler):
@@ -69,6 +109,15 @@ class HDF5Sampler(torch.utils.data.sampler.Sampler):
     Custom ``Sampler`` for HDF5 data, with each sampled item being a start index and a batch size
     to use in ``HDF5Interactions.__getitem__``.
 
+    When ``num_replicas > 1``, batches are dealt out round-robin across replicas, with each replica
+    only returning every ``num_replicas``-th batch starting at batch ``rank``. If the number of
+    batches is not divisible by ``num_replicas``, batches from the start are repeated so that every
+    replica returns the same number of batches, as in ``torch.utils.data.DistributedSampler``.
+    Every replica must agree on the order of batches for this to partition them without overlap,
+    so shuffling will instead use a permutation seeded with ``seed`` and the epoch set with
+    ``set_epoch``. By default, batches are partitioned across the ranks of the default
+    ``torch.distributed`` process group whenever one is initialized.
+
     Parameters
     ----------
     hdf5_interactions: HDF5Interactions
@@ -82,17 +131,32 @@ class HDF5Sampler(torch.utils.data.sampler.Sampler):
         during model training for a negligible effect on model performance
     seed: int
         Seed for shuffling if ``shuffle is True``
+    num_replicas: int
+        Number of processes the batches will be partitioned across. If ``None``, defaults to the
+        world size of the default ``torch.distributed`` process group if initialized, else ``1``
+    rank: int
+        Index of the partition of batches for this sampler to return, with
+        ``0 <= rank < num_replicas``. If ``None``, defaults to the rank of the current process in
+        the default ``torch.distributed`` process group if initialized, else ``0``
 
     """
     def __init__(self,
                  hdf5_interactions: HDF5Interactions,
                  batch_size: int = 1024,
                  shuffle: bool = False,
-                 seed: Optional[int] = None):
+                 seed: Optional[int] = None,
+                 num_replicas: Optional[int] = None,
+                 rank: Optional[int] = None):
+        if num_replicas is not None and rank is not None:
+            _validate_replicas(num_replicas=num_replicas, rank=rank)
+
         self.hdf5_interactions = hdf5_interactions
         self.batch_size = batch_size
         self.shuffle = shuffle
         self.seed = seed
+        self.num_replicas = num_replicas
+        self.rank = rank
+        self.epoch = 0
 
         self.data_to_iterate_through = [
             (start_idx, self.batch_size)
@@ -101,27 +165,87 @@ class HDF5Sampler(torch.utils.data.sampler.Sampler):
 
         random.seed(self.seed)
 
+    def set_epoch(self, epoch: int) -> None:
+        """Set the epoch used to seed the shuffled order of batches when ``num_replicas > 1``."""
+        self.epoch = epoch
+
     def __iter__(self) -> 'HDF5Sampler':
         """Setup iteration through ``HDF5Sampler`` data."""
-        if self.shuffle:
-            random.shuffle(self.data_to_iterate_through)
+        num_replicas, rank = _get_num_replicas_and_rank(self)
 
-        # reset pointer
-        self._pointer = 0
+        if self.shuffle:
+            if num_replicas > 1:
+                self.data_to_iterate_through.sort()
+                random.Random((self.seed or 0) + self.epoch).shuffle(self.data_to_iterate_through)
+            else:
+                random.shuffle(self.data_to_iterate_through)
+
+        # reset pointer to the first batch of this replica's partition
+        self._batch_idxs = iter(
+            _get_replica_batch_idxs(num_batches=len(self.data_to_iterate_through),
+                                    num_replicas=num_replicas,
+                                    rank=rank)
+        )
 
         return self
 
     def __next__(self) -> List[Tuple[int]]:
         """Get the indices for the next batch of data."""
-        if self._pointer >= len(self.data_to_iterate_through):
-            raise StopIteration
+        return self.data_to_iterate_through[next(self._batch_idxs)]
 
-        idx = self.data_to_iterate_through[self._pointer]
+    def __len__(self) -> int:
+        """Number of batches returned in the sampler."""
+        num_replicas, rank = _get_num_replicas_and_rank(self)
 
-        self._pointer += 1
+        return len(_get_replica_batch_idxs(num_batches=len(self.data_to_iterate_through),
+                                           num_replicas=num_replicas,
+                                           rank=rank))
 
-        return idx
 
-    def __len__(self) -> int:
-        """Number of batches returned in the sampler."""
-        return math.ceil(len(self.hdf5_interactions) / self.batch_size)
+def _get_num_replicas_and_rank(
+    sampler: Union[ApproximateNegativeSampler, HDF5Sampler],
+) -> Tuple[int, int]:
+    """Get a sampler's ``num_replicas`` and ``rank``, defaulting to ``torch.distributed``'s."""
+    num_replicas, rank = sampler.num_replicas, sampler.rank
+
+    distributed = torch.distributed.is_available() and torch.distributed.is_initialized()
+
+    if num_replicas is None:
+        num_replicas = torch.distributed.get_world_size() if distributed else 1
+    if rank is None:
+        rank = torch.distributed.get_rank() if distributed else 0
+
+    _validate_replicas(num_replicas=num_replicas, rank=rank)
+
+    return num_replicas, rank
+
+
+def _get_replica_batch_idxs(num_batches: int, num_replicas: int, rank: int) -> List[int]:
+    """
+    Get the indices of the batches for replica ``rank`` to return, dealt out round-robin.
+
+    Every replica returns ``ceil(num_batches / num_replicas)`` batches, wrapping around to repeat
+    batches from the start if ``num_batches`` is not divisible by ``num_replicas``, so that every
+    replica takes the same number of synchronized training steps.
+
+    """
+    if num_batches == 0:
+        return []
+
+    num_batches_per_replica = math.ceil(num_batches / num_replicas)
+
+    return [
+        (rank + batch_num * num_replicas) % num_batches
+        for batch_num in range(num_batches_per_replica)
+    ]
+
+
+def _validate_replicas(num_replicas: int, rank: int) -> None:
+    """Check that ``rank`` is a valid partition index for ``num_replicas`` partitions."""
+    if num_replicas < 1:
+        raise ValueError(f'``num_replicas`` must be at least 1, not {num_replicas}!')
+    if not 0 <= rank < num_replicas:
+        raise ValueError(
+            f'``rank`` must be in the range [0, {num_replicas}) for ``num_replicas = '
+            f'{num_replicas}``, not {rank}!'
+        )
@@ -1,4 +1,12 @@
-from collie_recs.loss.bpr import *
-from collie_recs.loss.hinge import *
-from collie_recs.loss.metadata_utils import *
-from collie_recs.loss.warp import *
+from collie_recs import _lazy
+
+
+__getattr__, __dir__, __all__ = _lazy.attach(
+    __name__,
+    {
+        'bpr': ['bpr_loss', 'adaptive_bpr_loss'],
+        'hinge': ['hinge_loss', 'adaptive_hinge_loss'],
+        'metadata_utils': ['ideal_difference_from_metadata', 'MetadataPartialCredit'],
+        'warp': ['warp_loss'],
+    },
+)
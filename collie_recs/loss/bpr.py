@@ -1,8 +1,8 @@
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Union
 
 import torch
 
-from collie_recs.loss.metadata_utils import ideal_difference_from_metadata
+from collie_recs.loss.metadata_utils import ideal_difference_from_metadata, MetadataPartialCredit
 
 
 def bpr_loss(
@@ -11,7 +11,7 @@ def bpr_loss(
     num_items: Optional[Any] = None,
     positive_items: Optional[torch.tensor] = None,
     negative_items: Optional[torch.tensor] = None,
-    metadata: Optional[Dict[str, torch.tensor]] = dict(),
+    metadata: Optional[Union[Dict[str, torch.tensor], MetadataPartialCredit]] = dict(),
     metadata_weights: Optional[Dict[str, float]] = dict(),
 ) -> torch.tensor:
     """
@@ -39,11 +39,12 @@ def bpr_loss(
     negative_items: torch.tensor, 1-d
         Tensor containing ids for randomly-sampled negative items of shape ``1 x batch_size``. This
         is only needed if ``metadata`` is provided
-    metadata: dict
+    metadata: dict or MetadataPartialCredit
         Keys should be strings identifying each metadata type that match keys in
         ``metadata_weights``. Values should be a ``torch.tensor`` of shape (num_items x 1). Each
         tensor should contain categorical metadata information about items (e.g. a number
-        representing the genre of the item)
+        representing the genre of the item). Can also be a precomputed ``MetadataPartialCredit``
+        lookup, in which case ``metadata_weights`` is ignored
     metadata_weights: dict
         Keys should be strings identifying each metadata type that match keys in ``metadata``.
         Values should be the amount of weight to place on a match of that type of metadata, with the
@@ -95,7 +96,7 @@ def adaptive_bpr_loss(
     num_items: Optional[Any] = None,
     positive_items: Optional[torch.tensor] = None,
     negative_items: Optional[torch.tensor] = None,
-    metadata: Optional[Dict[str, torch.tensor]] = dict(),
+    metadata: Optional[Union[Dict[str, torch.tensor], MetadataPartialCredit]] = dict(),
     metadata_weights: Optional[Dict[str, float]] = dict(),
 ) -> torch.tensor:
     """
@@ -123,11 +124,12 @@ def adaptive_bpr_loss(
     negative_items: torch.tensor, 2-d
         Tensor containing ids for sampled negative items of shape
         ``num_negative_samples x batch_size``. This is only needed if ``metadata`` is provided
-    metadata: dict
+    metadata: dict or MetadataPartialCredit
         Keys should be strings identifying each metadata type that match keys in
         ``metadata_weights``. Values should be a ``torch.tensor`` of shape (num_items x 1). Each
         tensor should contain categorical metadata information about items (e.g. a number
-        representing the genre of the item)
+        representing the genre of the item). Can also be a precomputed ``MetadataPartialCredit``
+        lookup, in which case ``metadata_weights`` is ignored
     metadata_weights: dict
         Keys should be strings identifying each metadata type that match keys in ``metadata``.
         Values should be the amount of weight to place on a match of that type of metadata, with the
@@ -1,12 +1,100 @@
-from typing import Dict, Optional
+from typing import Dict, Optional, Union
 
 import torch
 
 
+class MetadataPartialCredit(torch.nn.Module):
+    """
+    Precomputed lookup of the ideal score difference between pairs of items given item metadata.
+
+    Each type of metadata is encoded once into a column of a single ``num_items x num_metadata``
+    code tensor, so the partial credit for a batch of item pairs is a single gather and comparison
+    rather than indexing into every metadata tensor separately each step. When
+    ``num_items ** 2 <= max_table_size``, the ideal difference for every pair of items is instead
+    precomputed into a ``num_items x num_items`` table, making the lookup a single gather.
+
+    Codes and tables are stored as non-persistent buffers, so they move with a model across devices
+    without being saved in its ``state_dict``. Passing this in place of a ``metadata`` dictionary
+    to any loss function or ``ideal_difference_from_metadata`` gives the same result, with the
+    ``metadata_weights`` given here rather than those passed to the loss.
+
+    Parameters
+    ----------
+    metadata: dict
+        Keys should be strings identifying each metadata type that match keys in
+        ``metadata_weights``. Values should be a ``torch.tensor`` of shape (num_items x 1). Each
+        tensor should contain categorical metadata information about items (e.g. a number
+        representing the genre of the item)
+    metadata_weights: dict
+        Keys should be strings identifying each metadata type that match keys in ``metadata``.
+        Values should be the amount of weight to place on a match of that type of metadata, with the
+        sum of all values ``<= 1``
+    max_table_size: int
+        Maximum number of entries in a precomputed ``num_items x num_items`` table of ideal
+        differences. Set to ``0`` to always compare codes instead
+
+    """
+    def __init__(self,
+                 metadata: Dict[str, torch.tensor],
+                 metadata_weights: Dict[str, float],
+                 max_table_size: int = 2 ** 20):
+        super().__init__()
+
+        weight_sum = sum(metadata_weights.values())
+        if weight_sum > 1:
+            raise ValueError(f'sum of metadata weights was {weight_sum}, must be <=1')
+
+        self.metadata_keys = list(metadata.keys())
+
+        # encode each type of metadata as consecutive integers so all types fit in one tensor,
+        # regardless of their original dtype
+        codes = torch.stack([
+            torch.unique(array.reshape(-1).cpu(), return_inverse=True)[1].int()
+            for array in metadata.values()
+        ], dim=1)
+        weights = torch.tensor([float(metadata_weights[k]) for k in self.metadata_keys])
+
+        self.num_items = codes.shape[0]
+
+        table = None
+        if self.num_items ** 2 <= max_table_size:
+            table = torch.empty(self.num_items, self.num_items)
+            # build the table a block of rows at a time to bound the size of the comparison
+            block_size = max(1, max_table_size // (self.num_items * codes.shape[1]))
+            for start in range(0, self.num_items, block_size):
+                block_matches = codes[start:start + block_size].unsqueeze(1) == codes.unsqueeze(0)
+                table[start:start + block_size] = 1.0 - block_matches.float() @ weights
+
+        self.register_buffer('codes', codes, persistent=False)
+        self.register_buffer('weights', weights, persistent=False)
+        self.register_buffer('table', table, persistent=False)
+
+    def forward(self, positive_items: torch.tensor, negative_items: torch.tensor) -> torch.tensor:
+        """Get the ideal difference between each pair of positive and negative items."""
+        positive_items = positive_items.long()
+        negative_items = negative_items.long()
+
+        if self.table is not None:
+            return self.table[positive_items, negative_items]
+
+        matches = self.codes[positive_items] == self.codes[negative_items]
+
+        return 1.0 - matches.to(self.weights.dtype) @ self.weights
+
+    def __len__(self) -> int:
+        """Number of types of metadata, for the same checks as a ``metadata`` dictionary."""
+        return len(self.metadata_keys)
+
+    def extra_repr(self) -> str:
+        """Describe the metadata keys and lookup used."""
+        lookup = 'table' if self.table is not None else 'codes'
+        return f'metadata_keys={self.metadata_keys}, num_items={self.num_items}, lookup={lookup}'
+
+
 def ideal_difference_from_metadata(
     positive_items: torch.tensor,
     negative_items: torch.tensor,
-    metadata: Optional[Dict[str, torch.tensor]],
+    metadata: Optional[Union[Dict[str, torch.tensor], MetadataPartialCredit]],
     metadata_weights: Optional[Dict[str, float]],
 ) -> torch.tensor:
     """
@@ -29,15 +117,16 @@ def ideal_difference_from_metadata(
         Tensor containing IDs for known positive items
     negative_items: torch.tensor, 1-d
         Tensor containing IDs for sampled negative items
-    metadata: dict
+    metadata: dict or MetadataPartialCredit
         Keys should be strings identifying each metadata type that match keys in
         ``metadata_weights``. Values should be a ``torch.tensor`` of shape (num_items x 1). Each
         tensor should contain categorical metadata information about items (e.g. a number
-        representing the genre of the item)
+        representing the genre of the item). A ``MetadataPartialCredit`` lookup built from this
+        dictionary and ``metadata_weights`` can be passed instead to skip the per-call work below
     metadata_weights: dict
         Keys should be strings identifying each metadata type that match keys in ``metadata``.
         Values should be the amount of weight to place on a match of that type of metadata, with the
-        sum of all values ``<= 1``.
+        sum of all values ``<= 1``. Ignored if ``metadata`` is a ``MetadataPartialCredit``.
         e.g. If ``metadata_weights = {'genre': .3, 'director': .2}``, then an item is:
 
         * a 100% match if it's the same item,
@@ -57,6 +146,9 @@ def ideal_difference_from_metadata(
         Tensor with the same shape as ``positive_items``, with each element between 0 and 1
 
     """
+    if isinstance(metadata, MetadataPartialCredit):
+        return metadata(positive_items, negative_items)
+
     weight_sum = sum(metadata_weights.values())
     if weight_sum > 1:
         raise ValueError(f'sum of metadata weights was {weight_sum}, must be <=1')
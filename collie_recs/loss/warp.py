@@ -1,8 +1,8 @@
-from typing import Dict, Optional, Union
+from typing import Dict, Optional, Tuple, Union
 
 import torch
 
-from collie_recs.loss.metadata_utils import ideal_difference_from_metadata
+from collie_recs.loss.metadata_utils import ideal_difference_from_metadata, MetadataPartialCredit
 
 
 def warp_loss(
@@ -11,7 +11,7 @@ def warp_loss(
     num_items: int,
     positive_items: Optional[torch.tensor] = None,
     negative_items: Optional[torch.tensor] = None,
-    metadata: Optional[Dict[str, torch.tensor]] = dict(),
+    metadata: Optional[Union[Dict[str, torch.tensor], MetadataPartialCredit]] = dict(),
     metadata_weights: Optional[Dict[str, float]] = dict(),
 ) -> torch.tensor:
     """
@@ -38,11 +38,12 @@ def warp_loss(
     negative_items: torch.tensor, 2-d
         Tensor containing ids for sampled negative items of shape
         ``num_negative_samples x batch_size``. This is only needed if ``metadata`` is provided
-    metadata: dict
+    metadata: dict or MetadataPartialCredit
         Keys should be strings identifying each metadata type that match keys in
         ``metadata_weights``. Values should be a ``torch.tensor`` of shape (num_items x 1). Each
         tensor should contain categorical metadata information about items (e.g. a number
-        representing the genre of the item)
+        representing the genre of the item). Can also be a precomputed ``MetadataPartialCredit``
+        lookup, in which case ``metadata_weights`` is ignored
     metadata_weights: dict
         Keys should be strings identifying each metadata type that match keys in ``metadata``.
         Values should be the amount of weight to place on a match of that type of metadata, with the
@@ -70,45 +71,33 @@ def warp_loss(
         www.thespermwhale.com/jaseweston/papers/wsabie-ijcai.pdf.
 
     """
-    if negative_items is not None and positive_items is not None:
-        positive_items = positive_items.repeat([many_negative_scores.shape[0], 1])
-
     if metadata is not None and len(metadata) > 0:
         ideal_difference = ideal_difference_from_metadata(
-            positive_items=positive_items,
+            positive_items=positive_items.repeat([many_negative_scores.shape[0], 1]),
             negative_items=negative_items,
             metadata=metadata,
             metadata_weights=metadata_weights,
-        ).transpose(1, 0)
+        )
     else:
         ideal_difference = 1
 
-    # device to put new tensors on
-    device = positive_scores.device
-
-    # WARP loss requires a different structure for positive and negative samples
-    positive_scores = positive_scores.view(len(positive_scores), 1)
-    many_negative_scores = torch.transpose(many_negative_scores, 0, 1)
-
-    batch_size, max_trials = many_negative_scores.size(0), many_negative_scores.size(1)
-
-    flattened_new_row_indices = torch.arange(0, batch_size, 1).long().to(device) * (max_trials + 1)
-    tensor_of_ones = torch.ones(batch_size, 1).float().to(device)
-
-    # ``initial_loss`` is essentially just hinge loss for now
-    hinge_loss = ideal_difference - positive_scores + many_negative_scores
-
-    # Add column of ones to so we know when we have used all our attempts. This is used for indexing
-    # and computing ``should_count_loss`` if no real value is above 0.
-    initial_loss_with_ones = torch.cat([hinge_loss, tensor_of_ones], dim=1)
-    # this will be modified in ``_find_first_loss_violation``
-    initial_loss_with_ones_binary = torch.cat([hinge_loss, tensor_of_ones], dim=1)
-
-    number_of_tries = _find_first_loss_violation(initial_loss_with_ones_binary, device)
+    # the index of the first negative item that violates the ranking for each row is all that the
+    # loss depends on, so it is found without tracking gradients. Comparing against a per-row
+    # threshold, rather than computing ``ideal_difference - positive_score + negative_score`` for
+    # every negative item, avoids a full-size copy of ``many_negative_scores`` without metadata
+    with torch.no_grad():
+        first_violation_idxs, has_violation = _find_first_loss_violation(
+            many_negative_scores > (positive_scores - ideal_difference)
+        )
 
-    prediction_index_for_flattened_predictions = number_of_tries + flattened_new_row_indices
+    # gather only the first violating score for each row, in the same form as ``hinge_loss``
+    first_violation_negative_scores = many_negative_scores.gather(
+        0, first_violation_idxs.unsqueeze(0)
+    ).squeeze(0)
+    if isinstance(ideal_difference, torch.Tensor):
+        ideal_difference = ideal_difference.gather(0, first_violation_idxs.unsqueeze(0)).squeeze(0)
 
-    number_of_tries = (number_of_tries + 1).float()
+    hinge_loss = ideal_difference - positive_scores + first_violation_negative_scores
 
     # IMPORTANT CHANGE: normal WARP weighting has the numerator set to ``num_items - 1``, but we
     # have found this does not penalize when the last item in a negative item sequence ranks above a
@@ -117,38 +106,33 @@ def warp_loss(
     # not counting loss. See the original implementation as a comment below, and our modified,
     # harsher calculation implemented below.
     # loss_weights = torch.log(torch.floor((num_items - 1) / number_of_tries))
-    loss_weights = torch.log((num_items / number_of_tries))
+    number_of_tries = (first_violation_idxs + 1).to(hinge_loss.dtype)
+    loss_weights = torch.log(num_items / number_of_tries)
 
     # don't count loss if we used max number of attempts looking for a violation and didn't find one
-    should_we_count_loss = (number_of_tries <= max_trials).float()
-
-    loss = (
-        loss_weights
-        * (
-            initial_loss_with_ones.flatten()[prediction_index_for_flattened_predictions]
-        )
-        * should_we_count_loss
-    )
+    # (multiplying by ``has_violation`` instead would give ``-inf * 0 = NaN`` loss for these rows
+    # when their gathered negative score is ``-inf``, as with ``memory_efficient_loss``)
+    loss = loss_weights * hinge_loss
+    loss = torch.where(has_violation, loss, torch.zeros_like(loss))
 
     return (loss.sum() + loss.pow(2).sum()) / len(positive_scores)
 
 
-def _find_first_loss_violation(losses: torch.tensor,
-                               device: Union[str, torch.device, torch.cuda.device]) -> torch.tensor:
+def _find_first_loss_violation(
+    is_violation: torch.tensor,
+) -> Tuple[torch.tensor, torch.tensor]:
     """
-    Find the index of the first violation where ``1 - positive_score + negative_score`` is greater
-    than 0.
+    Find the index of the first violation, where ``1 - positive_score + negative_score`` is greater
+    than 0, in each column of ``is_violation``, a boolean tensor of shape
+    ``num_negative_samples x batch_size``.
 
-    """
-    # set all negative losses to 0 and all positive losses to 1
-    losses[losses < 0] = 0
-    losses[losses > 0] = 1
-
-    # after this, maximum value will be the first non-zero (bad) loss
-    reverse_indices = torch.arange(losses.shape[1], 0, -1).to(device)
-    min_index_of_good_loss = losses * reverse_indices
+    Returns the index of the first violation (or ``0`` if there are none) and whether or not there
+    is a violation for each column.
 
-    # report the first loss that is positive here (not 0-based indexed)
-    number_of_tries = torch.argmax(min_index_of_good_loss, 1, keepdim=True).flatten()
+    """
+    # ``argmax`` returns the index of the first maximal value, which is the first ``1`` if there is
+    # one. Booleans are viewed as ``uint8`` without a copy, since ``argmax`` does not support them
+    first_violation_idxs = is_violation.view(torch.uint8).argmax(dim=0)
+    has_violation = is_violation.gather(0, first_violation_idxs.unsqueeze(0)).squeeze(0)
 
-    return number_of_tries
+    return first_violation_idxs, has_violation
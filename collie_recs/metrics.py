@@ -1,14 +1,19 @@
-from typing import Any, Callable, Iterable, List, Optional, Tuple, Union
+import inspect
+import multiprocessing
+from multiprocessing.connection import Connection, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, TYPE_CHECKING, Union
+import warnings
 
 import numpy as np
-import pytorch_lightning
 from scipy.sparse import csr_matrix
 import torch
-from torchmetrics.functional import auroc
-from tqdm.auto import tqdm
 
 import collie_recs
-from collie_recs.model import BasePipeline
+from collie_recs.utils import get_random_seed, record_function
+
+if TYPE_CHECKING:
+    import pytorch_lightning
 
 
 def _get_user_item_pairs(user_ids: (np.array, torch.tensor),
@@ -68,7 +73,7 @@ def _get_user_item_pairs(user_ids: (np.array, torch.tensor),
     return users, items
 
 
-def get_preds(model: BasePipeline,
+def get_preds(model: 'collie_recs.model.BasePipeline',
               user_ids: (np.array, torch.tensor),
               n_items: int,
               device: Union[str, torch.device]) -> torch.tensor:
@@ -101,7 +106,133 @@ def get_preds(model: BasePipeline,
     return predicted_scores.view(-1, n_items)
 
 
-def _get_labels(targets: csr_matrix,
+class DeviceTargets:
+    """
+    Copy of a target interaction matrix stored as sorted CSR tensors on a device.
+
+    Each stored interaction is keyed by ``user_id * n_items + item_id``. CSR rows are ordered by
+    user and columns are sorted within each row, so these keys are already sorted, and looking up
+    whether items are in users' target sets is a single ``torch.searchsorted`` on the device
+    rather than scipy fancy indexing on the CPU.
+
+    Parameters
+    ----------
+    targets: scipy.sparse.csr_matrix
+        Interaction matrix containing user and item IDs
+    device: string
+        Device to store tensors on
+
+    """
+    def __init__(self, targets: csr_matrix, device: Union[str, torch.device] = 'cpu'):
+        if not targets.has_sorted_indices:
+            targets = targets.sorted_indices()
+
+        self.shape = targets.shape
+        self.device = device
+
+        self.indptr = torch.as_tensor(targets.indptr.astype(np.int64), device=device)
+        self.indices = torch.as_tensor(targets.indices.astype(np.int64), device=device)
+        # explicitly-stored zeros are not in the target set
+        self.is_positive = torch.as_tensor(targets.data > 0, device=device)
+
+        rows = torch.arange(self.shape[0], device=device).repeat_interleave(
+            self.indptr[1:] - self.indptr[:-1]
+        )
+        self.keys = rows * self.shape[1] + self.indices
+
+    def share_memory(self) -> 'DeviceTargets':
+        """Move all tensors to shared memory so forked processes read them without copies."""
+        for tensor in [self.indptr, self.indices, self.is_positive, self.keys]:
+            tensor.share_memory_()
+
+        return self
+
+    def contains(self, user_ids: torch.tensor, items: torch.tensor) -> torch.tensor:
+        """
+        Check which items are in each user's target set.
+
+        Parameters
+        ----------
+        user_ids: torch.tensor, 1-d
+            Rows of the target matrix
+        items: torch.tensor, 2-d
+            Item IDs to look up, with one row for each user in ``user_ids``
+
+        Returns
+        -------
+        is_target: torch.tensor
+            Boolean tensor with the same shape as ``items``
+
+        """
+        if len(self.keys) == 0:
+            return torch.zeros(items.shape, dtype=torch.bool, device=items.device)
+
+        query = user_ids.view(-1, 1) * self.shape[1] + items.long()
+        idxs = torch.searchsorted(self.keys, query).clamp(max=len(self.keys) - 1)
+
+        return (self.keys[idxs] == query) & self.is_positive[idxs]
+
+    def n_targets(self, user_ids: torch.tensor) -> torch.tensor:
+        """Number of stored items in each user's row of the target matrix."""
+        return self.indptr[user_ids + 1] - self.indptr[user_ids]
+
+    def row_entries(
+        self,
+        user_ids: torch.tensor,
+    ) -> Tuple[torch.tensor, torch.tensor, torch.tensor, torch.tensor]:
+        """
+        Get every stored item in the rows of ``user_ids``, in CSR order.
+
+        Parameters
+        ----------
+        user_ids: torch.tensor, 1-d
+            Rows of the target matrix
+
+        Returns
+        -------
+        rows: torch.tensor, 1-d
+            Index into ``user_ids`` of the user of each stored item
+        positions: torch.tensor, 1-d
+            Position of each stored item within its user's row
+        items: torch.tensor, 1-d
+            Item ID of each stored item
+        is_positive: torch.tensor, 1-d
+            Whether each stored item is in the target set, i.e. is not an explicitly-stored zero
+
+        """
+        starts = self.indptr[user_ids]
+        n_targets = self.indptr[user_ids + 1] - starts
+
+        rows = torch.arange(len(user_ids), device=starts.device).repeat_interleave(n_targets)
+        row_starts = (n_targets.cumsum(dim=0) - n_targets).repeat_interleave(n_targets)
+        positions = torch.arange(len(rows), device=starts.device) - row_starts
+        entries = starts.repeat_interleave(n_targets) + positions
+
+        return rows, positions, self.indices[entries], self.is_positive[entries]
+
+
+def _get_device_targets(
+    targets: Union[csr_matrix, DeviceTargets],
+    user_ids: (np.array, torch.tensor),
+    device: Union[str, torch.device],
+) -> Tuple[DeviceTargets, torch.tensor]:
+    """
+    Get ``DeviceTargets`` and the rows of ``user_ids`` in them.
+
+    ``DeviceTargets`` are used as-is. For a ``csr_matrix``, only the rows for ``user_ids`` are
+    copied to the device.
+
+    """
+    if isinstance(targets, DeviceTargets):
+        return targets, torch.as_tensor(user_ids, dtype=torch.long, device=targets.device)
+
+    return (
+        DeviceTargets(targets[np.asarray(user_ids)], device=device),
+        torch.arange(len(user_ids), device=device),
+    )
+
+
+def _get_labels(targets: Union[csr_matrix, DeviceTargets],
                 user_ids: (np.array, torch.tensor),
                 preds: (np.array, torch.tensor),
                 device: str) -> torch.tensor:
@@ -111,7 +242,7 @@ def _get_labels(targets: csr_matrix,
 
     Parameters
     ----------
-    targets: scipy.sparse.csr_matrix
+    targets: scipy.sparse.csr_matrix or DeviceTargets
         Interaction matrix containing user and item IDs
     user_ids: np.array or torch.tensor
         Users corresponding to the recommendations in the top k predictions
@@ -126,19 +257,187 @@ def _get_labels(targets: csr_matrix,
         Tensor with the same dimensions as input ``preds``
 
     """
-    return torch.tensor(
-        (targets[user_ids[:, None], np.array(preds.detach().cpu())] > 0)
-        .astype('double')
-        .toarray(),
-        requires_grad=False,
-        device=device,
-    )
+    device_targets, rows = _get_device_targets(targets, user_ids, device=device)
+
+    return device_targets.contains(rows, preds.to(rows.device)).double()
+
+
+def _get_positive_scores(targets: Union[csr_matrix, DeviceTargets],
+                         user_ids: (np.array, torch.tensor),
+                         preds: torch.tensor) -> torch.tensor:
+    """
+    Gather each user's scores for the items in their target set.
+
+    Parameters
+    ----------
+    targets: scipy.sparse.csr_matrix or DeviceTargets
+        Interaction matrix containing user and item IDs
+    user_ids: np.array or torch.tensor
+        Users corresponding to the rows of ``preds``
+    preds: torch.tensor
+        Tensor of shape (n_users x n_items) with each user's scores for each item
+
+    Returns
+    -------
+    positive_scores: torch.tensor
+        Tensor of shape (n_users x max number of target items for a single user), with each row
+        padded with ``-inf`` after the user's positive item scores
+
+    """
+    device_targets, user_rows = _get_device_targets(targets, user_ids, device=preds.device)
+
+    # only the ``nnz`` stored scores are gathered rather than a dense ``n_users x n_items`` mask
+    rows, positions, items, is_positive = device_targets.row_entries(user_rows)
+
+    scores = preds[rows, items]
+    scores[~is_positive] = -float('inf')
+
+    max_n_targets = int(positions.max()) + 1 if len(positions) > 0 else 1
+    positive_scores = torch.full((len(user_rows), max_n_targets),
+                                 -float('inf'),
+                                 dtype=preds.dtype,
+                                 device=preds.device)
+    positive_scores[rows, positions] = scores
+
+    return positive_scores
+
+
+def _get_dense_targets(targets: Union[csr_matrix, DeviceTargets],
+                       user_ids: (np.array, torch.tensor),
+                       device: Union[str, torch.device]) -> torch.tensor:
+    """
+    Returns a binary tensor marking which items are in each user's target set.
+
+    Parameters
+    ----------
+    targets: scipy.sparse.csr_matrix or DeviceTargets
+        Interaction matrix containing user and item IDs
+    user_ids: np.array or torch.tensor
+        Users to get targets for
+    device: string
+        Device torch should use
+
+    Returns
+    -------
+    dense_targets: torch.tensor
+        Boolean tensor of shape (n_users x n_items)
+
+    """
+    device_targets, user_rows = _get_device_targets(targets, user_ids, device=device)
+    rows, _, items, is_positive = device_targets.row_entries(user_rows)
+
+    dense_targets = torch.zeros((len(user_rows), device_targets.shape[1]),
+                                dtype=torch.bool,
+                                device=user_rows.device)
+    dense_targets[rows, items] = is_positive
+
+    return dense_targets
+
+
+class EvaluationBatch:
+    """
+    Intermediate results shared by every metric evaluated on the same batch of users.
+
+    Each intermediate is computed the first time a metric needs it and cached, so metrics like
+    ``mapk``, ``ndcgk``, and ``recallk`` evaluated on the same batch share a single ``topk`` and
+    lookup of which recommended items are in each user's target set. ``evaluate_in_batches``
+    creates one ``EvaluationBatch`` for each batch and passes it to every metric that accepts a
+    ``batch`` keyword argument.
+
+    All target lookups are done on the same device as ``preds`` with ``DeviceTargets``. If
+    ``targets`` is a ``csr_matrix``, only the rows for ``user_ids`` are copied to the device.
+
+    Parameters
+    ----------
+    targets: scipy.sparse.csr_matrix or DeviceTargets
+        Interaction matrix containing user and item IDs
+    user_ids: np.array or torch.tensor
+        Users corresponding to the rows of ``preds``
+    preds: torch.tensor
+        Tensor of shape (n_users x n_items) with each user's scores for each item
+
+    """
+    def __init__(self,
+                 targets: Union[csr_matrix, DeviceTargets],
+                 user_ids: (np.array, torch.tensor),
+                 preds: torch.tensor):
+        self.user_ids = user_ids
+        self.preds = preds
+        self.device_targets, self.rows = _get_device_targets(targets,
+                                                             user_ids,
+                                                             device=preds.device)
+
+        self._topk_items = None
+        self._topk_hits = None
+        self._n_targets = None
+        self._positive_scores = None
+        self._dense_targets = None
+
+    def topk_items(self, k: int) -> torch.tensor:
+        """
+        Get the IDs of each user's ``k`` highest-scoring items, in descending order of score.
+
+        Results for the largest ``k`` requested so far are cached and sliced for any smaller ``k``.
+
+        """
+        if self._topk_items is None or self._topk_items.shape[1] < k:
+            try:
+                self._topk_items = self.preds.topk(k, dim=1).indices
+            except RuntimeError as e:
+                raise ValueError(
+                    f'Ensure ``k`` ({k}) is less than the number of items ({self.preds.shape[1]}):',
+                    str(e),
+                )
+            self._topk_hits = None
+
+        return self._topk_items[:, :k]
+
+    def topk_hits(self, k: int) -> torch.tensor:
+        """Get a binary ``double`` tensor marking which of ``topk_items(k)`` are targets."""
+        topk_items = self.topk_items(k)
+
+        if self._topk_hits is None:
+            self._topk_hits = _get_labels(targets=self.device_targets,
+                                          user_ids=self.rows,
+                                          preds=self._topk_items,
+                                          device=self.preds.device)
+
+        return self._topk_hits[:, :topk_items.shape[1]]
+
+    @property
+    def n_targets(self) -> torch.tensor:
+        """Number of items in each user's target set."""
+        if self._n_targets is None:
+            self._n_targets = self.device_targets.n_targets(self.rows)
+
+        return self._n_targets
+
+    @property
+    def positive_scores(self) -> torch.tensor:
+        """Each user's scores for their target items, padded with ``-inf``."""
+        if self._positive_scores is None:
+            self._positive_scores = _get_positive_scores(self.device_targets,
+                                                         self.rows,
+                                                         self.preds)
+
+        return self._positive_scores
+
+    @property
+    def dense_targets(self) -> torch.tensor:
+        """Boolean tensor of shape (n_users x n_items) marking each user's target items."""
+        if self._dense_targets is None:
+            self._dense_targets = _get_dense_targets(self.device_targets,
+                                                     self.rows,
+                                                     device=self.preds.device)
+
+        return self._dense_targets
 
 
 def mapk(targets: csr_matrix,
          user_ids: (np.array, torch.tensor),
          preds: (np.array, torch.tensor),
-         k: int = 10) -> float:
+         k: int = 10,
+         batch: Optional[EvaluationBatch] = None) -> float:
     """
     Calculate the mean average precision at K (MAP@K) score for each user.
 
@@ -152,24 +451,21 @@ def mapk(targets: csr_matrix,
         Tensor of shape (n_users x n_items) with each user's scores for each item
     k: int
         Number of recommendations to consider per user
+    batch: EvaluationBatch
+        Intermediate results shared with other metrics for the same ``preds``. If ``None``, these
+        are computed from ``targets``, ``user_ids``, and ``preds``
 
     Returns
     -------
     mapk_score: float
 
     """
-    device = preds.device
-    n_users = preds.shape[0]
+    if batch is None:
+        batch = EvaluationBatch(targets=targets, user_ids=user_ids, preds=preds)
 
-    try:
-        predicted_items = preds.topk(k, dim=1).indices
-    except RuntimeError as e:
-        raise ValueError(
-            f'Ensure ``k`` ({k}) is less than the number of items ({preds.shape[1]}):', str(e)
-        )
+    device = batch.preds.device
 
-    topk_labeled = _get_labels(targets, user_ids, predicted_items, device)
-    accuracy = topk_labeled.int()
+    accuracy = batch.topk_hits(k).int()
 
     weights = (
         1.0 / torch.arange(
@@ -179,26 +475,214 @@ def mapk(targets: csr_matrix,
             requires_grad=False,
             device=device
         )
-    ).repeat(n_users, 1)
-
-    denominator = torch.min(
-        torch.tensor(k, device=device, dtype=torch.int).repeat(len(user_ids)),
-        torch.tensor(targets[user_ids].getnnz(axis=1), device=device)
     )
 
+    denominator = torch.clamp(batch.n_targets, max=k)
+
     res = ((accuracy * accuracy.cumsum(axis=1) * weights).sum(axis=1)) / denominator
     res[torch.isnan(res)] = 0
 
     return res.mean().item()
 
 
+def ndcgk(targets: csr_matrix,
+          user_ids: (np.array, torch.tensor),
+          preds: (np.array, torch.tensor),
+          k: int = 10,
+          batch: Optional[EvaluationBatch] = None) -> float:
+    """
+    Calculate the mean normalized discounted cumulative gain at K (NDCG@K) score for each user.
+
+    Parameters
+    ----------
+    targets: scipy.sparse.csr_matrix
+        Interaction matrix containing user and item IDs
+    user_ids: np.array or torch.tensor
+        Users corresponding to the recommendations in the top k predictions
+    preds: torch.tensor
+        Tensor of shape (n_users x n_items) with each user's scores for each item
+    k: int
+        Number of recommendations to consider per user
+    batch: EvaluationBatch
+        Intermediate results shared with other metrics for the same ``preds``. If ``None``, these
+        are computed from ``targets``, ``user_ids``, and ``preds``
+
+    Returns
+    -------
+    ndcgk_score: float
+
+    """
+    if batch is None:
+        batch = EvaluationBatch(targets=targets, user_ids=user_ids, preds=preds)
+
+    discounts = 1.0 / torch.log2(
+        torch.arange(2, k + 2, dtype=torch.float64, device=batch.preds.device)
+    )
+
+    dcg = (batch.topk_hits(k) * discounts).sum(dim=1)
+
+    # the ideal ranking places all of a user's target items first, up to ``k`` of them
+    ideal_hits = torch.clamp(batch.n_targets, max=k)
+    idcg = torch.cat([discounts.new_zeros(1), discounts.cumsum(dim=0)])[ideal_hits]
+
+    res = dcg / idcg
+    res[torch.isnan(res)] = 0
+
+    return res.mean().item()
+
+
+def precisionk(targets: csr_matrix,
+               user_ids: (np.array, torch.tensor),
+               preds: (np.array, torch.tensor),
+               k: int = 10,
+               batch: Optional[EvaluationBatch] = None) -> float:
+    """
+    Calculate the mean fraction of each user's top ``k`` recommendations that are target items.
+
+    Parameters
+    ----------
+    targets: scipy.sparse.csr_matrix
+        Interaction matrix containing user and item IDs
+    user_ids: np.array or torch.tensor
+        Users corresponding to the recommendations in the top k predictions
+    preds: torch.tensor
+        Tensor of shape (n_users x n_items) with each user's scores for each item
+    k: int
+        Number of recommendations to consider per user
+    batch: EvaluationBatch
+        Intermediate results shared with other metrics for the same ``preds``. If ``None``, these
+        are computed from ``targets``, ``user_ids``, and ``preds``
+
+    Returns
+    -------
+    precisionk_score: float
+
+    """
+    if batch is None:
+        batch = EvaluationBatch(targets=targets, user_ids=user_ids, preds=preds)
+
+    return (batch.topk_hits(k).sum(dim=1) / k).mean().item()
+
+
+def recallk(targets: csr_matrix,
+            user_ids: (np.array, torch.tensor),
+            preds: (np.array, torch.tensor),
+            k: int = 10,
+            batch: Optional[EvaluationBatch] = None) -> float:
+    """
+    Calculate the mean fraction of each user's target items in their top ``k`` recommendations.
+
+    Parameters
+    ----------
+    targets: scipy.sparse.csr_matrix
+        Interaction matrix containing user and item IDs
+    user_ids: np.array or torch.tensor
+        Users corresponding to the recommendations in the top k predictions
+    preds: torch.tensor
+        Tensor of shape (n_users x n_items) with each user's scores for each item
+    k: int
+        Number of recommendations to consider per user
+    batch: EvaluationBatch
+        Intermediate results shared with other metrics for the same ``preds``. If ``None``, these
+        are computed from ``targets``, ``user_ids``, and ``preds``
+
+    Returns
+    -------
+    recallk_score: float
+
+    """
+    if batch is None:
+        batch = EvaluationBatch(targets=targets, user_ids=user_ids, preds=preds)
+
+    res = batch.topk_hits(k).sum(dim=1) / batch.n_targets
+    res[torch.isnan(res)] = 0
+
+    return res.mean().item()
+
+
+def hit_ratek(targets: csr_matrix,
+              user_ids: (np.array, torch.tensor),
+              preds: (np.array, torch.tensor),
+              k: int = 10,
+              batch: Optional[EvaluationBatch] = None) -> float:
+    """
+    Calculate the fraction of users with at least one target item in their top ``k``
+    recommendations.
+
+    Parameters
+    ----------
+    targets: scipy.sparse.csr_matrix
+        Interaction matrix containing user and item IDs
+    user_ids: np.array or torch.tensor
+        Users corresponding to the recommendations in the top k predictions
+    preds: torch.tensor
+        Tensor of shape (n_users x n_items) with each user's scores for each item
+    k: int
+        Number of recommendations to consider per user
+    batch: EvaluationBatch
+        Intermediate results shared with other metrics for the same ``preds``. If ``None``, these
+        are computed from ``targets``, ``user_ids``, and ``preds``
+
+    Returns
+    -------
+    hit_ratek_score: float
+
+    """
+    if batch is None:
+        batch = EvaluationBatch(targets=targets, user_ids=user_ids, preds=preds)
+
+    return (batch.topk_hits(k).sum(dim=1) > 0).double().mean().item()
+
+
+def coverage(targets: csr_matrix,
+             user_ids: (np.array, torch.tensor),
+             preds: (np.array, torch.tensor),
+             k: int = 10,
+             batch: Optional[EvaluationBatch] = None) -> float:
+    """
+    Calculate the fraction of all items recommended in the top ``k`` of at least one user.
+
+    Unlike other metrics, catalog coverage is not an average over users, so ``evaluate_in_batches``
+    computes it over the recommendations for all users together rather than averaging the
+    coverage of each batch.
+
+    Parameters
+    ----------
+    targets: scipy.sparse.csr_matrix
+        Interaction matrix containing user and item IDs
+    user_ids: np.array or torch.tensor
+        Users corresponding to the recommendations in the top k predictions
+    preds: torch.tensor
+        Tensor of shape (n_users x n_items) with each user's scores for each item
+    k: int
+        Number of recommendations to consider per user
+    batch: EvaluationBatch
+        Intermediate results shared with other metrics for the same ``preds``. If ``None``, these
+        are computed from ``targets``, ``user_ids``, and ``preds``
+
+    Returns
+    -------
+    coverage_score: float
+
+    """
+    if batch is None:
+        batch = EvaluationBatch(targets=targets, user_ids=user_ids, preds=preds)
+
+    return batch.topk_items(k).unique().numel() / batch.preds.shape[1]
+
+
 def mrr(targets: csr_matrix,
         user_ids: (np.array, torch.tensor),
         preds: (np.array, torch.tensor),
-        k: Optional[Any] = None) -> float:
+        k: Optional[Any] = None,
+        batch: Optional[EvaluationBatch] = None) -> float:
     """
     Calculate the mean reciprocal rank (MRR) of the input predictions.
 
+    The rank of each user's highest-scoring positive item is one more than the number of items
+    scoring strictly higher than it, so no sort of the full catalog is needed. Items with the same
+    score as the highest-scoring positive item are ranked after it.
+
     Parameters
     ----------
     targets: scipy.sparse.csr_matrix
@@ -209,27 +693,25 @@ def mrr(targets: csr_matrix,
         Tensor of shape (n_users x n_items) with each user's scores for each item
     k: Any
         Ignored, included only for compatibility with ``mapk``
+    batch: EvaluationBatch
+        Intermediate results shared with other metrics for the same ``preds``. If ``None``, these
+        are computed from ``targets``, ``user_ids``, and ``preds``
 
     Returns
     -------
     mrr_score: float
 
     """
-    predicted_items = preds.topk(preds.shape[1], dim=1).indices
-    labeled = _get_labels(targets, user_ids, predicted_items, device=preds.device)
+    if batch is None:
+        batch = EvaluationBatch(targets=targets, user_ids=user_ids, preds=preds)
 
-    # weighting each 0/1 by position so that topk returns index of *first* postive result
-    position_weight = 1.0/(
-        torch.arange(1, targets.shape[1] + 1, device=preds.device)
-        .repeat(len(user_ids), 1)
-        .float()
-    )
-    labeled_weighted = (labeled.float() * position_weight)
+    best_positive_scores = batch.positive_scores.max(dim=1).values
 
-    highest_score, rank = labeled_weighted.topk(k=1)
+    rank = (batch.preds > best_positive_scores.unsqueeze(1)).sum(dim=1) + 1
 
-    reciprocal_rank = 1.0/(rank.float() + 1)
-    reciprocal_rank[highest_score == 0] = 0
+    reciprocal_rank = 1.0 / rank.float()
+    # users without any positive items have no rank
+    reciprocal_rank[best_positive_scores == -float('inf')] = 0
 
     return reciprocal_rank.mean().item()
 
@@ -237,10 +719,18 @@ def mrr(targets: csr_matrix,
 def auc(targets: csr_matrix,
         user_ids: (np.array, torch.tensor),
         preds: (np.array, torch.tensor),
-        k: Optional[Any] = None) -> float:
+        k: Optional[Any] = None,
+        batch: Optional[EvaluationBatch] = None) -> float:
     """
     Calculate the area under the ROC curve (AUC) for each user and average the results.
 
+    AUC is computed for all users at once from the ranks of each user's positive items, i.e. the
+    Mann-Whitney U statistic, with tied scores given their average rank. Items scored ``-inf``,
+    such as items masked by ``exclude_interactions`` in ``evaluate_in_batches``, are left out
+    entirely rather than counted as the lowest-ranked items. Users with no positive or no negative
+    items left, e.g. when every target item is also excluded, have an undefined AUC and are left out
+    of the average. If no user has a defined AUC, ``0`` is returned.
+
     Parameters
     ----------
     targets: scipy.sparse.csr_matrix
@@ -251,36 +741,533 @@ def auc(targets: csr_matrix,
         Tensor of shape (n_users x n_items) with each user's scores for each item
     k: Any
         Ignored, included only for compatibility with ``mapk``
+    batch: EvaluationBatch
+        Intermediate results shared with other metrics for the same ``preds``. If ``None``, these
+        are computed from ``targets``, ``user_ids``, and ``preds``
 
     Returns
     -------
     auc_score: float
 
     """
-    agg = 0
-    for i, user_id in enumerate(user_ids):
-        target_tensor = torch.tensor(
-            targets[user_id].toarray(),
-            device=preds.device,
-            dtype=torch.long
-        ).view(-1)
-        # many models' ``preds`` may be unbounded if a final activation layer is not applied
-        # we have to normalize ``preds`` here to avoid a ``ValueError`` stating that ``preds``
-        # should be probabilities, but values were detected outside of [0,1] range
-        auc = auroc(torch.sigmoid(preds[i, :]), target=target_tensor, pos_label=1)
-        agg += auc
+    if batch is None:
+        batch = EvaluationBatch(targets=targets, user_ids=user_ids, preds=preds)
+
+    preds = batch.preds
+    labels = batch.dense_targets
+
+    # ranks are unchanged by ``sigmoid``, except for scores large enough to saturate to the same
+    # value, so ``preds`` are normalized first to tie exactly the same items as before. Excluded
+    # items are then placed strictly below every other item, so they only shift other items' ranks
+    is_excluded = preds == -float('inf')
+    sorted_preds, sorted_idxs = (
+        torch.sigmoid(preds).double().masked_fill(is_excluded, -1).sort(dim=1)
+    )
+    sorted_labels = labels.masked_fill(is_excluded, 0).gather(1, sorted_idxs).double()
+
+    # the average (1-indexed) rank of each group of tied scores is the mean of its first and last
+    # positions, found with a running max of group starts and a reversed running min of group ends
+    n_items = sorted_preds.shape[1]
+    positions = torch.arange(n_items, device=preds.device).expand_as(sorted_preds)
+    is_new_value = torch.ones_like(sorted_preds, dtype=torch.bool)
+    is_new_value[:, 1:] = sorted_preds[:, 1:] != sorted_preds[:, :-1]
+    is_last_value = torch.ones_like(is_new_value)
+    is_last_value[:, :-1] = is_new_value[:, 1:]
+
+    group_starts = torch.where(
+        is_new_value, positions, torch.zeros_like(positions)
+    ).cummax(dim=1).values
+    group_ends = torch.where(
+        is_last_value, positions, torch.full_like(positions, n_items)
+    ).flip(dims=[1]).cummin(dim=1).values.flip(dims=[1])
+    average_ranks = (group_starts + group_ends).double() / 2 + 1
+
+    n_excluded = is_excluded.sum(dim=1)
+    n_positive = sorted_labels.sum(dim=1)
+    n_negative = n_items - n_excluded - n_positive
+
+    positive_rank_sums = (average_ranks * sorted_labels).sum(dim=1) - n_positive * n_excluded
+    user_aucs = (
+        (positive_rank_sums - n_positive * (n_positive + 1) / 2) / (n_positive * n_negative)
+    )
+
+    # users with no positive or no negative items would otherwise have a ``0 / 0 = nan`` AUC
+    is_defined = (n_positive > 0) & (n_negative > 0)
+    if not is_defined.any():
+        return 0.0
+
+    return user_aucs[is_defined].mean().item()
+
+
+def _is_out_of_memory_error(error: BaseException) -> bool:
+    """Check if an error was raised by a failed CPU or GPU memory allocation."""
+    return isinstance(error, MemoryError) or (
+        isinstance(error, RuntimeError)
+        and ('out of memory' in str(error) or "can't allocate memory" in str(error))
+    )
+
+
+def _mask_excluded_items(preds: torch.tensor,
+                         exclude_targets: DeviceTargets,
+                         user_ids: (np.array, torch.tensor)) -> torch.tensor:
+    """
+    Set the scores of each user's items in ``exclude_targets`` to ``-inf`` in place.
+
+    The users' rows are sliced from the CSR tensors already on the device and scattered into
+    ``preds`` with a single indexed assignment, so masking costs one write per excluded item.
+
+    """
+    rows, _, items, is_positive = exclude_targets.row_entries(
+        torch.as_tensor(user_ids, dtype=torch.long, device=exclude_targets.device)
+    )
+
+    preds[rows[is_positive].to(preds.device), items[is_positive].to(preds.device)] = -float('inf')
+
+    return preds
+
+
+def _evaluate_batches(
+    metric_list: List[Callable],
+    accepts_batch: List[bool],
+    batch_idxs: Iterable[int],
+    test_users: np.array,
+    batch_size: int,
+    targets: csr_matrix,
+    device_targets: DeviceTargets,
+    model: 'collie_recs.model.BasePipeline',
+    num_items: int,
+    k: int,
+    device: Union[str, torch.device],
+    on_batch_end: Optional[Callable[[], Any]] = None,
+    back_off_on_out_of_memory: bool = False,
+    exclude_targets: Optional[DeviceTargets] = None,
+) -> Tuple[List[float], torch.tensor]:
+    """
+    Score batches ``batch_idxs`` of ``test_users`` and evaluate every metric on each.
 
-    return (agg/len(user_ids)).item()
+    Returns the sum of each metric's score weighted by the number of users in each batch, and a
+    boolean tensor marking every item recommended in any user's top ``k`` for ``coverage``.
+
+    With ``back_off_on_out_of_memory``, a batch that fails to allocate memory is retried in chunks
+    of half as many users, and all later batches are evaluated in chunks of that size as well.
+
+    """
+    accumulators = [0] * len(metric_list)
+    # catalog coverage is a property of all users' recommendations together, so the items
+    # recommended to any user are tracked across batches instead of averaging each batch's coverage
+    recommended_items = torch.zeros(num_items, dtype=torch.bool, device=device)
+
+    chunk_size = batch_size
+    for i in batch_idxs:
+        user_range = test_users[i * batch_size:(i + 1) * batch_size]
+
+        start = 0
+        while start < len(user_range):
+            user_chunk = user_range[start:start + chunk_size]
+            try:
+                chunk_scores = _evaluate_users(metric_list=metric_list,
+                                               accepts_batch=accepts_batch,
+                                               user_ids=user_chunk,
+                                               targets=targets,
+                                               device_targets=device_targets,
+                                               model=model,
+                                               num_items=num_items,
+                                               k=k,
+                                               device=device,
+                                               recommended_items=recommended_items,
+                                               exclude_targets=exclude_targets)
+            except (RuntimeError, MemoryError) as error:
+                if (
+                    not back_off_on_out_of_memory
+                    or chunk_size == 1
+                    or not _is_out_of_memory_error(error)
+                ):
+                    raise
+
+                chunk_size = max(1, chunk_size // 2)
+                if torch.cuda.is_available():
+                    torch.cuda.empty_cache()
+
+                warnings.warn(
+                    f'Ran out of memory evaluating {len(user_chunk)} users at once, retrying with'
+                    f' {chunk_size} users.',
+                    ResourceWarning,
+                )
+                continue
+
+            for metric_ind, score in enumerate(chunk_scores):
+                accumulators[metric_ind] += (score * len(user_chunk))
+            start += len(user_chunk)
+
+        if on_batch_end is not None:
+            on_batch_end()
+
+    return accumulators, recommended_items
+
+
+def _evaluate_users(metric_list: List[Callable],
+                    accepts_batch: List[bool],
+                    user_ids: np.array,
+                    targets: csr_matrix,
+                    device_targets: DeviceTargets,
+                    model: 'collie_recs.model.BasePipeline',
+                    num_items: int,
+                    k: int,
+                    device: Union[str, torch.device],
+                    recommended_items: torch.tensor,
+                    target_rows: Optional[np.array] = None,
+                    exclude_targets: Optional[DeviceTargets] = None) -> List[float]:
+    """
+    Score ``user_ids`` and evaluate every metric, marking their top ``k`` items for coverage.
+
+    ``target_rows`` are the rows of ``targets`` for each user, if not the user IDs themselves.
+    Items in each user's row of ``exclude_targets`` are scored ``-inf`` before any metric.
+
+    """
+    with record_function('collie_recs.get_preds'):
+        preds = get_preds(model, user_ids, num_items, device)
+
+    if exclude_targets is not None:
+        with record_function('collie_recs.mask_excluded_items'):
+            _mask_excluded_items(preds, exclude_targets=exclude_targets, user_ids=user_ids)
+
+    if target_rows is not None:
+        user_ids = target_rows
+
+    batch = EvaluationBatch(targets=device_targets, user_ids=user_ids, preds=preds)
+
+    scores = []
+    for metric_ind, metric in enumerate(metric_list):
+        metric_name = getattr(metric, '__name__', str(metric))
+        with record_function(f'collie_recs.metrics.{metric_name}'):
+            if metric is coverage:
+                recommended_items[batch.topk_items(k).flatten()] = True
+                scores.append(0)
+                continue
+
+            metric_kwargs = {'batch': batch} if accepts_batch[metric_ind] else {}
+            scores.append(
+                metric(targets=targets, user_ids=user_ids, preds=preds, k=k, **metric_kwargs)
+            )
+
+    return scores
+
+
+# rough number of bytes of intermediate tensors each metric allocates for each scored item, used to
+# pick the number of users to score at once in ``evaluate_in_batches`` with a ``memory_budget``.
+# Metrics not listed here are assumed to make a double-precision copy of their ``preds``
+_METRIC_BYTES_PER_ITEM = {
+    mapk: 8,
+    ndcgk: 8,
+    precisionk: 8,
+    recallk: 8,
+    hit_ratek: 8,
+    coverage: 8,
+    mrr: 8,
+    auc: 136,
+}
+
+
+def _estimate_bytes_per_user(model: 'collie_recs.model.BasePipeline',
+                             num_items: int,
+                             metric_list: List[Callable]) -> int:
+    """
+    Estimate the peak memory needed to score and evaluate a single user against all items.
+
+    Scoring a user allocates ``int64`` user and item ID tensors and a score for every item, and
+    the model's forward pass allocates the output of each embedding lookup and linear layer for
+    every item, counted twice to cover elementwise intermediates like activations and dropout.
+    Metrics are evaluated one at a time, so only the most expensive metric is counted.
+
+    """
+    element_size = next(
+        (parameter.element_size() for parameter in model.parameters()
+         if parameter.is_floating_point()),
+        4,
+    )
+
+    activation_width = 0
+    for module in model.modules():
+        if isinstance(module, torch.nn.Linear):
+            activation_width += module.out_features
+        elif hasattr(module, 'embedding_dim'):
+            # ``torch.nn.Embedding`` layers and quantized embeddings alike
+            activation_width += module.embedding_dim
+
+    bytes_per_item = (
+        2 * 8  # user and item IDs
+        + element_size  # scores
+        + 2 * activation_width * element_size
+        + max(_METRIC_BYTES_PER_ITEM.get(metric, 16) for metric in metric_list)
+    )
+
+    return num_items * bytes_per_item
+
+
+def _evaluate_batches_worker(connection: Connection, num_threads: int, **kwargs) -> None:
+    """Evaluate a partition of batches in a forked process, reporting back over ``connection``."""
+    torch.set_num_threads(num_threads)
+
+    try:
+        # ``None`` marks the end of each batch for the progress bar in the main process
+        accumulators, recommended_items = _evaluate_batches(
+            on_batch_end=lambda: connection.send(None), **kwargs
+        )
+
+        # tensors are sent as handles to shared memory owned by this process, which can no longer
+        # be opened once it exits, so results are sent as plain floats and a NumPy array instead
+        connection.send(
+            ([float(score) for score in accumulators], recommended_items.cpu().numpy())
+        )
+    except Exception as exception:
+        connection.send(exception)
+    finally:
+        connection.close()
+
+
+def _evaluate_batches_in_parallel(
+    n_jobs: int,
+    n_batches: int,
+    verbose: bool,
+    **kwargs,
+) -> Tuple[List[float], torch.tensor]:
+    """
+    Evaluate ``n_batches`` batches across ``n_jobs`` forked processes.
+
+    The model and targets are moved to shared memory, so workers read the same weights without
+    copies. Each worker is limited to an even share of the ``torch`` threads available to the main
+    process so that workers do not oversubscribe CPU cores.
+
+    """
+    if 'fork' not in multiprocessing.get_all_start_methods():
+        raise ValueError('``n_jobs`` greater than ``1`` requires the ``fork`` start method.')
+
+    kwargs['model'].share_memory()
+    kwargs['device_targets'].share_memory()
+    if kwargs.get('exclude_targets') is not None:
+        kwargs['exclude_targets'].share_memory()
+
+    num_threads = max(1, torch.get_num_threads() // n_jobs)
+
+    context = multiprocessing.get_context('fork')
+    processes, connections = [], {}
+    for rank in range(n_jobs):
+        parent_connection, child_connection = context.Pipe()
+        process = context.Process(target=_evaluate_batches_worker,
+                                  kwargs={'connection': child_connection,
+                                          'num_threads': num_threads,
+                                          'batch_idxs': range(rank, n_batches, n_jobs),
+                                          **kwargs})
+        process.start()
+        child_connection.close()
+
+        processes.append(process)
+        connections[parent_connection] = rank
+
+    progress_bar = None
+    if verbose:
+        from tqdm.auto import tqdm
+
+        progress_bar = tqdm(total=n_batches)
+
+    results = []
+    try:
+        while connections:
+            for connection in wait(list(connections)):
+                try:
+                    message = connection.recv()
+                except EOFError:
+                    raise RuntimeError(
+                        f'Evaluation worker {connections[connection]} exited unexpectedly!'
+                    )
+
+                if message is None:
+                    if progress_bar is not None:
+                        progress_bar.update(1)
+                    continue
+
+                if isinstance(message, Exception):
+                    raise message
+
+                results.append(message)
+                del connections[connection]
+    except BaseException:
+        for process in processes:
+            process.terminate()
+        raise
+    finally:
+        for process in processes:
+            process.join()
+        if progress_bar is not None:
+            progress_bar.close()
+
+    accumulators = [sum(metric_sums) for metric_sums in zip(*[result[0] for result in results])]
+    recommended_items = torch.from_numpy(np.stack([result[1] for result in results]).any(axis=0))
+
+    return accumulators, recommended_items
+
+
+# number of rows of HDF5 test data read at once, matching the default ``chunksize`` of Pandas
+_HDF5_CHUNK_SIZE = 100000
+
+
+def _stream_hdf5_user_batches(
+    test_interactions: collie_recs.interactions.HDF5Interactions,
+    batch_size: int,
+    progress_bar: Optional[Any] = None,
+) -> Iterable[Tuple[np.array, csr_matrix]]:
+    """
+    Read user-sorted HDF5 test data in chunks, yielding batches of ``batch_size`` users.
+
+    Each batch is yielded as the user IDs and a ``len(user_ids) x num_items`` CSR matrix of their
+    target items. Since a user's interactions may continue into the next chunk, the last user of
+    each chunk is held back until the next chunk is read, so only the interactions of fewer than
+    ``batch_size`` users and one chunk are ever in memory.
+
+    """
+    import pandas as pd
+
+    num_items = test_interactions.num_items
+
+    pending_users = np.array([], dtype=np.int64)
+    pending_items = np.array([], dtype=np.int64)
+    previous_user = -1
+
+    with pd.HDFStore(test_interactions.hdf5_path, mode='r') as store:
+        for start in range(0, test_interactions.num_interactions, _HDF5_CHUNK_SIZE):
+            chunk = store.select('interactions', start=start, stop=start + _HDF5_CHUNK_SIZE)
+            chunk_users = chunk[test_interactions.user_col].to_numpy().astype(np.int64)
+            chunk_items = chunk[test_interactions.item_col].to_numpy().astype(np.int64)
+
+            if progress_bar is not None:
+                progress_bar.update(len(chunk))
+
+            if len(chunk_users) == 0:
+                continue
+
+            if chunk_users[0] < previous_user or (np.diff(chunk_users) < 0).any():
+                raise ValueError(
+                    'HDF5 test data must be sorted by user ID to be evaluated in chunks.'
+                )
+            previous_user = chunk_users[-1]
+
+            pending_users = np.concatenate([pending_users, chunk_users])
+            pending_items = np.concatenate([pending_items, chunk_items])
+
+            user_starts = np.concatenate([[0], np.flatnonzero(np.diff(pending_users)) + 1])
+            unique_users = pending_users[user_starts]
+            user_starts = np.append(user_starts, len(pending_users))
+
+            is_last_chunk = start + _HDF5_CHUNK_SIZE >= test_interactions.num_interactions
+            n_complete_users = len(unique_users) if is_last_chunk else len(unique_users) - 1
+
+            batch_start = 0
+            while (
+                n_complete_users - batch_start >= batch_size
+                or (is_last_chunk and batch_start < n_complete_users)
+            ):
+                batch_end = min(batch_start + batch_size, n_complete_users)
+                first_row, last_row = user_starts[batch_start], user_starts[batch_end]
+
+                rows = np.repeat(np.arange(batch_end - batch_start),
+                                 np.diff(user_starts[batch_start:batch_end + 1]))
+                batch_targets = csr_matrix(
+                    (np.ones(len(rows)), (rows, pending_items[first_row:last_row])),
+                    shape=(batch_end - batch_start, num_items),
+                )
+
+                yield unique_users[batch_start:batch_end], batch_targets
+
+                batch_start = batch_end
+
+            pending_users = pending_users[user_starts[batch_start]:]
+            pending_items = pending_items[user_starts[batch_start]:]
+
+
+def _evaluate_hdf5_batches(
+    metric_list: List[Callable],
+    accepts_batch: List[bool],
+    test_interactions: collie_recs.interactions.HDF5Interactions,
+    batch_size: int,
+    model: 'collie_recs.model.BasePipeline',
+    k: int,
+    device: Union[str, torch.device],
+    verbose: bool,
+    on_batch_end: Optional[Callable[[], Any]] = None,
+    exclude_targets: Optional[DeviceTargets] = None,
+) -> Tuple[List[float], torch.tensor, int]:
+    """
+    Stream batches of users from HDF5 test data and evaluate every metric on each.
+
+    Returns the same metric sums and recommended items as ``_evaluate_batches``, along with the
+    number of users evaluated.
+
+    """
+    accumulators = [0] * len(metric_list)
+    recommended_items = torch.zeros(test_interactions.num_items, dtype=torch.bool, device=device)
+    n_test_users = 0
+
+    progress_bar = None
+    if verbose:
+        from tqdm.auto import tqdm
+
+        progress_bar = tqdm(total=test_interactions.num_interactions)
+
+    user_batches = _stream_hdf5_user_batches(test_interactions=test_interactions,
+                                             batch_size=batch_size,
+                                             progress_bar=progress_bar)
+
+    try:
+        for user_ids, batch_targets in user_batches:
+            batch_scores = _evaluate_users(metric_list=metric_list,
+                                           accepts_batch=accepts_batch,
+                                           user_ids=user_ids,
+                                           targets=batch_targets,
+                                           device_targets=DeviceTargets(batch_targets,
+                                                                        device=device),
+                                           model=model,
+                                           num_items=test_interactions.num_items,
+                                           k=k,
+                                           device=device,
+                                           recommended_items=recommended_items,
+                                           target_rows=np.arange(len(user_ids)),
+                                           exclude_targets=exclude_targets)
+
+            for metric_ind, score in enumerate(batch_scores):
+                accumulators[metric_ind] += (score * len(user_ids))
+            n_test_users += len(user_ids)
+
+            if on_batch_end is not None:
+                on_batch_end()
+    finally:
+        if progress_bar is not None:
+            progress_bar.close()
+
+    return accumulators, recommended_items, n_test_users
+
+
+def _accepts_evaluation_batch(metric: Callable) -> bool:
+    """Check if a metric function accepts a ``batch`` keyword argument."""
+    try:
+        return 'batch' in inspect.signature(metric).parameters
+    except (TypeError, ValueError):
+        # some callables, e.g. builtins, have no signature to inspect
+        return False
 
 
 def evaluate_in_batches(
     metric_list: Iterable[Callable],
-    test_interactions: collie_recs.interactions.Interactions,
-    model: collie_recs.model.BasePipeline,
+    test_interactions: Union[collie_recs.interactions.Interactions,
+                             collie_recs.interactions.HDF5Interactions],
+    model: 'collie_recs.model.BasePipeline',
     k: int = 10,
     batch_size: int = 20,
-    logger: pytorch_lightning.loggers.base.LightningLoggerBase = None,
+    logger: 'pytorch_lightning.loggers.base.LightningLoggerBase' = None,
     verbose: bool = True,
+    profile: Optional[Union[str, Dict[str, Any], 'collie_recs.model.TraceProfiler']] = None,
+    n_jobs: int = 1,
+    memory_budget: Optional[int] = None,
+    exclude_interactions: Optional[collie_recs.interactions.Interactions] = None,
 ) -> List[float]:
     """
     Evaluate a model with potentially several different metrics.
@@ -302,8 +1289,16 @@ def evaluate_in_batches(
 
         * ``k``
 
-    test_interactions: collie_recs.interactions.Interactions
-        Interactions to use as labels
+        Functions that also accept a ``batch`` keyword argument, like all metrics in this module,
+        are passed an ``EvaluationBatch`` shared by every metric for the same batch of users, so
+        intermediate results like the top ``k`` items and which of them are target items are only
+        computed once per batch. ``coverage`` is computed over all users rather than averaged over
+        batches
+    test_interactions: collie_recs.interactions.Interactions or HDF5Interactions
+        Interactions to use as labels. ``HDF5Interactions`` must be sorted by user ID, and are
+        streamed from disk in chunks, building targets for each batch of users as it is read, so
+        that only a bounded number of interactions are in memory at once. Batches that run out of
+        memory are not retried for ``HDF5Interactions``
     model: collie_recs.model.BasePipeline
         Model that can take a (user_id, item_id) pair as input and return a recommendation score
     k: int
@@ -319,6 +1314,29 @@ def evaluate_in_batches(
         model training
     verbose: bool
         Display progress bar and print statements during function execution
+    profile: str, dict, or collie_recs.model.TraceProfiler
+        If provided, profiles a window of evaluation batches with ``torch.profiler``, writing a
+        Chrome trace and a table of the most expensive operators to a directory, with scoring and
+        each metric labeled separately. See ``collie_recs.model.TraceProfiler`` for details
+    n_jobs: int
+        Number of processes to evaluate batches of users in parallel on the CPU. With ``n_jobs``
+        greater than ``1``, batches are evaluated in forked worker processes that share the model
+        weights and test targets in shared memory, each using an even share of the
+        ``torch.get_num_threads()`` threads available, and metric sums are aggregated in the main
+        process. If ``-1``, uses one process per CPU. Requires the ``fork`` start method and cannot
+        be combined with ``profile`` or ``HDF5Interactions``
+    memory_budget: int
+        If provided, ignores ``batch_size`` and instead scores as many users at once as fit in this
+        many bytes (for each process, with ``n_jobs``), estimated from the number of items, the
+        embedding and linear layers of ``model``, and the metrics in ``metric_list``. If a batch
+        still fails to allocate memory, it is retried with half as many users at a time, as are
+        all later batches
+    exclude_interactions: collie_recs.interactions.Interactions
+        If provided, e.g. the training data, items each user interacted with in these interactions
+        are scored ``-inf`` before any metric is computed, so they are never recommended or ranked
+        above other items, and are left out of ``auc``. These interactions are copied to the device
+        once as ``DeviceTargets``, and each batch's rows are scattered into its scores on the
+        device. Items that are also test targets are masked as well
 
     Returns
     -------
@@ -342,42 +1360,583 @@ def evaluate_in_batches(
         print(map_10_score, mrr_score, auc_score)
 
     """
-    device = 'cuda:0' if torch.cuda.is_available() else 'cpu'
+    if n_jobs == -1:
+        n_jobs = multiprocessing.cpu_count()
+    if n_jobs > 1 and profile:
+        raise ValueError('``profile`` cannot be used with ``n_jobs`` greater than ``1``.')
+
+    is_hdf5 = isinstance(test_interactions, collie_recs.interactions.HDF5Interactions)
+    if n_jobs > 1 and is_hdf5:
+        raise ValueError(
+            '``HDF5Interactions`` cannot be evaluated with ``n_jobs`` greater than ``1``.'
+        )
+
+    # parallel evaluation is CPU-only, since worker processes cannot share a CUDA context
+    device = 'cuda:0' if torch.cuda.is_available() and n_jobs <= 1 else 'cpu'
     model.to(device)
 
-    test_users = np.unique(test_interactions.mat.row)
+    metric_list = list(metric_list)
+    accepts_batch = [_accepts_evaluation_batch(metric) for metric in metric_list]
+
+    exclude_targets = None
+    if exclude_interactions is not None:
+        exclude_targets = DeviceTargets(exclude_interactions.mat.tocsr(), device=device)
+
+    if memory_budget is not None:
+        batch_size = max(
+            1,
+            memory_budget // _estimate_bytes_per_user(model=model,
+                                                      num_items=test_interactions.num_items,
+                                                      metric_list=metric_list),
+        )
+
+    trace_profiler = None
+    if profile:
+        from collie_recs.model.base.profiling import get_trace_profiler
+
+        trace_profiler = get_trace_profiler(profile)
+        trace_profiler.start()
+
+    try:
+        if is_hdf5:
+            accumulators, recommended_items, n_test_users = _evaluate_hdf5_batches(
+                metric_list=metric_list,
+                accepts_batch=accepts_batch,
+                test_interactions=test_interactions,
+                batch_size=batch_size,
+                model=model,
+                k=k,
+                device=device,
+                verbose=verbose,
+                on_batch_end=trace_profiler.step if trace_profiler is not None else None,
+                exclude_targets=exclude_targets,
+            )
+        else:
+            test_users = np.unique(test_interactions.mat.row)
+            targets = test_interactions.mat.tocsr()
+
+            if len(test_users) < batch_size:
+                batch_size = len(test_users)
+
+            n_batches = int(np.ceil(len(test_users) / batch_size))
+            evaluate_kwargs = {
+                'metric_list': metric_list,
+                'accepts_batch': accepts_batch,
+                'test_users': test_users,
+                'batch_size': batch_size,
+                'targets': targets,
+                # targets are copied to the device once, rather than indexed on the CPU in every
+                # batch
+                'device_targets': DeviceTargets(targets, device=device),
+                'model': model,
+                'num_items': test_interactions.num_items,
+                'k': k,
+                'device': device,
+                'back_off_on_out_of_memory': memory_budget is not None,
+                'exclude_targets': exclude_targets,
+            }
+
+            if n_jobs > 1:
+                accumulators, recommended_items = _evaluate_batches_in_parallel(
+                    n_jobs=min(n_jobs, n_batches),
+                    n_batches=n_batches,
+                    verbose=verbose,
+                    **evaluate_kwargs,
+                )
+            else:
+                data_to_iterate_over = range(n_batches)
+                if verbose:
+                    from tqdm.auto import tqdm
+
+                    data_to_iterate_over = tqdm(data_to_iterate_over)
+
+                accumulators, recommended_items = _evaluate_batches(
+                    batch_idxs=data_to_iterate_over,
+                    on_batch_end=trace_profiler.step if trace_profiler is not None else None,
+                    **evaluate_kwargs,
+                )
+
+            n_test_users = len(test_users)
+    finally:
+        if trace_profiler is not None:
+            trace_profiler.stop()
+
+    all_scores = [
+        (
+            recommended_items.sum().item() / test_interactions.num_items
+            if metric is coverage
+            else acc_score / n_test_users
+        )
+        for metric, acc_score in zip(metric_list, accumulators)
+    ]
+
+    if logger is not None:
+        _log_metrics(logger=logger,
+                     model=model,
+                     metric_list=metric_list,
+                     all_scores=all_scores,
+                     verbose=verbose)
+
+    return all_scores[0] if len(all_scores) == 1 else all_scores
+
+
+def _log_metrics(logger: 'pytorch_lightning.loggers.base.LightningLoggerBase',
+                 model: 'collie_recs.model.BasePipeline',
+                 metric_list: List[Callable],
+                 all_scores: List[float],
+                 verbose: bool) -> None:
+    """Log each metric's score, keyed by its name, at the model's number of completed epochs."""
+    try:
+        step = model.hparams.get('num_epochs_completed')
+    except torch.nn.modules.module.ModuleAttributeError:
+        # if, somehow, there is no ``model.hparams`` attribute, this shouldn't fail
+        step = None
+
+    metrics_dict = dict(zip([x.__name__ for x in metric_list], all_scores))
+
+    if verbose:
+        print(f'Logging metrics {metrics_dict} to ``logger``...')
+
+    logger.log_metrics(metrics=metrics_dict, step=step)
+
+
+def evaluate_quantization_drift(
+    model: 'collie_recs.model.BasePipeline',
+    quantized_model: 'collie_recs.model.BasePipeline',
+    test_interactions: collie_recs.interactions.Interactions,
+    metric_list: Iterable[Callable] = (mapk, mrr),
+    k: int = 10,
+    batch_size: int = 20,
+    verbose: bool = True,
+) -> Dict[str, Dict[str, float]]:
+    """
+    Report how much ranking metrics drift between a full-precision model and its quantized copy.
+
+    Both models are evaluated with ``evaluate_in_batches`` on the same ``test_interactions``.
+
+    Parameters
+    ----------
+    model: collie_recs.model.BasePipeline
+        Full-precision model
+    quantized_model: collie_recs.model.BasePipeline
+        Quantized copy of ``model``, i.e. the output of ``model.quantize()``
+    test_interactions: collie_recs.interactions.Interactions
+        Interactions to use as labels
+    metric_list: list of functions
+        List of evaluation functions to apply, following the same requirements as
+        ``evaluate_in_batches``
+    k: int
+        Number of recommendations to consider per user. This is ignored by some metrics
+    batch_size: int
+        Number of users to score in a single batch
+    verbose: bool
+        Display progress bar and print statements during function execution
+
+    Returns
+    -------
+    drift_report: dict
+        Keys are the name of each metric in ``metric_list`` and values are dictionaries with keys:
+
+        * ``original`` - metric value for ``model``
+
+        * ``quantized`` - metric value for ``quantized_model``
+
+        * ``difference`` - ``quantized - original``
+
+        * ``relative_difference`` - ``difference / original``, or ``0`` if ``original`` is ``0``
+
+    Examples
+    --------
+    .. code-block:: python
+
+        from collie_recs.metrics import evaluate_quantization_drift
+
+
+        quantized_model = model.quantize(dtype='int8')
+
+        drift_report = evaluate_quantization_drift(model=model,
+                                                   quantized_model=quantized_model,
+                                                   test_interactions=test)
+
+        print(drift_report['mapk'])
+
+    """
+    metric_list = list(metric_list)
+
+    scores = []
+    for model_to_evaluate in [model, quantized_model]:
+        model_scores = evaluate_in_batches(metric_list=metric_list,
+                                           test_interactions=test_interactions,
+                                           model=model_to_evaluate,
+                                           k=k,
+                                           batch_size=batch_size,
+                                           verbose=verbose)
+        if len(metric_list) == 1:
+            model_scores = [model_scores]
+
+        scores.append(model_scores)
+
+    drift_report = {}
+    for metric, original, quantized in zip(metric_list, *scores):
+        difference = quantized - original
+        drift_report[getattr(metric, '__name__', str(metric))] = {
+            'original': original,
+            'quantized': quantized,
+            'difference': difference,
+            'relative_difference': difference / original if original != 0 else 0.0,
+        }
+
+    return drift_report
+
+
+# each metric's value for a test interaction whose positive item has rank ``ranks`` among
+# ``num_candidates`` scored items, when it is the only positive item, as in sampled evaluation
+_SAMPLED_RANK_METRICS = {
+    mapk: lambda ranks, k, num_candidates: (ranks <= k).double() / ranks,
+    ndcgk: lambda ranks, k, num_candidates: (ranks <= k).double() / torch.log2(ranks + 1),
+    precisionk: lambda ranks, k, num_candidates: (ranks <= k).double() / k,
+    recallk: lambda ranks, k, num_candidates: (ranks <= k).double(),
+    hit_ratek: lambda ranks, k, num_candidates: (ranks <= k).double(),
+    mrr: lambda ranks, k, num_candidates: 1.0 / ranks,
+    auc: lambda ranks, k, num_candidates: (num_candidates - ranks) / (num_candidates - 1),
+}
+
+
+def _get_test_pairs(
+    test_interactions: collie_recs.interactions.Interactions,
+) -> Tuple[np.array, np.array]:
+    """Get the user and item IDs of every positive test interaction, sorted by user, then item."""
     targets = test_interactions.mat.tocsr()
+    targets.eliminate_zeros()
+    targets.sort_indices()
+
+    users = np.repeat(np.arange(targets.shape[0], dtype=np.int64), np.diff(targets.indptr))
+
+    return users, targets.indices.astype(np.int64)
+
+
+def sample_evaluation_negatives(
+    test_interactions: collie_recs.interactions.Interactions,
+    num_negative_samples: int = 100,
+    seed: Optional[int] = None,
+    exclude_interactions: Optional[collie_recs.interactions.Interactions] = None,
+    save_path: Optional[Union[str, Path]] = None,
+) -> np.array:
+    """
+    Sample negative items to rank each test interaction against in ``evaluate_sampled``.
+
+    Negative items are sampled uniformly with replacement for each positive test interaction,
+    ordered by user ID and then item ID, excluding any item the user interacted with in
+    ``test_interactions`` or ``exclude_interactions``. Saving the sampled items with ``save_path``
+    and passing the file to ``evaluate_sampled`` ranks every model against the same negative items,
+    so their results are comparable.
+
+    Parameters
+    ----------
+    test_interactions: collie_recs.interactions.Interactions
+        Interactions that will be used as labels in ``evaluate_sampled``
+    num_negative_samples: int
+        Number of negative items to sample for each test interaction
+    seed: int
+        Random seed for sampling. If ``None``, a random seed is generated
+    exclude_interactions: collie_recs.interactions.Interactions
+        Additional interactions, such as the training data, whose items should never be sampled as
+        negative items for the same user
+    save_path: str or Path
+        If provided, the sampled items are also saved to this path with ``np.save``
+
+    Returns
+    -------
+    negative_items: np.array
+        Array of shape ``n_test_interactions x num_negative_samples``
+
+    Examples
+    --------
+    .. code-block:: python
 
-    if len(test_users) < batch_size:
-        batch_size = len(test_users)
+        from collie_recs.metrics import sample_evaluation_negatives
+
+
+        sample_evaluation_negatives(test_interactions=test,
+                                    num_negative_samples=100,
+                                    seed=42,
+                                    exclude_interactions=train,
+                                    save_path='test_negatives.npy')
+
+    """
+    if seed is None:
+        seed = get_random_seed()
+
+    num_items = test_interactions.num_items
+    users, _ = _get_test_pairs(test_interactions)
+
+    excluded_keys = []
+    for interactions in [test_interactions, exclude_interactions]:
+        if interactions is not None:
+            mat = interactions.mat
+            is_positive = mat.data != 0
+            excluded_keys.append(
+                mat.row[is_positive].astype(np.int64) * num_items + mat.col[is_positive]
+            )
+    excluded_keys = np.unique(np.concatenate(excluded_keys))
+
+    n_excluded_items = np.bincount(excluded_keys // num_items)
+    if len(users) > 0 and n_excluded_items[users].max() >= num_items:
+        raise ValueError(
+            'Cannot sample negative items for users who have interacted with every item.'
+        )
+
+    dtype = np.int32 if num_items <= np.iinfo(np.int32).max else np.int64
+
+    random_state = np.random.RandomState(seed)
+    negative_items = random_state.randint(num_items,
+                                          size=(len(users), num_negative_samples),
+                                          dtype=dtype)
+
+    # resample only the sampled items that turn out to be excluded until none are left
+    flat_negative_items = negative_items.reshape(-1)
+    to_check = np.arange(len(flat_negative_items))
+    while len(to_check) > 0:
+        keys = users[to_check // num_negative_samples] * num_items + flat_negative_items[to_check]
+        key_idxs = np.searchsorted(excluded_keys, keys).clip(max=len(excluded_keys) - 1)
+
+        to_check = to_check[excluded_keys[key_idxs] == keys]
+        flat_negative_items[to_check] = random_state.randint(num_items,
+                                                             size=len(to_check),
+                                                             dtype=dtype)
+
+    if save_path is not None:
+        np.save(save_path, negative_items)
+
+    return negative_items
+
+
+def _corrected_sampled_metric(rank_metric: Callable,
+                              k: int,
+                              num_negative_samples: int,
+                              num_items: int) -> torch.tensor:
+    """
+    Find the expected value of a rank-based metric over the full catalog given each sampled rank.
+
+    A positive item with (1-indexed) rank ``R`` among ``num_items`` items is outranked by each
+    uniformly sampled negative item with probability ``(R - 1) / (num_items - 1)``, so the number
+    of sampled negative items scoring higher than it is binomially distributed. Given a uniform
+    prior over ``R``, the corrected value of sampled rank ``r`` is the average of the metric over
+    every full rank ``R`` weighted by the probability of observing ``r``. Returns a tensor of
+    ``num_negative_samples + 1`` corrected values indexed by ``r - 1``.
+
+    """
+    num_higher = torch.arange(num_negative_samples + 1, dtype=torch.float64).unsqueeze(1)
+    log_binomial_coefficients = (
+        torch.lgamma(torch.tensor(num_negative_samples + 1, dtype=torch.float64))
+        - torch.lgamma(num_higher + 1)
+        - torch.lgamma(num_negative_samples - num_higher + 1)
+    )
+
+    numerator = torch.zeros(num_negative_samples + 1, dtype=torch.float64)
+    denominator = torch.zeros(num_negative_samples + 1, dtype=torch.float64)
+
+    # full ranks are processed in chunks to bound memory for multi-million item catalogs
+    chunk_size = max(1, 2 ** 22 // (num_negative_samples + 1))
+    for start in range(1, num_items + 1, chunk_size):
+        full_ranks = torch.arange(start,
+                                  min(start + chunk_size, num_items + 1),
+                                  dtype=torch.float64)
+        outranked_probability = ((full_ranks - 1) / max(num_items - 1, 1)).unsqueeze(0)
+
+        likelihood = torch.exp(
+            log_binomial_coefficients
+            + torch.xlogy(num_higher, outranked_probability)
+            + torch.xlogy(num_negative_samples - num_higher, 1 - outranked_probability)
+        )
+
+        numerator += likelihood @ rank_metric(full_ranks, k, num_items)
+        denominator += likelihood.sum(dim=1)
+
+    return numerator / denominator
+
+
+def evaluate_sampled(
+    metric_list: Iterable[Callable],
+    test_interactions: collie_recs.interactions.Interactions,
+    model: 'collie_recs.model.BasePipeline',
+    negative_items: Union[np.array, str, Path],
+    k: int = 10,
+    batch_size: int = 1024,
+    corrected: bool = False,
+    logger: 'pytorch_lightning.loggers.base.LightningLoggerBase' = None,
+    verbose: bool = True,
+) -> List[float]:
+    """
+    Evaluate a model by ranking each test interaction against a fixed set of sampled negatives.
+
+    Rather than scoring every item for every test user, as ``evaluate_in_batches`` does, each
+    positive test interaction is scored against only its row of ``negative_items``, sampled once
+    with ``sample_evaluation_negatives``. Metrics are computed on the resulting
+    ``n_test_interactions x (num_negative_samples + 1)`` score matrix, with the positive item in
+    the first column, and averaged over test interactions rather than users. This reduces the cost
+    of evaluation from ``O(n_users x n_items)`` to ``O(n_test_interactions x num_negative_samples)``
+    for very large catalogs.
+
+    Sampled metrics are biased estimates of their full-catalog counterparts and are only comparable
+    between models evaluated with the same ``negative_items``.
+
+    Parameters
+    ----------
+    metric_list: list of functions
+        List of evaluation functions to apply. ``mapk``, ``ndcgk``, ``precisionk``, ``recallk``,
+        ``hit_ratek``, ``mrr``, and ``auc`` are computed directly from the rank of each positive
+        item among its sampled negative items. Any other function must accept the same keyword
+        arguments as in ``evaluate_in_batches`` and is called on each batch's score matrix as if
+        every test interaction were a user whose only target item is item ``0``. ``coverage``
+        cannot be computed from sampled items
+    test_interactions: collie_recs.interactions.Interactions
+        Interactions to use as labels
+    model: collie_recs.model.BasePipeline
+        Model that can take a (user_id, item_id) pair as input and return a recommendation score
+    negative_items: np.array, str, or Path
+        Array of shape ``n_test_interactions x num_negative_samples`` output by
+        ``sample_evaluation_negatives``, or the path it was saved to, which is memory-mapped
+    k: int
+        Number of recommendations to consider per test interaction. This is ignored by some metrics
+    batch_size: int
+        Number of test interactions to score in a single batch
+    corrected: bool
+        Whether to correct each metric for sampling by replacing its value at every sampled rank
+        with the metric's expected value over all full-catalog ranks that could have produced it,
+        assuming negative items were sampled uniformly and every full-catalog rank is equally
+        likely beforehand. Only supported for the metrics computed from ranks listed above
+    logger: pytorch_lightning.loggers.base.LightningLoggerBase
+        If provided, will log outputted metrics dictionary using the ``log_metrics`` method, as in
+        ``evaluate_in_batches``
+    verbose: bool
+        Display progress bar and print statements during function execution
+
+    Returns
+    -------
+    evaluation_results: list
+        List of floats, with each metric value corresponding to the respective function passed in
+        ``metric_list``
+
+    Examples
+    --------
+    .. code-block:: python
+
+        from collie_recs.metrics import evaluate_sampled, mrr, ndcgk, sample_evaluation_negatives
+
+
+        sample_evaluation_negatives(test_interactions=test,
+                                    num_negative_samples=100,
+                                    seed=42,
+                                    exclude_interactions=train,
+                                    save_path='test_negatives.npy')
+
+        ndcg_10_score, mrr_score = evaluate_sampled(
+            metric_list=[ndcgk, mrr],
+            test_interactions=test,
+            model=model,
+            negative_items='test_negatives.npy',
+        )
+
+        print(ndcg_10_score, mrr_score)
+
+    """
+    metric_list = list(metric_list)
+
+    if coverage in metric_list:
+        raise ValueError('``coverage`` cannot be computed from sampled negative items.')
+
+    if corrected:
+        unsupported_metrics = [
+            getattr(metric, '__name__', str(metric))
+            for metric in metric_list
+            if metric not in _SAMPLED_RANK_METRICS
+        ]
+        if unsupported_metrics:
+            raise ValueError(
+                f'Corrected sampled metrics are not supported for {unsupported_metrics}.'
+            )
+
+    if isinstance(negative_items, (str, Path)):
+        negative_items = np.load(negative_items, mmap_mode='r')
+
+    users, items = _get_test_pairs(test_interactions)
+    if negative_items.shape[0] != len(users):
+        raise ValueError(
+            f'``negative_items`` has {negative_items.shape[0]} rows, but there are {len(users)}'
+            ' test interactions. Were they sampled for different ``test_interactions``?'
+        )
+
+    num_negative_samples = negative_items.shape[1]
+
+    device = 'cuda:0' if torch.cuda.is_available() else 'cpu'
+    model.to(device)
+
+    if corrected:
+        num_candidates = test_interactions.num_items
+        corrected_metrics = {
+            metric: _corrected_sampled_metric(rank_metric=_SAMPLED_RANK_METRICS[metric],
+                                              k=k,
+                                              num_negative_samples=num_negative_samples,
+                                              num_items=num_candidates).to(device)
+            for metric in metric_list
+        }
+    else:
+        num_candidates = num_negative_samples + 1
 
     accumulators = [0] * len(metric_list)
 
-    data_to_iterate_over = range(int(np.ceil(len(test_users) / batch_size)))
+    data_to_iterate_over = range(0, len(users), batch_size)
     if verbose:
-        data_to_iterate_over = tqdm(data_to_iterate_over)
+        from tqdm.auto import tqdm
 
-    for i in data_to_iterate_over:
-        user_range = test_users[i * batch_size:(i + 1) * batch_size]
-        preds = get_preds(model, user_range, test_interactions.num_items, device)
-        for metric_ind, metric in enumerate(metric_list):
-            score = metric(targets=targets, user_ids=user_range, preds=preds, k=k)
-            accumulators[metric_ind] += (score * len(user_range))
+        data_to_iterate_over = tqdm(data_to_iterate_over)
 
-    all_scores = [acc_score / len(test_users) for acc_score in accumulators]
+    for start in data_to_iterate_over:
+        batch_users = torch.from_numpy(users[start:start + batch_size]).to(device)
+        candidate_items = torch.cat([
+            torch.from_numpy(items[start:start + batch_size]).unsqueeze(1),
+            torch.from_numpy(np.asarray(negative_items[start:start + batch_size], dtype=np.int64)),
+        ], dim=1).to(device)
 
-    if logger is not None:
-        try:
-            step = model.hparams.get('num_epochs_completed')
-        except torch.nn.modules.module.ModuleAttributeError:
-            # if, somehow, there is no ``model.hparams`` attribute, this shouldn't fail
-            step = None
+        with record_function('collie_recs.get_preds'), torch.no_grad():
+            preds = model(
+                batch_users.repeat_interleave(num_negative_samples + 1),
+                candidate_items.flatten(),
+            ).view(-1, num_negative_samples + 1)
 
-        metrics_dict = dict(zip([x.__name__ for x in metric_list], all_scores))
+        # as in ``mrr``, negative items tied with the positive item are ranked after it
+        sampled_ranks = (preds[:, 1:] > preds[:, :1]).sum(dim=1) + 1
 
-        if verbose:
-            print(f'Logging metrics {metrics_dict} to ``logger``...')
+        for metric_ind, metric in enumerate(metric_list):
+            metric_name = getattr(metric, '__name__', str(metric))
+            with record_function(f'collie_recs.metrics.{metric_name}'):
+                if corrected:
+                    accumulators[metric_ind] += (
+                        corrected_metrics[metric][sampled_ranks - 1].sum().item()
+                    )
+                elif metric in _SAMPLED_RANK_METRICS:
+                    accumulators[metric_ind] += _SAMPLED_RANK_METRICS[metric](
+                        sampled_ranks.double(), k, num_candidates
+                    ).sum().item()
+                else:
+                    n_rows = len(preds)
+                    sampled_targets = csr_matrix(
+                        (np.ones(n_rows), np.zeros(n_rows), np.arange(n_rows + 1)),
+                        shape=tuple(preds.shape),
+                    )
+                    accumulators[metric_ind] += n_rows * metric(targets=sampled_targets,
+                                                                user_ids=np.arange(n_rows),
+                                                                preds=preds,
+                                                                k=k)
+
+    all_scores = [acc_score / max(len(users), 1) for acc_score in accumulators]
 
-        logger.log_metrics(metrics=metrics_dict, step=step)
+    if logger is not None:
+        _log_metrics(logger=logger,
+                     model=model,
+                     metric_list=metric_list,
+                     all_scores=all_scores,
+                     verbose=verbose)
 
     return all_scores[0] if len(all_scores) == 1 else all_scores
@@ -1,8 +1,17 @@
-from collie_recs.model.base import *
-from collie_recs.model.collaborative_metric_learning import *
-from collie_recs.model.deep_fm import *
-from collie_recs.model.hybrid_pretrained_matrix_factorization import *
-from collie_recs.model.matrix_factorization import *
-from collie_recs.model.mlp_matrix_factorization import *
-from collie_recs.model.neural_collaborative_filtering import *
-from collie_recs.model.nonlinear_matrix_factorization import *
+from collie_recs import _lazy
+from collie_recs.model import base
+
+
+__getattr__, __dir__, __all__ = _lazy.attach(
+    __name__,
+    {
+        'base': base.__all__,
+        'collaborative_metric_learning': ['CollaborativeMetricLearningModel'],
+        'deep_fm': ['DeepFM'],
+        'hybrid_pretrained_matrix_factorization': ['HybridPretrainedModel'],
+        'matrix_factorization': ['MatrixFactorizationModel'],
+        'mlp_matrix_factorization': ['MLPMatrixFactorizationModel'],
+        'neural_collaborative_filtering': ['NeuralCollaborativeFiltering'],
+        'nonlinear_matrix_factorization': ['NonlinearMatrixFactorizationModel'],
+    },
+)
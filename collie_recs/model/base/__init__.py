@@ -1,3 +1,19 @@
-from collie_recs.model.base.base_pipeline import *
-from collie_recs.model.base.layers import *
-from collie_recs.model.base.trainer import *
+from collie_recs import _lazy
+
+
+__getattr__, __dir__, __all__ = _lazy.attach(
+    __name__,
+    {
+        'base_pipeline': ['INTERACTIONS_LIKE_INPUT', 'BasePipeline'],
+        'layers': [
+            'ScaledEmbedding',
+            'ZeroEmbedding',
+            'QuantizedEmbedding',
+            'LazyAdam',
+            'MultiOptimizer',
+            'MultiLRScheduler',
+        ],
+        'profiling': ['get_trace_profiler', 'PhaseTimings', 'PhaseTimingCallback', 'TraceProfiler'],
+        'trainer': ['CollieTrainer', 'CollieMinimalTrainer'],
+    },
+)
@@ -1,7 +1,9 @@
 from abc import ABCMeta, abstractmethod
+from collections import OrderedDict
+import copy
 from pathlib import Path
 import textwrap
-from typing import Callable, Dict, List, Optional, Tuple, Union
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
 import warnings
 
 import numpy as np
@@ -9,20 +11,57 @@ import pandas as pd
 from pytorch_lightning.core.lightning import LightningModule
 import torch
 
+from collie_recs.inference import SCORERS, write_inference_spec
 from collie_recs.interactions import (ApproximateNegativeSamplingInteractionsDataLoader,
                                       Interactions,
-                                      InteractionsDataLoader)
+                                      InteractionsDataLoader,
+                                      PrecomputedInteractionsDataLoader,
+                                      PrefetchedNegativesInteractionsDataLoader,
+                                      TensorInteractionsDataLoader)
 from collie_recs.loss import (adaptive_bpr_loss,
                               adaptive_hinge_loss,
                               bpr_loss,
                               hinge_loss,
+                              ideal_difference_from_metadata,
+                              MetadataPartialCredit,
                               warp_loss)
-from collie_recs.utils import get_init_arguments
+from collie_recs.model.base.layers import LazyAdam, MultiOptimizer, QuantizedEmbedding
+from collie_recs.utils import get_init_arguments, record_function
 
 
 INTERACTIONS_LIKE_INPUT = Union[ApproximateNegativeSamplingInteractionsDataLoader,
                                 Interactions,
-                                InteractionsDataLoader]
+                                InteractionsDataLoader,
+                                PrecomputedInteractionsDataLoader,
+                                PrefetchedNegativesInteractionsDataLoader,
+                                TensorInteractionsDataLoader]
+
+
+# string ``optimizer`` options, mapped to the optimizer class to use and whether or not that
+# optimizer can apply weight decay to parameters with dense and sparse gradients, respectively
+OPTIMIZERS = {
+    'sgd': (torch.optim.SGD, True, False),
+    'adam': (torch.optim.Adam, True, False),
+    'sparse_adam': (torch.optim.SparseAdam, False, False),
+    'lazy_adam': (LazyAdam, True, True),
+    'adagrad': (torch.optim.Adagrad, True, False),
+}
+# when a model has ``sparse=True``, the optimizers used for parameters of sparse embedding tables
+# and all other, dense parameters, respectively, for each string ``optimizer`` option
+SPARSE_OPTIMIZERS = {
+    'sgd': 'sgd',
+    'adam': 'lazy_adam',
+    'sparse_adam': 'sparse_adam',
+    'lazy_adam': 'lazy_adam',
+    'adagrad': 'adagrad',
+}
+DENSE_OPTIMIZERS = {
+    'sgd': 'sgd',
+    'adam': 'adam',
+    'sparse_adam': 'adam',
+    'lazy_adam': 'lazy_adam',
+    'adagrad': 'adagrad',
+}
 
 
 class BasePipeline(LightningModule, metaclass=ABCMeta):
@@ -43,10 +82,16 @@ class BasePipeline(LightningModule, metaclass=ABCMeta):
     ----------
     train: ``collie_recs.interactions`` object
         Data loader for training data. If an ``Interactions`` object is supplied, an
-        ``InteractionsDataLoader`` will automatically be instantiated with ``shuffle=True``
+        ``InteractionsDataLoader`` will automatically be instantiated with ``shuffle=True``. To
+        take negative sampling off of the training loop, use a
+        ``PrefetchedNegativesInteractionsDataLoader`` to sample each epoch's negative items in a
+        background process while the previous epoch trains
     val: ``collie_recs.interactions`` object
         Data loader for validation data. If an ``Interactions`` object is supplied, an
-        ``InteractionsDataLoader`` will automatically be instantiated with ``shuffle=False``
+        ``InteractionsDataLoader`` will automatically be instantiated with ``shuffle=False``. For
+        faster, deterministic validation losses, wrap validation data in a
+        ``PrecomputedInteractionsDataLoader`` to sample negative items once and reuse them every
+        epoch
     lr: float
         Model learning rate
     lr_scheduler_func: torch.optim.lr_scheduler
@@ -62,6 +107,17 @@ class BasePipeline(LightningModule, metaclass=ABCMeta):
 
         * ``'sparse_adam'`` (for ``torch.optim.SparseAdam``)
 
+        * ``'lazy_adam'`` (for ``collie_recs.model.LazyAdam``)
+
+        * ``'adagrad'`` (for ``torch.optim.Adagrad``)
+
+        If the model has ``sparse=True``, parameters of sparse embedding tables are automatically
+        split off into their own optimizer that supports sparse gradients, while all other
+        parameters (e.g. MLP layers) are optimized with a dense optimizer. For ``'adam'`` and
+        ``'lazy_adam'``, embeddings are optimized with ``LazyAdam``, which only updates rows
+        present in the batch. ``'sparse_adam'`` optimizes embeddings with ``torch.optim.SparseAdam``
+        and all other parameters with ``torch.optim.Adam``. ``'sgd'`` and ``'adagrad'`` support
+        sparse gradients natively, but without weight decay on the embeddings
     loss: function or str
         If a string, one of the following implemented losses:
 
@@ -93,6 +149,20 @@ class BasePipeline(LightningModule, metaclass=ABCMeta):
 
         * a 0% match if it's a different item with a different genre and different director,
           which is equivalent to the loss without any partial credit
+
+        Metadata and weights are combined once into a ``MetadataPartialCredit`` lookup stored as
+        device buffers on the model, so partial credit is a single gather per training step
+    memory_efficient_loss: bool
+        For ``adaptive_hinge``, ``adaptive_bpr``, and ``warp`` losses, which only ever use one
+        negative item per interaction, score all negative items without tracking gradients, select
+        the one negative item the loss uses for each interaction (the highest-scoring negative item
+        for adaptive losses, or the first ranking-violating one for WARP), and re-score only those
+        items with gradients. This computes the same loss while only keeping activations for
+        ``batch_size`` rather than ``batch_size x num_negative_samples`` negative predictions for
+        the backward pass, greatly reducing memory use and backward time for many negative
+        samples or larger models like ``NeuralCollaborativeFiltering`` and ``DeepFM``. Note that
+        with dropout, the re-scored predictions use a different dropout mask than the predictions
+        used to select negative items
     load_model_path: str or Path
         To load a previously-saved model, pass in path to output of ``model.save_model()`` method.
         If ``None``, will initialize model as normal
@@ -113,6 +183,7 @@ class BasePipeline(LightningModule, metaclass=ABCMeta):
                  loss: Union[str, Callable] = 'hinge',
                  metadata_for_loss: Optional[Dict[str, torch.tensor]] = None,
                  metadata_for_loss_weights: Optional[Dict[str, float]] = None,
+                 memory_efficient_loss: bool = False,
                  load_model_path: Optional[str] = None,
                  map_location: Optional[str] = None,
                  **kwargs):
@@ -182,19 +253,39 @@ class BasePipeline(LightningModule, metaclass=ABCMeta):
             self.hparams.num_epochs_completed = 0
 
             self._configure_loss()
+            self._setup_metadata_for_loss()
 
             # check weight decay and sparsity
-            if hasattr(self.hparams, 'sparse'):
-                if self.hparams.sparse and self.hparams.weight_decay != 0:
+            if (
+                hasattr(self.hparams, 'sparse')
+                and self.hparams.sparse
+                and self.hparams.weight_decay != 0
+            ):
+                if callable(self.optimizer) or callable(self.bias_optimizer):
+                    # callable optimizers are not split by sparsity, so every parameter, including
+                    # those of sparse embedding tables, would get the same weight decay
                     warnings.warn(
                         textwrap.dedent(
                             f'''
-                            ``weight_decay`` value must be 0 when ``sparse`` is flagged, not
+                            ``weight_decay`` value must be 0 when ``sparse`` is flagged and
+                            ``optimizer`` or ``bias_optimizer`` is a callable, not
                             {self.hparams.weight_decay}. Setting to 0.
                             '''
                         ).replace('\n', ' ').strip()
                     )
                     self.hparams.weight_decay = 0.0
+                elif SPARSE_OPTIMIZERS.get(self.optimizer) != 'lazy_adam':
+                    # dense layers are still optimized with weight decay, as set for each
+                    # parameter group in ``_get_sparse_and_dense_optimizer``
+                    warnings.warn(
+                        textwrap.dedent(
+                            f'''
+                            ``weight_decay`` is not applied to sparse embedding tables when
+                            ``optimizer`` is not ``'adam'`` or ``'lazy_adam'``, only to all other
+                            layers.
+                            '''
+                        ).replace('\n', ' ').strip()
+                    )
 
             # set up the actual model
             self._setup_model(**kwargs)
@@ -208,8 +299,12 @@ class BasePipeline(LightningModule, metaclass=ABCMeta):
         self.hparams['load_model_path'] = load_model_path
         self.hparams['map_location'] = map_location
 
+        self._setup_metadata_for_loss()
         self._setup_model(**kwargs)
 
+        if self.hparams.get('quantized_dtype') is not None:
+            self._quantize_embeddings(dtype=self.hparams.quantized_dtype)
+
         self.load_state_dict(state_dict=loaded_dict['state_dict'])
         self.eval()
 
@@ -247,8 +342,21 @@ class BasePipeline(LightningModule, metaclass=ABCMeta):
         else:
             raise ValueError('{} is not a valid loss function.'.format(self.loss))
 
+    def _setup_metadata_for_loss(self) -> None:
+        # combine metadata into a lookup once, registered as a submodule so its buffers move to the
+        # same device as the model, rather than indexing every metadata tensor in each loss call
+        metadata = self.hparams.get('metadata_for_loss')
+
+        if metadata is not None and len(metadata) > 0:
+            self.metadata_for_loss_lookup = MetadataPartialCredit(
+                metadata=metadata,
+                metadata_weights=self.hparams.metadata_for_loss_weights,
+            )
+        else:
+            self.metadata_for_loss_lookup = None
+
     def configure_optimizers(self) -> (
-        Union[Tuple[List[Callable], List[Callable]], Tuple[Callable, Callable], Callable]
+        Union[Tuple[List[Callable], List[Callable]], List[Callable], Callable]
     ):
         """
         Configure optimizers and learning rate schedulers to use in optimization.
@@ -261,6 +369,13 @@ class BasePipeline(LightningModule, metaclass=ABCMeta):
         The bias optimizer will be set with the same parameters as ``optimizer`` with the
         exception of the learning rate, which will be set to ``self.hparams.bias_lr``.
 
+        If the model has ``sparse=True`` and an optimizer is specified as a string, each of the
+        optimizers above is further split into one optimizer for parameters of sparse embedding
+        tables and another for all remaining, dense parameters, wrapped together in a single
+        ``MultiOptimizer`` so PyTorch Lightning still runs only one training step per batch for
+        each of the optimizers above. See ``SPARSE_OPTIMIZERS`` and ``DENSE_OPTIMIZERS`` for the
+        optimizers used for each.
+
         """
         if self.bias_optimizer is not None:
             if self.bias_optimizer == 'infer':
@@ -268,44 +383,80 @@ class BasePipeline(LightningModule, metaclass=ABCMeta):
             if self.hparams.bias_lr == 'infer':
                 self.hparams.bias_lr = self.hparams.lr
 
-            # create one optimizer only for layers with the term 'bias' in them
-            bias_optimizer = self._get_optimizer(self.bias_optimizer, optimizer_type='bias')
-            # create another optimizer for all other model layers
-            optimizer = self._get_optimizer(self.optimizer, optimizer_type='all_but_bias')
+            # create optimizers for all model layers without the term 'bias' in them
+            optimizers = [
+                self._get_sparse_and_dense_optimizer(self.optimizer, optimizer_type='all_but_bias')
+            ]
+            # create optimizers only for layers with the term 'bias' in them
+            optimizers.append(
+                self._get_sparse_and_dense_optimizer(self.bias_optimizer, optimizer_type='bias')
+            )
         else:
-            # create a single optimizer for all model layers
-            optimizer = self._get_optimizer(self.optimizer, optimizer_type='all')
+            # create optimizers for all model layers
+            optimizers = [
+                self._get_sparse_and_dense_optimizer(self.optimizer, optimizer_type='all')
+            ]
 
         if self.lr_scheduler_func is not None:
             monitor = 'val_loss_epoch'
             if self.val_loader is None:
                 monitor = 'train_loss_epoch'
 
-            # add in optimizer to scheduler function
-            scheduler_dict = {
-                'scheduler': self.lr_scheduler_func(optimizer),
-                'monitor': monitor,
-            }
-
-            optimizer_list = [optimizer]
-            scheduler_list = [scheduler_dict]
-
-            # create a separate learning rate scheduler for our bias optimizer if it exists
-            if self.bias_optimizer is not None:
-                scheduler_dict_bias = {
-                    'scheduler': self.lr_scheduler_func(bias_optimizer),
+            # add in each optimizer to its own scheduler
+            scheduler_list = [
+                {
+                    'scheduler': self.lr_scheduler_func(optimizer),
                     'monitor': monitor,
                 }
+                for optimizer in optimizers
+            ]
 
-                optimizer_list.append(bias_optimizer)
-                scheduler_list.append(scheduler_dict_bias)
-
-            return (optimizer_list, scheduler_list)
+            return (optimizers, scheduler_list)
 
-        if self.bias_optimizer is not None:
-            return [optimizer, bias_optimizer]
+        if len(optimizers) > 1:
+            return optimizers
         else:
-            return optimizer
+            return optimizers[0]
+
+    def _get_sparse_and_dense_optimizer(self,
+                                        optimizer: Optional[Union[str, Callable]],
+                                        optimizer_type: str) -> Callable:
+        """
+        Create an optimizer for parameters of type ``optimizer_type``, splitting off parameters of
+        sparse embedding tables into their own optimizer if the model has ``sparse=True``. Split
+        optimizers are returned wrapped in a single ``MultiOptimizer``.
+
+        """
+        if not self.hparams.get('sparse') or callable(optimizer):
+            return self._get_optimizer(optimizer, optimizer_type=optimizer_type)
+
+        if optimizer not in SPARSE_OPTIMIZERS:
+            raise ValueError('{} is not a valid optimizer!'.format(optimizer))
+
+        # if dense and sparse parameters use the same optimizer, we create a single optimizer with
+        # a separate parameter group for each rather than two separate optimizers
+        parameter_groups = OrderedDict()
+        for sparse, optimizer_lookup in [(False, DENSE_OPTIMIZERS), (True, SPARSE_OPTIMIZERS)]:
+            optimizer_name = optimizer_lookup[optimizer]
+            _, dense_weight_decay, sparse_weight_decay = OPTIMIZERS[optimizer_name]
+
+            optimizer_parameters = self._get_optimizer_parameters(
+                include_weight_decay=sparse_weight_decay if sparse else dense_weight_decay,
+                optimizer_type=optimizer_type,
+                sparse=sparse,
+            )
+
+            # models like ``MatrixFactorizationModel`` have no dense parameters, so we only create
+            # optimizers for the types of parameters that actually exist
+            if len(optimizer_parameters[0]['params']) > 0:
+                parameter_groups.setdefault(optimizer_name, []).extend(optimizer_parameters)
+
+        optimizers = [
+            OPTIMIZERS[optimizer_name][0](optimizer_parameters)
+            for optimizer_name, optimizer_parameters in parameter_groups.items()
+        ]
+
+        return optimizers[0] if len(optimizers) == 1 else MultiOptimizer(optimizers)
 
     def _get_optimizer(self, optimizer: Optional[Union[str, Callable]], **kwargs) -> Callable:
         if callable(optimizer):
@@ -317,57 +468,66 @@ class BasePipeline(LightningModule, metaclass=ABCMeta):
                 optimizer = optimizer(
                     self._get_optimizer_parameters(include_weight_decay=False, **kwargs)
                 )
-        elif optimizer == 'sgd':
-            optimizer = torch.optim.SGD(
-                self._get_optimizer_parameters(include_weight_decay=True, **kwargs)
-            )
-        elif optimizer == 'adam':
-            optimizer = torch.optim.Adam(
-                self._get_optimizer_parameters(include_weight_decay=True, **kwargs)
-            )
-        elif optimizer == 'sparse_adam':
-            optimizer = torch.optim.SparseAdam(
-                self._get_optimizer_parameters(include_weight_decay=False, **kwargs)
+        elif optimizer in OPTIMIZERS:
+            optimizer_class, include_weight_decay, _ = OPTIMIZERS[optimizer]
+            optimizer = optimizer_class(
+                self._get_optimizer_parameters(include_weight_decay=include_weight_decay,
+                                               **kwargs)
             )
         else:
             raise ValueError('{} is not a valid optimizer!'.format(optimizer))
 
         return optimizer
 
+    def _get_named_parameters(
+        self,
+        optimizer_type: str = 'all',
+        sparse: Optional[bool] = None,
+    ) -> Iterable[Tuple[str, torch.nn.Parameter]]:
+        """
+        Get model parameters of type ``optimizer_type``, optionally filtered to only those that
+        are (``sparse=True``) or are not (``sparse=False``) weights of sparse embedding tables.
+
+        """
+        assert optimizer_type in ['bias', 'all_but_bias', 'all'], f'{optimizer_type} not valid!'
+
+        sparse_parameters = {
+            id(module.weight)
+            for module in self.modules()
+            if isinstance(module, torch.nn.Embedding) and module.sparse
+        }
+
+        for name, param in self.named_parameters():
+            if optimizer_type == 'bias' and 'bias' not in name:
+                continue
+            if optimizer_type == 'all_but_bias' and 'bias' in name:
+                continue
+            if sparse is not None and sparse != (id(param) in sparse_parameters):
+                continue
+
+            yield name, param
+
     def _get_optimizer_parameters(self,
                                   include_weight_decay: bool = True,
                                   optimizer_type: str = 'all',
+                                  sparse: Optional[bool] = None,
                                   **kwargs) -> Dict[str, Union[torch.tensor, float]]:
         """
         Set all non-bias model layers with ``lr`` learning rate and bias terms with ``bias_lr``
         learning rate.
 
         """
-        assert optimizer_type in ['bias', 'all_but_bias', 'all'], f'{optimizer_type} not valid!'
-
-        if optimizer_type == 'bias':
-            optimizer_parameters = [
-                {
-                    'params': (
-                        param for (name, param) in self.named_parameters() if 'bias' in name
-                    ),
-                    'lr': self.hparams.bias_lr,
-                },
-            ]
-        elif optimizer_type == 'all_but_bias':
-            optimizer_parameters = [
-                {
-                    'params': (
-                        param for (name, param) in self.named_parameters() if 'bias' not in name
-                    ),
-                    'lr': self.hparams.lr,
-                },
-            ]
-        else:
-            optimizer_parameters = [{
-                'params': self.parameters(),
-                'lr': self.hparams.lr,
-            }]
+        optimizer_parameters = [
+            {
+                'params': [
+                    param for (_, param) in self._get_named_parameters(
+                        optimizer_type=optimizer_type,
+                        sparse=sparse,
+                    )
+                ],
+                'lr': self.hparams.bias_lr if optimizer_type == 'bias' else self.hparams.lr,
+            },
+        ]
 
         if include_weight_decay:
             weight_decay_dict = {'weight_decay': self.hparams.weight_decay}
@@ -479,29 +639,94 @@ class BasePipeline(LightningModule, metaclass=ABCMeta):
         # TODO: see if there is a way to not have to transpose each time - probably a bit costly
         neg_items = torch.transpose(neg_items, 0, 1).long()
 
-        # get positive item predictions from model
-        pos_preds = self(users, pos_items)
+        with record_function('collie_recs.model_forward'):
+            # get positive item predictions from model
+            pos_preds = self(users, pos_items)
 
-        # get negative item predictions from model
-        users_repeated = users.repeat(neg_items.shape[0])
-        neg_items_flattened = neg_items.flatten()
-        neg_preds = self(users_repeated, neg_items_flattened).view(
-            neg_items.shape[0], len(users)
-        )
+            # get negative item predictions from model
+            users_repeated = users.repeat(neg_items.shape[0])
+            neg_items_flattened = neg_items.flatten()
+
+            if self._use_memory_efficient_loss(num_negative_samples=neg_items.shape[0]):
+                with torch.no_grad():
+                    neg_preds = self(users_repeated, neg_items_flattened).view(
+                        neg_items.shape[0], len(users)
+                    )
+
+                neg_preds = self._rescore_selected_negatives(users=users,
+                                                             pos_items=pos_items,
+                                                             pos_preds=pos_preds,
+                                                             neg_items=neg_items,
+                                                             neg_preds=neg_preds)
+            else:
+                neg_preds = self(users_repeated, neg_items_flattened).view(
+                    neg_items.shape[0], len(users)
+                )
 
         # implicit loss function
-        loss = self.loss_function(
-            pos_preds,
-            neg_preds,
-            num_items=self.hparams.num_items,
-            positive_items=pos_items,
-            negative_items=neg_items,
-            metadata=self.hparams.metadata_for_loss,
-            metadata_weights=self.hparams.metadata_for_loss_weights,
-        )
+        with record_function('collie_recs.loss'):
+            loss = self.loss_function(
+                pos_preds,
+                neg_preds,
+                num_items=self.hparams.num_items,
+                positive_items=pos_items,
+                negative_items=neg_items,
+                metadata=self.metadata_for_loss_lookup,
+                metadata_weights=self.hparams.metadata_for_loss_weights,
+            )
 
         return loss
 
+    def _use_memory_efficient_loss(self, num_negative_samples: int) -> bool:
+        """Check if negative items should be selected without gradients in ``_calculate_loss``."""
+        return (
+            self.hparams.get('memory_efficient_loss', False)
+            and torch.is_grad_enabled()
+            and num_negative_samples > 1
+            and self.loss_function in (adaptive_hinge_loss, adaptive_bpr_loss, warp_loss)
+        )
+
+    def _rescore_selected_negatives(self,
+                                    users: torch.tensor,
+                                    pos_items: torch.tensor,
+                                    pos_preds: torch.tensor,
+                                    neg_items: torch.tensor,
+                                    neg_preds: torch.tensor) -> torch.tensor:
+        """
+        Re-score the single negative item the loss uses for each user with gradients.
+
+        Every other negative prediction is replaced with ``-inf`` so the loss function makes the
+        same selection from the returned ``num_negative_samples x batch_size`` predictions, without
+        any gradients flowing to predictions it does not use.
+
+        """
+        batch_idxs = torch.arange(len(users), device=users.device)
+
+        if self.loss_function is warp_loss:
+            if self.metadata_for_loss_lookup is not None:
+                ideal_difference = ideal_difference_from_metadata(
+                    positive_items=pos_items.repeat([neg_items.shape[0], 1]),
+                    negative_items=neg_items,
+                    metadata=self.metadata_for_loss_lookup,
+                    metadata_weights=self.hparams.metadata_for_loss_weights,
+                )
+            else:
+                ideal_difference = 1
+
+            # index of the first ranking-violating negative item for each user, or of the last
+            # negative item if there are none
+            is_violation = (ideal_difference - pos_preds.detach() + neg_preds) > 0
+            is_violation[-1] = True
+            selected_idxs = is_violation.int().argmax(dim=0)
+        else:
+            selected_idxs = neg_preds.argmax(dim=0)
+
+        selected_neg_preds = self(users, neg_items[selected_idxs, batch_idxs])
+
+        return torch.full_like(neg_preds, -float('inf')).index_put(
+            (selected_idxs, batch_idxs), selected_neg_preds.to(neg_preds.dtype)
+        )
+
     def get_item_predictions(self,
                              user_id: int = 0,
                              unseen_items_only: bool = False,
@@ -614,11 +839,122 @@ class BasePipeline(LightningModule, metaclass=ABCMeta):
         2) In the v0.8.4 release, loading a model back in leads to a ``RuntimeError`` unable to
            load in weights.
 
+        When training with ``torch.distributed``, only the process with rank 0 will save the model,
+        since every process holds the same weights.
+
         Parameters
         ----------
         filepath: str or Path
             Filepath for state dictionary to be saved at ending in '.pth'
 
         """
+        if (
+            torch.distributed.is_available()
+            and torch.distributed.is_initialized()
+            and torch.distributed.get_rank() != 0
+        ):
+            return
+
         dict_to_save = {'state_dict': self.state_dict(), 'hparams': self.hparams}
         torch.save(dict_to_save, str(filename))
+
+    def quantize(self, dtype: str = 'int8') -> 'BasePipeline':
+        """
+        Create a copy of the model with reduced-precision embedding tables for inference.
+
+        Every embedding table in the model (including biases) is replaced with a
+        ``QuantizedEmbedding`` storing the table as either ``int8`` values with a ``float32`` scale
+        per row or as ``float16`` values. Quantized rows are dequantized as they are looked up, so
+        the quantized model can be used anywhere the original model is for scoring, e.g. in
+        ``get_item_predictions`` or ``collie_recs.metrics.evaluate_in_batches``. Quantized models
+        can also be saved with ``save_model`` and exported with ``export_inference`` at a fraction
+        of the original size.
+
+        Quantized models are meant for inference only and cannot be trained further. Use
+        ``collie_recs.metrics.evaluate_quantization_drift`` to check how much quantization changes
+        ranking metrics for a model.
+
+        Parameters
+        ----------
+        dtype: str
+            One of ``'int8'`` or ``'float16'``
+
+        Returns
+        -------
+        quantized_model: BasePipeline
+            A quantized copy of the model, set to ``eval`` mode. The original model is unchanged
+
+        """
+        if self.hparams.get('quantized_dtype') is not None:
+            raise ValueError(f'Model is already quantized to {self.hparams.quantized_dtype}!')
+
+        # share, rather than copy, data loaders and trainers between the original and the copy
+        memo = {}
+        for module in self.modules():
+            for attribute in ['train_loader', 'val_loader', 'trainer']:
+                value = getattr(module, attribute, None)
+                if value is not None:
+                    memo[id(value)] = value
+
+        quantized_model = copy.deepcopy(self, memo)
+        quantized_model._quantize_embeddings(dtype=dtype)
+        quantized_model.hparams.quantized_dtype = dtype
+        quantized_model.eval()
+
+        return quantized_model
+
+    def _quantize_embeddings(self, dtype: str) -> None:
+        """Replace every ``torch.nn.Embedding`` layer in the model with a ``QuantizedEmbedding``."""
+        for module in list(self.modules()):
+            for name, child in list(module.named_children()):
+                if isinstance(child, torch.nn.Embedding):
+                    setattr(module, name, QuantizedEmbedding(child, dtype=dtype))
+
+    def export_inference(self, path: Union[str, Path], overwrite: bool = False) -> None:
+        """
+        Export the model as a directory of weight tables that can be scored without PyTorch
+        Lightning or PyTorch.
+
+        Each tensor in the model's state dictionary is written as an ``.npy`` file alongside a
+        small ``spec.json`` file describing the model architecture and hyperparameters. The
+        exported directory can be loaded with ``collie_recs.inference.InferenceModel``, which
+        memory-maps the weight tables so many serving processes can share a single copy of them.
+
+        Parameters
+        ----------
+        path: str or Path
+            Directory path to export the model to
+        overwrite: bool
+            Whether or not to overwrite existing data
+
+        """
+        model_class = type(self).__name__
+        if model_class not in SCORERS:
+            raise ValueError(f'Exporting a {model_class} model for inference is not supported.')
+        if callable(self.hparams.get('final_layer')):
+            raise ValueError(
+                'Models with a callable ``final_layer`` cannot be exported for inference - use one'
+                ' of the string options for ``final_layer`` instead.'
+            )
+
+        path = Path(path)
+
+        if path.exists():
+            if any(path.iterdir()) and overwrite is False:
+                raise ValueError(f'Data exists in ``path`` at {path} and ``overwrite`` is False.')
+
+        path.mkdir(parents=True, exist_ok=True)
+
+        tables = OrderedDict(
+            (name, tensor.detach().cpu().numpy())
+            for name, tensor in self._get_inference_tables().items()
+        )
+
+        write_inference_spec(path=path,
+                             model_class=model_class,
+                             hparams=dict(self.hparams),
+                             tables=tables)
+
+    def _get_inference_tables(self) -> Dict[str, torch.tensor]:
+        """Tensors needed to score the model outside of PyTorch, keyed by name."""
+        return self.state_dict()
@@ -1,4 +1,5 @@
-from typing import Dict, List
+import math
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 import torch
 
@@ -17,11 +18,182 @@ class ZeroEmbedding(torch.nn.Embedding):
         self.weight.data.zero_()
 
 
-class MultiOptimizer(object):
+class QuantizedEmbedding(torch.nn.Module):
+    """
+    Embedding layer storing a reduced-precision copy of a trained embedding table for inference.
+
+    With ``dtype='int8'``, each row of the table is stored as ``int8`` values alongside a single
+    ``float32`` scale per row, such that ``row ~= int8_row * scale``. Tables with
+    ``embedding_dim == 1`` (i.e. biases) share a single scale for the whole table instead, since a
+    scale per row would take up more memory than the row itself. With ``dtype='float16'``, rows are
+    stored as half-precision floats and no scale is needed.
+
+    Only the rows looked up in ``forward`` are ever dequantized back to ``float32``, so scoring a
+    full catalog never materializes a full-precision copy of the table.
+
+    Parameters
+    ----------
+    embedding: torch.nn.Embedding
+        Trained embedding layer to quantize
+    dtype: str
+        One of ``'int8'`` or ``'float16'``
+
+    """
+    def __init__(self, embedding: torch.nn.Embedding, dtype: str = 'int8'):
+        super().__init__()
+
+        weight = embedding.weight.detach().float()
+
+        self.num_embeddings, self.embedding_dim = weight.shape
+        self.quantized_dtype = dtype
+
+        if dtype == 'int8':
+            if self.embedding_dim == 1:
+                scale = weight.abs().max() / 127
+            else:
+                scale = weight.abs().max(dim=1).values / 127
+            # rows of all zeros would otherwise have a scale of zero and divide by zero below
+            scale = torch.where(scale > 0, scale, torch.ones_like(scale))
+
+            self.register_buffer(
+                'weight',
+                torch.round(weight / scale.view(-1, 1)).clamp(-127, 127).to(torch.int8),
+            )
+            self.register_buffer('scale', scale)
+        elif dtype == 'float16':
+            self.register_buffer('weight', weight.half())
+        else:
+            raise ValueError(f'{dtype} is not a valid quantization ``dtype``!')
+
+    def forward(self, input: torch.tensor) -> torch.tensor:
+        """Look up and dequantize rows of the embedding table."""
+        embeddings = self.weight[input].float()
+
+        if self.quantized_dtype == 'int8':
+            if self.scale.dim() == 0:
+                embeddings = embeddings * self.scale
+            else:
+                embeddings = embeddings * self.scale[input].unsqueeze(-1)
+
+        return embeddings
+
+    def extra_repr(self) -> str:
+        """Information to display when printing the layer."""
+        return f'{self.num_embeddings}, {self.embedding_dim}, dtype={self.quantized_dtype}'
+
+
+class LazyAdam(torch.optim.Optimizer):
+    """
+    Adam optimizer that only updates the rows of a parameter present in a sparse gradient.
+
+    For embedding tables with ``sparse=True``, each step only touches the rows of users and items
+    in the batch, rather than every row of the table as ``torch.optim.Adam`` would. Moment
+    estimates for rows not in the batch are left untouched until that row next appears. Unlike
+    ``torch.optim.SparseAdam``, weight decay is supported, and is applied in the decoupled style of
+    AdamW to only the rows being updated.
+
+    Parameters with dense gradients fall back to a standard, full-table update with the same
+    decoupled weight decay.
+
+    Parameters
+    ----------
+    params: iterable
+        Iterable of parameters to optimize or dictionaries defining parameter groups
+    lr: float
+        Learning rate
+    betas: tuple
+        Coefficients used for computing running averages of the gradient and its square
+    eps: float
+        Term added to the denominator to improve numerical stability
+    weight_decay: float
+        Decoupled weight decay coefficient
+
+    """
+    def __init__(self,
+                 params: Iterable[torch.tensor],
+                 lr: float = 1e-3,
+                 betas: Tuple[float, float] = (0.9, 0.999),
+                 eps: float = 1e-8,
+                 weight_decay: float = 0.0):
+        if lr < 0.0:
+            raise ValueError(f'Invalid learning rate: {lr}')
+        if eps < 0.0:
+            raise ValueError(f'Invalid epsilon value: {eps}')
+        if not 0.0 <= betas[0] < 1.0 or not 0.0 <= betas[1] < 1.0:
+            raise ValueError(f'Invalid beta parameters: {betas}')
+        if weight_decay < 0.0:
+            raise ValueError(f'Invalid weight_decay value: {weight_decay}')
+
+        defaults = dict(lr=lr, betas=betas, eps=eps, weight_decay=weight_decay)
+        super().__init__(params, defaults)
+
+    @torch.no_grad()
+    def step(self, closure: Optional[Callable] = None) -> Optional[torch.tensor]:
+        """Perform a single optimization step."""
+        loss = None
+        if closure is not None:
+            with torch.enable_grad():
+                loss = closure()
+
+        for group in self.param_groups:
+            beta1, beta2 = group['betas']
+
+            for param in group['params']:
+                if param.grad is None:
+                    continue
+
+                state = self.state[param]
+                if len(state) == 0:
+                    state['step'] = 0
+                    state['exp_avg'] = torch.zeros_like(param)
+                    state['exp_avg_sq'] = torch.zeros_like(param)
+
+                state['step'] += 1
+                bias_correction1 = 1 - beta1 ** state['step']
+                bias_correction2_sqrt = math.sqrt(1 - beta2 ** state['step'])
+                step_size = group['lr'] / bias_correction1
+                decay = 1 - group['lr'] * group['weight_decay']
+
+                exp_avg, exp_avg_sq = state['exp_avg'], state['exp_avg_sq']
+
+                if param.grad.is_sparse:
+                    grad = param.grad.coalesce()
+                    rows = grad._indices()[0]
+                    values = grad._values()
+
+                    # gather only the rows in the gradient, update them, then scatter them back
+                    exp_avg_rows = exp_avg[rows].mul_(beta1).add_(values, alpha=1 - beta1)
+                    exp_avg_sq_rows = (
+                        exp_avg_sq[rows].mul_(beta2).addcmul_(values, values, value=1 - beta2)
+                    )
+                    exp_avg[rows] = exp_avg_rows
+                    exp_avg_sq[rows] = exp_avg_sq_rows
+
+                    denom = (exp_avg_sq_rows.sqrt() / bias_correction2_sqrt).add_(group['eps'])
+                    param_rows = param[rows].mul_(decay)
+                    param[rows] = param_rows.addcdiv_(exp_avg_rows, denom, value=-step_size)
+                else:
+                    grad = param.grad
+
+                    exp_avg.mul_(beta1).add_(grad, alpha=1 - beta1)
+                    exp_avg_sq.mul_(beta2).addcmul_(grad, grad, value=1 - beta2)
+
+                    denom = (exp_avg_sq.sqrt() / bias_correction2_sqrt).add_(group['eps'])
+                    param.mul_(decay).addcdiv_(exp_avg, denom, value=-step_size)
+
+        return loss
+
+
+class MultiOptimizer(torch.optim.Optimizer):
     """
     A simple class that allows us to wrap multiple optimizers into a single API typical of a single
     optimizer, with ``zero_grad`` and ``step`` methods.
 
+    Since this is a ``torch.optim.Optimizer`` sharing the ``param_groups`` of the optimizers it
+    wraps, it can also be returned from ``configure_optimizers`` so that PyTorch Lightning runs the
+    training step once per batch for all wrapped optimizers, rather than once per optimizer, and
+    learning rate schedulers adjust the learning rates of every wrapped optimizer.
+
     Parameters
     ----------
     optimizers: List of ``torch.optim.Optimizer``s
@@ -30,18 +202,74 @@ class MultiOptimizer(object):
     def __init__(self, optimizers: List[torch.optim.Optimizer]):
         assert isinstance(optimizers, list), f'Expected list, got {type(optimizers)}!'
 
+        # ``torch.optim.Optimizer.__init__`` is not called since it would create new parameter
+        # groups, rather than sharing those of the wrapped optimizers
         self.optimizers = optimizers
+        self.defaults = {}
+
+    @property
+    def param_groups(self) -> List[Dict[str, Any]]:
+        """Parameter groups of all wrapped optimizers."""
+        return [
+            param_group
+            for optimizer in self.optimizers
+            for param_group in optimizer.param_groups
+        ]
 
-    def zero_grad(self) -> None:
+    @property
+    def state(self) -> Dict[torch.Tensor, Dict[str, Any]]:
+        """State of all wrapped optimizers, keyed by parameter."""
+        return {
+            parameter: parameter_state
+            for optimizer in self.optimizers
+            for parameter, parameter_state in optimizer.state.items()
+        }
+
+    def zero_grad(self, *args, **kwargs) -> None:
         """Apply ``zero_grad`` to all optimizers."""
         for optimizer in self.optimizers:
-            optimizer.zero_grad()
+            optimizer.zero_grad(*args, **kwargs)
+
+    def step(self, closure: Optional[Callable[[], Any]] = None) -> Any:
+        """Call ``closure`` once, if provided, and apply ``step`` to all optimizers."""
+        loss = None
+        if closure is not None:
+            with torch.enable_grad():
+                loss = closure()
 
-    def step(self) -> None:
-        """Apply ``step`` to all optimizers."""
         for optimizer in self.optimizers:
             optimizer.step()
 
+        return loss
+
+    def state_dict(self) -> Dict[str, List[Dict[str, Any]]]:
+        """State dictionaries of all wrapped optimizers."""
+        return {'optimizers': [optimizer.state_dict() for optimizer in self.optimizers]}
+
+    def load_state_dict(self, state_dict: Dict[str, List[Dict[str, Any]]]) -> None:
+        """Load the state dictionary of each wrapped optimizer saved by ``state_dict``."""
+        for optimizer, optimizer_state_dict in zip(self.optimizers, state_dict['optimizers']):
+            optimizer.load_state_dict(optimizer_state_dict)
+
+    def add_param_group(self, param_group: Dict[str, Any]) -> None:
+        """
+        Add ``param_group`` to the first wrapped optimizer.
+
+        For the optimizers split by ``BasePipeline.configure_optimizers`` for models with
+        ``sparse=True``, this is the optimizer for dense parameters, so parameters added with
+        ``add_param_group`` should not be weights of sparse embedding tables.
+
+        """
+        self.optimizers[0].add_param_group(param_group)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Pickle the wrapped optimizers rather than copies of their parameter groups."""
+        return self.__dict__
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """Restore the wrapped optimizers."""
+        self.__dict__.update(state)
+
 
 class MultiLRScheduler(object):
     """
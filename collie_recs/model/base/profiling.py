@@ -0,0 +1,447 @@
+import functools
+import os
+from pathlib import Path
+import time
+from typing import Any, Dict, Optional, Union
+
+from pytorch_lightning import Callback, LightningModule, Trainer
+import torch
+
+
+class PhaseTimings(object):
+    """
+    Accumulate the wall time spent in each phase of a training step.
+
+    Each training step is split into four phases, recorded in order with ``record``:
+
+    * ``data``: waiting on the DataLoader for the next batch and moving it to the device
+
+    * ``forward``: the model forward pass and loss calculation
+
+    * ``backward``: the backward pass
+
+    * ``optimizer_step``: stepping the optimizer(s)
+
+    Every call to ``record`` attributes the time since the previous call to the given phase, so
+    phases must be recorded as soon as they finish. Totals are kept for every step and epoch, along
+    with the throughput in samples per second.
+
+    With ``enabled = False``, every method returns immediately without reading the clock, so a
+    disabled ``PhaseTimings`` can be left in a training loop with negligible overhead.
+
+    Parameters
+    ----------
+    enabled: bool
+        Whether to record timings at all
+    synchronize_cuda: bool
+        Whether to wait on all CUDA kernels to finish before reading the clock. Since CUDA kernels
+        run asynchronously, this is required for accurate timings when training on the GPU, at the
+        cost of some throughput
+
+    Attributes
+    ----------
+    last_step: dict
+        Timings for the most recently completed step
+    epochs: list of dicts
+        Timings for each completed epoch
+
+    """
+    PHASES = ('data', 'forward', 'backward', 'optimizer_step')
+
+    def __init__(self, enabled: bool = True, synchronize_cuda: bool = False):
+        self.enabled = enabled
+        self.synchronize_cuda = synchronize_cuda
+
+        self.last_step = dict()
+        self.epochs = list()
+
+        self._step_times = dict.fromkeys(self.PHASES, 0.0)
+        self._epoch_times = dict.fromkeys(self.PHASES, 0.0)
+        self._epoch_steps = 0
+        self._epoch_samples = 0
+        self._last_time = None
+
+    def start_epoch(self) -> None:
+        """Reset the epoch totals and start the clock for the first ``data`` phase."""
+        if not self.enabled:
+            return
+
+        self._step_times = dict.fromkeys(self.PHASES, 0.0)
+        self._epoch_times = dict.fromkeys(self.PHASES, 0.0)
+        self._epoch_steps = 0
+        self._epoch_samples = 0
+        self._last_time = self._now()
+
+    def record(self, phase: str) -> None:
+        """Attribute the time since the last recorded phase to ``phase``."""
+        if not self.enabled:
+            return
+
+        now = self._now()
+        if self._last_time is not None:
+            self._step_times[phase] += now - self._last_time
+        self._last_time = now
+
+    def end_step(self, num_samples: int) -> Dict[str, float]:
+        """Add the current step's timings to the epoch totals and return the step's timings."""
+        if not self.enabled:
+            return dict()
+
+        self.last_step = _summarize(self._step_times, steps=1, samples=num_samples)
+
+        for phase, phase_time in self._step_times.items():
+            self._epoch_times[phase] += phase_time
+        self._epoch_steps += 1
+        self._epoch_samples += num_samples
+
+        self._step_times = dict.fromkeys(self.PHASES, 0.0)
+
+        return self.last_step
+
+    def end_epoch(self) -> Dict[str, float]:
+        """Save the epoch's timings to ``epochs`` and return them."""
+        if not self.enabled:
+            return dict()
+
+        epoch_timings = _summarize(self._epoch_times,
+                                   steps=self._epoch_steps,
+                                   samples=self._epoch_samples)
+        self.epochs.append(epoch_timings)
+        self._last_time = None
+
+        return epoch_timings
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Get timings summed across all completed epochs.
+
+        Returns
+        -------
+        summary: dict
+            Total seconds spent in each phase (``data_time``, ``forward_time``, ``backward_time``,
+            and ``optimizer_step_time``) and in all phases (``total_time``), the fraction of time
+            spent waiting on data (``data_time_fraction``), the number of ``steps`` and
+            ``samples`` trained on, and the throughput in ``samples_per_second``
+
+        """
+        phase_times = {
+            phase: sum(epoch[f'{phase}_time'] for epoch in self.epochs) for phase in self.PHASES
+        }
+
+        return _summarize(phase_times,
+                          steps=sum(epoch['steps'] for epoch in self.epochs),
+                          samples=sum(epoch['samples'] for epoch in self.epochs))
+
+    def metrics(self, timings: Dict[str, float], suffix: str) -> Dict[str, float]:
+        """Format ``timings`` as metrics to send to a logger, e.g. ``train_data_time_step``."""
+        return {
+            f'train_{name}_{suffix}': value
+            for name, value in timings.items()
+            if name not in ('steps', 'samples')
+        }
+
+    def _now(self) -> float:
+        """Read the clock, first waiting on CUDA kernels if ``synchronize_cuda`` is set."""
+        if self.synchronize_cuda:
+            torch.cuda.synchronize()
+
+        return time.perf_counter()
+
+
+class PhaseTimingCallback(Callback):
+    """
+    PyTorch Lightning callback to record the time spent in each phase of a training step with
+    ``PhaseTimings`` when training with ``CollieTrainer``.
+
+    Step timings are sent to the trainer's logger every ``log_every_n_steps`` steps and epoch
+    timings at the end of every training epoch. Since PyTorch Lightning moves a batch to the device
+    after ``on_train_batch_start`` is called, time spent moving data to the device is counted in
+    the ``forward`` phase here rather than in the ``data`` phase as in ``CollieMinimalTrainer``.
+
+    The pinned version of PyTorch Lightning has no hook between the forward and backward passes,
+    so the model's ``training_step`` is wrapped for the duration of training to record the end of
+    the ``forward`` phase as soon as it returns the loss.
+
+    .. code-block:: python
+
+        from collie_recs.model import CollieTrainer, PhaseTimingCallback
+
+
+        timing_callback = PhaseTimingCallback()
+        trainer = CollieTrainer(model, callbacks=[timing_callback])
+        trainer.fit(model)
+
+        print(timing_callback.timings.summary())
+
+    Parameters
+    ----------
+    log_every_n_steps: int
+        How often to log step timings. If ``None``, uses the trainer's ``log_every_n_steps``
+
+    Attributes
+    ----------
+    timings: PhaseTimings
+
+    """
+    def __init__(self, log_every_n_steps: Optional[int] = None):
+        self.log_every_n_steps = log_every_n_steps
+        self.timings = PhaseTimings()
+
+    def on_train_start(self, trainer: Trainer, pl_module: LightningModule) -> None:
+        """
+        Wait on CUDA kernels before reading the clock if training on the GPU and wrap the model's
+        ``training_step`` to record time spent in the forward pass.
+
+        """
+        self.timings.synchronize_cuda = pl_module.device.type == 'cuda'
+
+        training_step = pl_module.training_step
+
+        @functools.wraps(training_step)
+        def timed_training_step(*args, **kwargs) -> Any:
+            loss = training_step(*args, **kwargs)
+            self.timings.record('forward')
+
+            return loss
+
+        pl_module.training_step = timed_training_step
+
+    def on_train_end(self, trainer: Trainer, pl_module: LightningModule) -> None:
+        """Restore the model's original ``training_step``."""
+        pl_module.__dict__.pop('training_step', None)
+
+    def on_train_epoch_start(self, trainer: Trainer, pl_module: LightningModule) -> None:
+        """Start timing the epoch."""
+        self.timings.start_epoch()
+
+    def on_train_batch_start(self,
+                             trainer: Trainer,
+                             pl_module: LightningModule,
+                             batch: Any,
+                             batch_idx: int,
+                             unused: Optional[int] = 0) -> None:
+        """Record time spent waiting on the DataLoader."""
+        self.timings.record('data')
+
+    def on_after_backward(self, trainer: Trainer, pl_module: LightningModule) -> None:
+        """Record time spent in the backward pass."""
+        self.timings.record('backward')
+
+    def on_train_batch_end(self,
+                           trainer: Trainer,
+                           pl_module: LightningModule,
+                           outputs: Any,
+                           batch: Any,
+                           batch_idx: int,
+                           unused: Optional[int] = 0) -> None:
+        """Record time spent stepping optimizers and log step timings, if applicable."""
+        self.timings.record('optimizer_step')
+
+        ((users, _), _) = batch
+        step_timings = self.timings.end_step(num_samples=len(users))
+
+        log_every_n_steps = self.log_every_n_steps or trainer.log_every_n_steps
+        if trainer.logger is not None and (trainer.global_step + 1) % log_every_n_steps == 0:
+            trainer.logger.log_metrics(self.timings.metrics(step_timings, suffix='step'),
+                                       step=trainer.global_step)
+
+    def on_train_epoch_end(self, trainer: Trainer, pl_module: LightningModule) -> None:
+        """Log epoch timings."""
+        epoch_timings = self.timings.end_epoch()
+
+        if trainer.logger is not None:
+            trainer.logger.log_metrics(self.timings.metrics(epoch_timings, suffix='epoch'),
+                                       step=trainer.global_step)
+
+
+class TraceProfiler(object):
+    """
+    Capture a window of training or evaluation steps with ``torch.profiler``, exporting a Chrome
+    trace and a table of the most expensive operators for each window to ``output_dir``.
+
+    Steps are profiled following a ``torch.profiler.schedule``: the first ``wait`` steps are
+    skipped, the next ``warmup`` steps are traced but discarded to let the profiler settle, and the
+    following ``active`` steps are recorded, repeated ``repeat`` times. After every recorded window,
+    ``output_dir`` will contain a ``trace_step_<STEP>.json`` file, which can be opened in Chrome at
+    ``chrome://tracing`` or in Perfetto, and a ``top_operators_step_<STEP>.txt`` table.
+
+    Collie labels the forward pass, loss, backward pass, and optimizer step of each training step,
+    and the ``get_preds`` and metric calls of each evaluation batch, so time spent in each shows up
+    in traces and tables without any additional instrumentation.
+
+    Typically, this is created for you by passing ``profile`` to ``CollieMinimalTrainer.fit`` or
+    ``collie_recs.metrics.evaluate_in_batches``, but it can also be used directly:
+
+    .. code-block:: python
+
+        from collie_recs.model import TraceProfiler
+
+
+        with TraceProfiler('profiler_output', wait=1, warmup=1, active=3) as profiler:
+            for batch in model.train_dataloader():
+                ...
+                profiler.step()
+
+    Parameters
+    ----------
+    output_dir: str or Path
+        Directory to write traces and tables to, created if it does not already exist
+    wait: int
+        Number of steps to skip before each profiling window
+    warmup: int
+        Number of steps to trace, but discard, before recording
+    active: int
+        Number of steps to record in each profiling window
+    repeat: int
+        Number of profiling windows to record. Set to ``0`` to keep recording windows until
+        profiling stops
+    record_shapes: bool
+        Whether to record the input shapes of operators, which are also used to group operators in
+        the top operators table
+    profile_memory: bool
+        Whether to record memory allocated and freed by operators
+    with_stack: bool
+        Whether to record the Python source location of operators
+    sort_by: str
+        Column to sort the top operators table by. If ``None``, sorts by ``self_cuda_time_total``
+        when CUDA is available, else ``self_cpu_time_total``
+    row_limit: int
+        Number of operators to include in the top operators table
+
+    Attributes
+    ----------
+    trace_paths: list of Paths
+        Paths to every Chrome trace written so far
+    table_paths: list of Paths
+        Paths to every top operators table written so far
+
+    """
+    def __init__(self,
+                 output_dir: Union[str, Path],
+                 wait: int = 1,
+                 warmup: int = 1,
+                 active: int = 3,
+                 repeat: int = 1,
+                 record_shapes: bool = True,
+                 profile_memory: bool = True,
+                 with_stack: bool = False,
+                 sort_by: Optional[str] = None,
+                 row_limit: int = 25):
+        self.output_dir = Path(output_dir)
+        self.wait = wait
+        self.warmup = warmup
+        self.active = active
+        self.repeat = repeat
+        self.record_shapes = record_shapes
+        self.profile_memory = profile_memory
+        self.with_stack = with_stack
+        self.row_limit = row_limit
+
+        activities = [torch.profiler.ProfilerActivity.CPU]
+        if torch.cuda.is_available():
+            activities.append(torch.profiler.ProfilerActivity.CUDA)
+
+        if sort_by is None:
+            sort_by = 'self_cuda_time_total' if torch.cuda.is_available() else 'self_cpu_time_total'
+
+        self.activities = activities
+        self.sort_by = sort_by
+
+        self.trace_paths = list()
+        self.table_paths = list()
+        self.profiler = None
+
+    def start(self) -> None:
+        """Start profiling."""
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        self.profiler = torch.profiler.profile(
+            activities=self.activities,
+            schedule=torch.profiler.schedule(wait=self.wait,
+                                             warmup=self.warmup,
+                                             active=self.active,
+                                             repeat=self.repeat),
+            on_trace_ready=self._export,
+            record_shapes=self.record_shapes,
+            profile_memory=self.profile_memory,
+            with_stack=self.with_stack,
+        )
+        self.profiler.start()
+
+    def step(self) -> None:
+        """Signal to the profiler that a step has completed."""
+        self.profiler.step()
+
+    def stop(self) -> None:
+        """Stop profiling, exporting the current profiling window if it is partway complete."""
+        if self.profiler is not None:
+            self.profiler.stop()
+            self.profiler = None
+
+    def __enter__(self) -> 'TraceProfiler':
+        """Start profiling."""
+        self.start()
+
+        return self
+
+    def __exit__(self, *args) -> None:
+        """Stop profiling."""
+        self.stop()
+
+    def _export(self, profiler: torch.profiler.profile) -> None:
+        """Write a Chrome trace and top operators table for a completed profiling window."""
+        trace_path = self.output_dir / f'trace_step_{profiler.step_num}.json'
+        profiler.export_chrome_trace(str(trace_path))
+        self.trace_paths.append(trace_path)
+
+        table = profiler.key_averages(group_by_input_shape=self.record_shapes).table(
+            sort_by=self.sort_by,
+            row_limit=self.row_limit,
+        )
+        table_path = self.output_dir / f'top_operators_step_{profiler.step_num}.txt'
+        table_path.write_text(table)
+        self.table_paths.append(table_path)
+
+
+def get_trace_profiler(
+    profile: Optional[Union[str, Path, Dict[str, Any], TraceProfiler]],
+) -> Optional[TraceProfiler]:
+    """
+    Create a ``TraceProfiler`` from a ``profile`` argument.
+
+    Parameters
+    ----------
+    profile: str, Path, dict, or TraceProfiler
+        If a string or ``Path``, the ``output_dir`` for a ``TraceProfiler`` with default arguments.
+        If a dictionary, keyword arguments for a ``TraceProfiler``. If a ``TraceProfiler``, it will
+        be used as-is. If ``None`` or ``False``, profiling is disabled
+
+    Returns
+    -------
+    trace_profiler: TraceProfiler or None
+
+    """
+    if profile is None or profile is False:
+        return None
+    if isinstance(profile, TraceProfiler):
+        return profile
+    if isinstance(profile, (str, Path)):
+        return TraceProfiler(output_dir=profile)
+    if isinstance(profile, dict):
+        return TraceProfiler(**profile)
+
+    raise ValueError(f'Unable to profile with ``profile`` of type {type(profile)}!')
+
+
+def _summarize(phase_times: Dict[str, float], steps: int, samples: int) -> Dict[str, float]:
+    """Combine phase times, step counts, and sample counts into a single timings dictionary."""
+    total_time = sum(phase_times.values())
+
+    timings = {f'{phase}_time': phase_time for phase, phase_time in phase_times.items()}
+    timings['total_time'] = total_time
+    timings['data_time_fraction'] = phase_times['data'] / total_time if total_time > 0 else 0.0
+    timings['steps'] = steps
+    timings['samples'] = samples
+    timings['samples_per_second'] = samples / total_time if total_time > 0 else 0.0
+
+    return timings
@@ -1,14 +1,29 @@
+import contextlib
+import copy
+import multiprocessing
+from multiprocessing.connection import Connection
+import os
+from pathlib import Path
+import random
+import socket
 import sys
-from typing import Optional, Tuple, Union
+from typing import Any, Callable, ContextManager, Dict, Iterator, Optional, Tuple, Union
 
+import numpy as np
 from pytorch_lightning import Trainer
 from pytorch_lightning.core.memory import ModelSummary
 from pytorch_lightning.loggers.base import LightningLoggerBase
 import torch
 from tqdm.auto import tqdm
 
+from collie_recs.interactions import (ApproximateNegativeSampler,
+                                      HDF5Sampler,
+                                      PrecomputedInteractionsDataLoader,
+                                      TensorInteractionsDataLoader)
 from collie_recs.model.base.base_pipeline import BasePipeline
 from collie_recs.model.base.layers import MultiLRScheduler, MultiOptimizer
+from collie_recs.model.base.profiling import get_trace_profiler, PhaseTimings, TraceProfiler
+from collie_recs.utils import record_function, StageProfiler
 
 
 class CollieTrainer(Trainer):
@@ -88,7 +103,8 @@ class CollieMinimalTrainer():
     equal as the two libraries evolve. Notable changes are:
 
     * If ``gpus > 1``, only a single GPU will be used and any other GPUs will remain unused. Multi-
-      GPU training is not supported in ``CollieMinimalTrainer`` at this time.
+      GPU training is not supported in ``CollieMinimalTrainer`` at this time. For multi-core and
+      multi-machine CPU training, see ``num_processes`` and ``strategy`` below.
 
     * ``logger == True`` has no meaning in ``CollieMinimalTrainer`` - a default logger will NOT be
       created if set to ``True``.
@@ -154,6 +170,66 @@ class CollieMinimalTrainer():
 
         * ``2`` prints ``weights_summary`` (if applicable), epoch losses, and progress bars
 
+    precision: Union[int, str]
+        Precision to compute the model forward pass and loss in. Model weights, including
+        embeddings, are always stored and optimized in full precision.
+
+        * ``32`` trains entirely in full precision
+
+        * ``'bf16'`` runs the model forward and loss calculation in ``bfloat16`` on either the CPU
+          or GPU. For each step, the weights of every layer other than embedding tables are cast
+          to ``bfloat16`` copies that gradients flow back through to the full-precision weights,
+          and floating point inputs to those layers are cast to ``bfloat16``. Embedding tables are
+          looked up in full precision, as with ``torch.autocast``, rather than copying an entire
+          table every step
+
+        * ``16`` runs the model forward and loss calculation under ``float16`` autocast with
+          gradient scaling. This is only available when training on the GPU
+
+    num_processes: int
+        Number of processes to train the model with on the CPU. If ``num_processes > 1``, the
+        model's parameters are moved to shared memory and ``num_processes`` forked workers train on
+        disjoint partitions of each epoch's batches, each stepping its own optimizer on the shared
+        parameters without any locking (Hogwild!). Since a batch only updates the embedding rows
+        of the users and items in it, workers rarely write to the same rows at the same time, and
+        training throughput scales close to linearly with the number of cores for matrix
+        factorization-style models. Optimizers with little or no per-parameter state, such as
+        ``sgd`` and ``adagrad``, are recommended, as any optimizer state is kept separately in each
+        worker. Epoch losses are aggregated across workers, and validation, logging, early
+        stopping, and learning rate scheduling are all coordinated from the main process. Step-
+        level losses are not logged. Requires the ``fork`` multiprocessing start method. If
+        ``strategy == 'ddp'``, this is instead the number of processes to spawn for distributed
+        training
+    strategy: str
+        Set ``strategy = 'ddp'`` to train with distributed data parallelism on the CPU using
+        ``torch.distributed`` and the ``gloo`` backend. Each process trains its own copy of the
+        model on a disjoint shard of every epoch's training and validation batches, with gradients
+        averaged across all processes before each optimizer step. Epoch losses are averaged across
+        processes so that early stopping and learning rate scheduling stay in lockstep, and only
+        rank 0 prints, logs, and saves models with ``save_model``.
+
+        * When run under ``torchrun`` (or in a process that has already initialized the default
+          ``torch.distributed`` process group), ``fit`` joins the existing process group, allowing
+          a single training job to span multiple machines, e.g.
+          ``torchrun --nnodes=2 --nproc_per_node=8 ... train.py``
+
+        * Otherwise, ``fit`` forks ``num_processes - 1`` additional processes on this machine and
+          trains in the current process as rank 0, so the trained model is available in the
+          calling process once ``fit`` returns
+
+    track_timings: bool
+        Whether to record the time spent waiting on data, in the forward pass, in the backward pass,
+        and stepping optimizers for each training step with a ``PhaseTimings`` object, available
+        as the ``timings`` attribute. Step timings and throughput are logged every
+        ``log_every_n_steps`` steps and epoch timings at the end of every epoch, if ``logger`` is
+        enabled. Call ``timings.summary()`` for timings totaled across all epochs. When training on
+        the GPU, CUDA is synchronized at each phase boundary for accurate timings. Timings are not
+        recorded for Hogwild training with ``num_processes > 1``
+    stage_profiler: collie_recs.utils.StageProfiler
+        If provided, the time and peak memory of the training and validation loops of every epoch
+        are recorded as stages named ``train_epoch_<EPOCH>`` and ``val_epoch_<EPOCH>``. With
+        ``strategy = 'ddp'``, only rank 0 is profiled
+
     """
     def __init__(self,
                  model: BasePipeline,
@@ -168,7 +244,12 @@ class CollieMinimalTrainer():
                  benchmark: bool = True,
                  deterministic: bool = True,
                  progress_bar_refresh_rate: Optional[int] = None,
-                 verbosity: Union[bool, int] = True):
+                 verbosity: Union[bool, int] = True,
+                 precision: Union[int, str] = 32,
+                 num_processes: int = 1,
+                 strategy: Optional[str] = None,
+                 track_timings: bool = False,
+                 stage_profiler: Optional[StageProfiler] = None):
         # some light argument validation before saving as class-level attributes
         if gpus is None and torch.cuda.is_available():
             print('Detected GPU. Setting ``gpus`` to 1.')
@@ -208,10 +289,50 @@ class CollieMinimalTrainer():
         else:
             self.device = 'cuda'
 
+        if precision in ('32', '16'):
+            precision = int(precision)
+
+        if precision not in (32, 16, 'bf16'):
+            raise ValueError(f'``precision`` must be one of 32, 16, or "bf16", not {precision}!')
+        if precision == 16 and self.device == 'cpu':
+            raise ValueError(
+                '``precision = 16`` is only supported when training on the GPU. For mixed '
+                'precision training on the CPU, use ``precision = "bf16"`` instead.'
+            )
+        self.precision = precision
+        # ``GradScaler`` prevents small ``float16`` gradients from underflowing to zero, which is
+        # not needed for ``bfloat16`` since it has the same exponent range as ``float32``
+        self.grad_scaler = torch.cuda.amp.GradScaler(enabled=(self.precision == 16))
+
+        if num_processes < 1:
+            raise ValueError(f'``num_processes`` must be at least 1, not {num_processes}!')
+        if strategy not in (None, 'ddp'):
+            raise ValueError(f'``strategy`` must be one of None or "ddp", not {strategy}!')
+        if num_processes > 1 or strategy == 'ddp':
+            if self.device != 'cpu':
+                raise ValueError(
+                    '``num_processes > 1`` and ``strategy = "ddp"`` are only supported when '
+                    'training on the CPU.'
+                )
+            if 'fork' not in multiprocessing.get_all_start_methods():
+                raise ValueError('``num_processes > 1`` requires the ``fork`` start method.')
+
+        self.num_processes = num_processes
+        self.strategy = strategy
+        self.timings = PhaseTimings(enabled=track_timings,
+                                    synchronize_cuda=(self.device == 'cuda'))
+        self.trace_profiler = None
+        self.stage_profiler = stage_profiler
+        self.world_size = 1
+        self.global_rank = 0
+        self._hogwild_workers = list()
+
         torch.backends.cudnn.benchmark = self.benchmark
         torch.backends.cudnn.deterministic = self.deterministic
 
-    def fit(self, model: BasePipeline) -> None:
+    def fit(self,
+            model: BasePipeline,
+            profile: Optional[Union[str, Path, Dict[str, Any], TraceProfiler]] = None) -> None:
         """
         Runs the full optimization routine.
 
@@ -219,8 +340,44 @@ class CollieMinimalTrainer():
         ----------
         model: collie_recs.model.BasePipeline
             Initialized Collie model
+        profile: str, Path, dict, or TraceProfiler
+            If provided, profiles a window of training steps with ``torch.profiler``, writing a
+            Chrome trace and a table of the most expensive operators to a directory. Pass a
+            directory to profile with default ``TraceProfiler`` arguments, a dictionary of keyword
+            arguments for a ``TraceProfiler``, or a ``TraceProfiler`` itself. With
+            ``strategy = 'ddp'``, only rank 0 is profiled. Profiling is not supported for Hogwild
+            training with ``num_processes > 1``
 
         """
+        if profile and self.num_processes > 1 and self.strategy != 'ddp':
+            raise ValueError('Profiling is not supported for Hogwild training.')
+
+        if self.strategy != 'ddp':
+            self._fit(model, profile=profile)
+        elif torch.distributed.is_initialized() or _launched_with_torchrun():
+            # every process was started by ``torchrun`` (or the user), so we only need to join the
+            # process group, if it is not already set up
+            if not torch.distributed.is_initialized():
+                torch.distributed.init_process_group(backend='gloo')
+
+            self._fit(model, profile=profile)
+        else:
+            self._spawn_distributed_fit(model, profile=profile)
+
+    def _fit(self,
+             model: BasePipeline,
+             profile: Optional[Union[str, Path, Dict[str, Any], TraceProfiler]] = None) -> None:
+        """Run the full optimization routine in the current process."""
+        distributed = self.strategy == 'ddp'
+        if distributed:
+            self.world_size = torch.distributed.get_world_size()
+            self.global_rank = torch.distributed.get_rank()
+
+            # only rank 0 prints and logs
+            if self.global_rank != 0:
+                self.verbosity = 0
+                self.logger = None
+
         if (
             not hasattr(self, 'first_run_pre_training_setup_complete_')
             or not self.first_run_pre_training_setup_complete_
@@ -228,6 +385,9 @@ class CollieMinimalTrainer():
             self._pre_training_setup(model)
             self.first_run_pre_training_setup_complete_ = True
 
+        if distributed:
+            self._distributed_setup(model)
+
         # set up top-level epoch progress bar
         epoch_iterator = range(self.num_epochs_completed + 1, self.max_epochs + 1)
         if self.verbosity >= 2:
@@ -237,60 +397,98 @@ class CollieMinimalTrainer():
                                   desc='',
                                   miniters=self.progress_bar_refresh_rate)
 
-        for epoch in epoch_iterator:
-            # run the training loop
-            model.train()
-            train_loss = self._train_loop_single_epoch(model, epoch)
-            model.eval()
-
-            epoch_summary = f'Epoch {epoch: >5}: train loss: {train_loss :<1.5f}, '
-            early_stop_loss = train_loss
-
-            # save epoch loss metrics to the logger
-            if self.logger is not None:
-                self.logger.log_metrics(metrics={'train_loss_epoch': train_loss}, step=epoch)
-
-            # run the validation loop logic, if we have the ``val_dataloader`` to do so
-            if self.val_dataloader is not None:
-                val_loss = self._val_loop_single_epoch(model)
-                epoch_summary += f'val loss: {val_loss :<1.5f}'
-                early_stop_loss = val_loss
-
+        if self.num_processes > 1 and not distributed:
+            self._start_hogwild_workers(model)
+
+        self.trace_profiler = get_trace_profiler(profile) if self.global_rank == 0 else None
+
+        try:
+            if self.trace_profiler is not None:
+                self.trace_profiler.start()
+
+            for epoch in epoch_iterator:
+                # run the training loop
+                model.train()
+                _set_dataloader_epoch(self.train_dataloader, epoch=epoch)
+                with self._profile_stage(f'train_epoch_{epoch}'):
+                    if distributed:
+                        train_loss = self._distributed_epoch_loss(
+                            lambda: self._train_loop_single_epoch(model, epoch),
+                            num_batches=len(self.train_dataloader),
+                        )
+                    elif self.num_processes > 1:
+                        train_loss = self._hogwild_train_single_epoch(epoch)
+                    else:
+                        train_loss = self._train_loop_single_epoch(model, epoch)
+                model.eval()
+
+                epoch_summary = f'Epoch {epoch: >5}: train loss: {train_loss :<1.5f}, '
+                early_stop_loss = train_loss
+
+                # save epoch loss metrics to the logger
                 if self.logger is not None:
-                    self.logger.log_metrics(metrics={'val_loss_epoch': val_loss}, step=epoch)
-
-            # write out to disk only a single time at the end of the epoch
-            if self.logger is not None:
-                self.logger.save()
-
-            if self.verbosity >= 1:
-                print(epoch_summary)
-
-            model.hparams.num_epochs_completed += 1
-            self.num_epochs_completed += 1
-
-            # early stopping logic
-            if (
-                self.early_stopping_patience is not None
-                and early_stop_loss >= self.best_epoch_loss[1]
-                and epoch >= (self.early_stopping_patience + self.best_epoch_loss[0])
-            ):
-                print(f'Epoch {epoch :>5}: Early stopping activated.')
-                self._finalize_training()
-                return
-
-            # save best loss stats for future early stopping logic
-            if early_stop_loss < self.best_epoch_loss[1]:
-                self.best_epoch_loss = (epoch, early_stop_loss)
-
-            # learning rate scheduler stepping, if applicable
-            if self.lr_scheduler is not None:
-                try:
-                    # used for most learning rate schedulers
-                    self.lr_scheduler.step()
-                except TypeError:
-                    # used for ``ReduceLROnPlateau``
-                    self.lr_scheduler.step(early_stop_loss)
+                    self.logger.log_metrics(metrics={'train_loss_epoch': train_loss}, step=epoch)
+
+                    if self.timings.enabled and len(self.timings.epochs) > 0:
+                        self.logger.log_metrics(
+                            metrics=self.timings.metrics(self.timings.epochs[-1], suffix='epoch'),
+                            step=epoch,
+                        )
+
+                # run the validation loop logic, if we have the ``val_dataloader`` to do so
+                if self.val_dataloader is not None:
+                    with self._profile_stage(f'val_epoch_{epoch}'):
+                        if distributed:
+                            val_loss = self._distributed_epoch_loss(
+                                lambda: self._val_loop_single_epoch(model),
+                                num_batches=len(self.val_dataloader),
+                            )
+                        else:
+                            val_loss = self._val_loop_single_epoch(model)
+                    epoch_summary += f'val loss: {val_loss :<1.5f}'
+                    early_stop_loss = val_loss
+
+                    if self.logger is not None:
+                        self.logger.log_metrics(metrics={'val_loss_epoch': val_loss}, step=epoch)
+
+                # write out to disk only a single time at the end of the epoch
+                if self.logger is not None:
+                    self.logger.save()
+
+                if self.verbosity >= 1:
+                    print(epoch_summary)
+
+                model.hparams.num_epochs_completed += 1
+                self.num_epochs_completed += 1
+
+                # early stopping logic
+                if (
+                    self.early_stopping_patience is not None
+                    and early_stop_loss >= self.best_epoch_loss[1]
+                    and epoch >= (self.early_stopping_patience + self.best_epoch_loss[0])
+                ):
+                    if self.global_rank == 0:
+                        print(f'Epoch {epoch :>5}: Early stopping activated.')
+                    self._finalize_training()
+                    return
+
+                # save best loss stats for future early stopping logic
+                if early_stop_loss < self.best_epoch_loss[1]:
+                    self.best_epoch_loss = (epoch, early_stop_loss)
+
+                # learning rate scheduler stepping, if applicable
+                if self.lr_scheduler is not None:
+                    try:
+                        # used for most learning rate schedulers
+                        self.lr_scheduler.step()
+                    except TypeError:
+                        # used for ``ReduceLROnPlateau``
+                        self.lr_scheduler.step(early_stop_loss)
+        finally:
+            if self.trace_profiler is not None:
+                self.trace_profiler.stop()
+
+            self._stop_hogwild_workers()
 
         # run final logging things when training is complete before returning
         self._finalize_training()
@@ -341,20 +539,38 @@ class CollieMinimalTrainer():
                                              leave=False,
                                              miniters=self.progress_bar_refresh_rate)
 
+        self.timings.start_epoch()
+
         for batch_idx, batch in train_dataloader_iterator:
             self.optimizer.zero_grad()
 
             batch = self._move_batch_to_device(batch)
-            loss = model._calculate_loss(batch)
-            loss.backward()
+            self.timings.record('data')
 
-            self.optimizer.step()
+            with self._autocast(model):
+                loss = model._calculate_loss(batch)
+            self.timings.record('forward')
+
+            with record_function('collie_recs.backward'):
+                self.grad_scaler.scale(loss).backward()
+            self.timings.record('backward')
+
+            with record_function('collie_recs.optimizer_step'):
+                self._optimizer_step()
+            self.timings.record('optimizer_step')
+
+            self.timings.end_step(num_samples=len(batch[0][0]))
             self.train_steps += 1
 
+            if self.trace_profiler is not None:
+                self.trace_profiler.step()
+
             if self.terminate_on_nan and not torch.isfinite(loss).all():
                 raise ValueError(f'Loss is {loss}, stopping training early!')
 
-            detached_loss = loss.detach()
+            # losses computed under autocast may be in half precision, which we do not want to
+            # accumulate a sum in
+            detached_loss = loss.detach().float()
             total_loss += detached_loss
 
             if self.verbosity >= 2:
@@ -363,7 +579,10 @@ class CollieMinimalTrainer():
             self._log_step(name='train',
                            steps=self.train_steps,
                            total_loss=total_loss,
-                           batch_idx=batch_idx)
+                           batch_idx=batch_idx,
+                           timings=self.timings.last_step)
+
+        self.timings.end_epoch()
 
         return (total_loss / len(self.train_dataloader)).item()
 
@@ -373,11 +592,12 @@ class CollieMinimalTrainer():
 
         for batch_idx, batch in enumerate(self.val_dataloader):
             batch = self._move_batch_to_device(batch)
-            loss = model._calculate_loss(batch)
+            with self._autocast(model):
+                loss = model._calculate_loss(batch)
 
             self.val_steps += 1
 
-            total_loss += loss.detach()
+            total_loss += loss.detach().float()
 
             self._log_step(name='val',
                            steps=self.val_steps,
@@ -386,6 +606,286 @@ class CollieMinimalTrainer():
 
         return (total_loss / len(self.val_dataloader)).item()
 
+    def _spawn_distributed_fit(
+        self,
+        model: BasePipeline,
+        profile: Optional[Union[str, Path, Dict[str, Any], TraceProfiler]] = None,
+    ) -> None:
+        """Fork ``num_processes - 1`` ranks and train in the current process as rank 0."""
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            raise ValueError(
+                'Spawning distributed processes requires the ``fork`` start method. Launch '
+                'training with ``torchrun`` instead.'
+            )
+
+        init_method = f'tcp://127.0.0.1:{_find_free_port()}'
+
+        context = multiprocessing.get_context('fork')
+        processes = [
+            context.Process(target=self._run_distributed_fit,
+                            kwargs={'model': model, 'rank': rank, 'init_method': init_method})
+            for rank in range(1, self.num_processes)
+        ]
+        for process in processes:
+            process.start()
+
+        torch.distributed.init_process_group(backend='gloo',
+                                             init_method=init_method,
+                                             world_size=self.num_processes,
+                                             rank=0)
+
+        try:
+            self._fit(model, profile=profile)
+        except BaseException:
+            for process in processes:
+                process.terminate()
+            raise
+        finally:
+            for process in processes:
+                process.join()
+
+            # rank 0 hosts the store the process group rendezvoused on, so it can only be torn down
+            # once every other rank has exited
+            torch.distributed.destroy_process_group()
+
+            # leave the trainer ready to train in a single process again
+            self.world_size = 1
+            self.train_dataloader = model.train_dataloader()
+            self.val_dataloader = model.val_dataloader()
+
+        failed_ranks = [rank for rank, process in enumerate(processes, 1) if process.exitcode != 0]
+        if failed_ranks:
+            raise RuntimeError(f'Distributed training failed on ranks {failed_ranks}!')
+
+    def _run_distributed_fit(self, model: BasePipeline, rank: int, init_method: str) -> None:
+        """Join the ``gloo`` process group created in ``_spawn_distributed_fit`` and train."""
+        torch.distributed.init_process_group(backend='gloo',
+                                             init_method=init_method,
+                                             world_size=self.num_processes,
+                                             rank=rank)
+
+        self._fit(model)
+
+    def _distributed_setup(self, model: BasePipeline) -> None:
+        """Shard DataLoaders by rank and sync model parameters from rank 0 before training."""
+        self.train_dataloader = _shard_dataloader(model.train_dataloader(),
+                                                  num_replicas=self.world_size,
+                                                  rank=self.global_rank)
+        if model.val_dataloader() is not None:
+            self.val_dataloader = _shard_dataloader(model.val_dataloader(),
+                                                    num_replicas=self.world_size,
+                                                    rank=self.global_rank)
+
+        # processes launched separately will not share the same initial weights
+        for tensor in list(model.parameters()) + list(model.buffers()):
+            torch.distributed.broadcast(tensor.data, src=0)
+
+        self._distributed_parameters = [
+            parameter for parameter in model.parameters() if parameter.requires_grad
+        ]
+
+    def _all_reduce_gradients(self) -> None:
+        """Average gradients across all processes in the process group."""
+        # parameters unused in the forward pass have no gradient in any process, so skipping them
+        # keeps every process making the same collective calls
+        gradients = [
+            parameter.grad
+            for parameter in self._distributed_parameters
+            if parameter.grad is not None
+        ]
+
+        # dense gradients are flattened into a single buffer to make a single collective call
+        dense_gradients = [gradient for gradient in gradients if not gradient.is_sparse]
+        if len(dense_gradients) > 0:
+            flat_gradients = torch.cat([gradient.reshape(-1) for gradient in dense_gradients])
+            torch.distributed.all_reduce(flat_gradients)
+            flat_gradients /= self.world_size
+
+            offset = 0
+            for gradient in dense_gradients:
+                gradient.copy_(
+                    flat_gradients[offset:(offset + gradient.numel())].view_as(gradient)
+                )
+                offset += gradient.numel()
+
+        for parameter in self._distributed_parameters:
+            if parameter.grad is not None and parameter.grad.is_sparse:
+                sparse_gradient = parameter.grad.coalesce()
+                torch.distributed.all_reduce(sparse_gradient)
+                parameter.grad = sparse_gradient / self.world_size
+
+    def _distributed_epoch_loss(self, loop: Callable[[], float], num_batches: int) -> float:
+        """
+        Run a single epoch ``loop`` in this process and average the epoch loss across all
+        processes, weighted by their number of batches.
+
+        With small datasets, some processes may not have any batches to run ``loop`` on, in which
+        case they still need to take part in averaging the loss.
+
+        """
+        loss = loop() if num_batches > 0 else 0.0
+
+        loss_and_num_batches = torch.tensor([loss * num_batches, num_batches], dtype=torch.float64)
+        torch.distributed.all_reduce(loss_and_num_batches)
+
+        return (loss_and_num_batches[0] / loss_and_num_batches[1]).item()
+
+    def _profile_stage(self, name: str) -> ContextManager:
+        """Profile a stage with ``stage_profiler``, if one was provided, on rank 0 only."""
+        if self.stage_profiler is None or self.global_rank != 0:
+            return contextlib.nullcontext()
+
+        return self.stage_profiler.stage(name)
+
+    def _start_hogwild_workers(self, model: BasePipeline) -> None:
+        """Move ``model`` to shared memory and fork ``num_processes`` Hogwild training workers."""
+        # ``share_memory`` would also share any existing gradients, e.g. from earlier training, so
+        # every worker would accumulate into and zero the same gradient buffers. Without them, each
+        # worker allocates its own gradients in the first backward pass after forking
+        model.zero_grad(set_to_none=True)
+        model.share_memory()
+
+        # seeds for each worker's negative sampling are drawn here so that forked workers, which
+        # would otherwise inherit identical random states, sample different negatives
+        base_seed = random.randrange(2**31 - self.num_processes)
+        num_threads = max(1, torch.get_num_threads() // self.num_processes)
+
+        context = multiprocessing.get_context('fork')
+        for rank in range(self.num_processes):
+            parent_connection, child_connection = context.Pipe()
+            process = context.Process(target=self._hogwild_worker,
+                                      kwargs={'model': model,
+                                              'rank': rank,
+                                              'connection': child_connection,
+                                              'seed': base_seed + rank,
+                                              'num_threads': num_threads})
+            process.start()
+            child_connection.close()
+
+            self._hogwild_workers.append((process, parent_connection))
+
+    def _hogwild_worker(self,
+                        model: BasePipeline,
+                        rank: int,
+                        connection: Connection,
+                        seed: int,
+                        num_threads: int) -> None:
+        """Train on partition ``rank`` of the training data each time the main process asks."""
+        random.seed(seed)
+        np.random.seed(seed)
+        torch.manual_seed(seed)
+        torch.set_num_threads(num_threads)
+
+        # the main process handles all printing and logging
+        self.verbosity = 0
+        self.logger = None
+        self.train_dataloader = _shard_dataloader(self.train_dataloader,
+                                                  num_replicas=self.num_processes,
+                                                  rank=rank)
+        optimizers = getattr(self.optimizer, 'optimizers', [self.optimizer])
+
+        while True:
+            command = connection.recv()
+            if command is None:
+                break
+
+            epoch, learning_rates = command
+            try:
+                # learning rate schedulers are stepped in the main process only
+                param_groups = [
+                    group for optimizer in optimizers for group in optimizer.param_groups
+                ]
+                for param_group, learning_rate in zip(param_groups, learning_rates):
+                    param_group['lr'] = learning_rate
+
+                _set_dataloader_epoch(self.train_dataloader, epoch=epoch)
+
+                num_batches = len(self.train_dataloader)
+                if num_batches == 0:
+                    connection.send((0.0, 0))
+                    continue
+
+                model.train()
+                train_loss = self._train_loop_single_epoch(model, epoch)
+                connection.send((train_loss * num_batches, num_batches))
+            except Exception as exception:
+                connection.send(exception)
+
+        connection.close()
+
+    def _hogwild_train_single_epoch(self, epoch: int) -> float:
+        """Run a single training epoch across all Hogwild workers, returning the epoch loss."""
+        optimizers = getattr(self.optimizer, 'optimizers', [self.optimizer])
+        learning_rates = [
+            group['lr'] for optimizer in optimizers for group in optimizer.param_groups
+        ]
+
+        for _, connection in self._hogwild_workers:
+            connection.send((epoch, learning_rates))
+
+        total_loss = 0
+        total_num_batches = 0
+        for rank, (_, connection) in enumerate(self._hogwild_workers):
+            try:
+                result = connection.recv()
+            except EOFError:
+                raise RuntimeError(f'Hogwild worker {rank} exited unexpectedly!')
+
+            if isinstance(result, Exception):
+                raise result
+
+            worker_loss, worker_num_batches = result
+            total_loss += worker_loss
+            total_num_batches += worker_num_batches
+
+        self.train_steps += total_num_batches
+
+        return total_loss / total_num_batches
+
+    def _stop_hogwild_workers(self) -> None:
+        """Shut down any running Hogwild workers."""
+        for process, connection in self._hogwild_workers:
+            try:
+                connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+
+            process.join(timeout=60)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+
+            connection.close()
+
+        self._hogwild_workers = list()
+
+    def _autocast(self, model: torch.nn.Module) -> ContextManager:
+        """Context manager to run the model forward and loss calculation in ``self.precision``."""
+        if self.precision == 32:
+            return contextlib.nullcontext()
+
+        if self.precision == 16:
+            # ``float16`` is GPU-only, so ``torch.cuda.amp.autocast`` works on every PyTorch version
+            return torch.cuda.amp.autocast()
+
+        # the device-generic ``torch.autocast`` needed for ``bfloat16`` is only available in
+        # ``torch>=1.10``, so layers are cast to ``bfloat16`` by hand instead
+        return _bfloat16_forward(model)
+
+    def _optimizer_step(self) -> None:
+        """Step all optimizers, unscaling gradients first if ``precision == 16``."""
+        if self.world_size > 1:
+            self._all_reduce_gradients()
+
+        if not self.grad_scaler.is_enabled():
+            self.optimizer.step()
+            return
+
+        optimizers = getattr(self.optimizer, 'optimizers', [self.optimizer])
+        for optimizer in optimizers:
+            self.grad_scaler.step(optimizer)
+        self.grad_scaler.update()
+
     def _move_batch_to_device(
         self, batch: Tuple[Tuple[torch.tensor, torch.tensor], torch.tensor],
     ) -> Tuple[Tuple[torch.tensor, torch.tensor], torch.tensor]:
@@ -398,12 +898,21 @@ class CollieMinimalTrainer():
 
         return ((users, pos_items), neg_items)
 
-    def _log_step(self, name: str, steps: int, total_loss: torch.tensor, batch_idx: int) -> None:
-        """Check if we should and, if so, log step-loss metrics to our logger."""
+    def _log_step(self,
+                  name: str,
+                  steps: int,
+                  total_loss: torch.tensor,
+                  batch_idx: int,
+                  timings: Optional[Dict[str, float]] = None) -> None:
+        """Check if we should and, if so, log step-loss and timing metrics to our logger."""
         if self.logger is not None:
             if steps % self.log_every_n_steps == 0:
                 batch_loss = (total_loss / (batch_idx + 1)).item()
                 self.logger.log_metrics(metrics={f'{name}_loss_step': batch_loss}, step=steps)
+
+                if timings:
+                    self.logger.log_metrics(metrics=self.timings.metrics(timings, suffix='step'),
+                                            step=steps)
             if steps % self.flush_logs_every_n_steps == 0:
                 self.logger.save()
 
@@ -412,3 +921,121 @@ class CollieMinimalTrainer():
         if self.logger is not None:
             self.logger.save()
             self.logger.finalize(status='FINISHED')
+
+
+def _shard_dataloader(dataloader: torch.utils.data.DataLoader,
+                      num_replicas: int,
+                      rank: int) -> torch.utils.data.DataLoader:
+    """
+    Partition a training DataLoader's batches into ``num_replicas`` disjoint shards, returning a
+    new DataLoader for the shard for ``rank``.
+
+    ``ApproximateNegativeSampler`` and ``HDF5Sampler`` samplers and ``TensorInteractionsDataLoader``
+    and ``PrecomputedInteractionsDataLoader`` DataLoaders are copied and partitioned by batch. Any
+    other DataLoader with automatic batching, such as an ``InteractionsDataLoader``, is rebuilt
+    with a ``torch.utils.data.DistributedSampler``.
+
+    """
+    if isinstance(dataloader, (TensorInteractionsDataLoader, PrecomputedInteractionsDataLoader)):
+        sharded_dataloader = copy.copy(dataloader)
+        sharded_dataloader.num_replicas = num_replicas
+        sharded_dataloader.rank = rank
+
+        return sharded_dataloader
+
+    sampler = dataloader.sampler
+
+    if isinstance(sampler, (ApproximateNegativeSampler, HDF5Sampler)):
+        sharded_sampler = copy.copy(sampler)
+        sharded_sampler.num_replicas = num_replicas
+        sharded_sampler.rank = rank
+    elif dataloader.batch_size is not None:
+        sharded_sampler = torch.utils.data.DistributedSampler(
+            dataloader.dataset,
+            num_replicas=num_replicas,
+            rank=rank,
+            shuffle=isinstance(sampler, torch.utils.data.RandomSampler),
+            seed=getattr(dataloader.dataset, 'seed', None) or 0,
+            drop_last=dataloader.drop_last,
+        )
+    else:
+        raise ValueError(
+            f'Unable to partition a DataLoader with sampler {type(sampler).__name__} across '
+            'processes!'
+        )
+
+    return torch.utils.data.DataLoader(dataloader.dataset,
+                                       batch_size=dataloader.batch_size,
+                                       sampler=sharded_sampler,
+                                       num_workers=dataloader.num_workers,
+                                       collate_fn=dataloader.collate_fn,
+                                       pin_memory=dataloader.pin_memory,
+                                       drop_last=dataloader.drop_last)
+
+
+@contextlib.contextmanager
+def _bfloat16_forward(model: torch.nn.Module) -> Iterator[None]:
+    """
+    Run ``model`` with ``bfloat16`` weights and inputs for every layer other than embedding tables,
+    keeping the full-precision weights as the parameters that gradients accumulate in.
+
+    Each floating point parameter is replaced with a ``bfloat16`` copy for the duration of the
+    context. Since the copy is made with a differentiable cast, the backward pass converts its
+    gradient back to ``float32`` for the original parameter, which is restored on exit.
+
+    """
+    cast_modules, hook_handles = [], []
+    for module in model.modules():
+        if isinstance(module, torch.nn.Embedding):
+            continue
+
+        parameters = {
+            name: parameter
+            for name, parameter in module._parameters.items()
+            if parameter is not None and parameter.is_floating_point()
+        }
+        if len(parameters) == 0:
+            continue
+
+        for name, parameter in parameters.items():
+            module._parameters[name] = parameter.to(torch.bfloat16)
+        cast_modules.append((module, parameters))
+        hook_handles.append(module.register_forward_pre_hook(_cast_inputs_to_bfloat16))
+
+    try:
+        yield
+    finally:
+        for handle in hook_handles:
+            handle.remove()
+        for module, parameters in cast_modules:
+            module._parameters.update(parameters)
+
+
+def _cast_inputs_to_bfloat16(module: torch.nn.Module, inputs: Tuple[Any, ...]) -> Tuple[Any, ...]:
+    """Forward pre-hook casting floating point tensor inputs to ``bfloat16``."""
+    return tuple(
+        input.to(torch.bfloat16)
+        if isinstance(input, torch.Tensor) and input.is_floating_point()
+        else input
+        for input in inputs
+    )
+
+
+def _launched_with_torchrun() -> bool:
+    """Check if the environment variables set by ``torchrun`` are present."""
+    return all(variable in os.environ for variable in ('RANK', 'WORLD_SIZE', 'MASTER_ADDR'))
+
+
+def _find_free_port() -> int:
+    """Find an open port on this machine for distributed processes to rendezvous on."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _set_dataloader_epoch(dataloader: torch.utils.data.DataLoader, epoch: int) -> None:
+    """Set the epoch on a DataLoader or its sampler, if it shuffles based on the epoch."""
+    if isinstance(dataloader, TensorInteractionsDataLoader):
+        dataloader.set_epoch(epoch)
+    elif hasattr(dataloader.sampler, 'set_epoch'):
+        dataloader.sampler.set_epoch(epoch)
@@ -9,11 +9,11 @@ from torch.optim.lr_scheduler import ReduceLROnPlateau
 from collie_recs.model.base import (BasePipeline,
                                     INTERACTIONS_LIKE_INPUT,
                                     ScaledEmbedding)
-from collie_recs.utils import get_init_arguments, merge_docstrings
+from collie_recs.utils import get_init_arguments, lazy_merge_docstrings
 
 
 class CollaborativeMetricLearningModel(BasePipeline):
-    # NOTE: the full docstring is merged in with ``BasePipeline``'s using ``merge_docstrings``.
+    # NOTE: the full docstring is merged in with ``BasePipeline``'s using ``lazy_merge_docstrings``.
     # Only the description of new or changed parameters are included in this docstring
     """
     Training pipeline for the collaborative metric learning model.
@@ -51,8 +51,9 @@ class CollaborativeMetricLearningModel(BasePipeline):
     embedding_dim: int
         Number of latent factors to use for user and item embeddings
     sparse: bool
-        Whether or not to treat embeddings as sparse tensors. If ``True``, cannot use weight decay
-        on the optimizer
+        Whether or not to treat embeddings as sparse tensors. If ``True``, embedding tables are
+        optimized separately from all other layers with an optimizer that only updates the rows
+        in each batch. See ``optimizer`` for details
     y_range: tuple
         Specify as ``(min, max)`` to apply a sigmoid layer to the output score of the model to get
         predicted ratings within the range of ``min`` and ``max``
@@ -77,12 +78,13 @@ class CollaborativeMetricLearningModel(BasePipeline):
                  loss: Union[str, Callable] = 'hinge',
                  metadata_for_loss: Optional[Dict[str, torch.tensor]] = None,
                  metadata_for_loss_weights: Optional[Dict[str, float]] = None,
+                 memory_efficient_loss: bool = False,
                  y_range: Optional[Tuple[float, float]] = None,
                  load_model_path: Optional[str] = None,
                  map_location: Optional[str] = None):
         super().__init__(**get_init_arguments())
 
-    __doc__ = merge_docstrings(BasePipeline, __doc__, __init__)
+    __doc__ = lazy_merge_docstrings(BasePipeline, __doc__, __init__)
 
     def _setup_model(self, **kwargs) -> None:
         """
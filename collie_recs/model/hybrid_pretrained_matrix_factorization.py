@@ -5,7 +5,6 @@ import os
 from pathlib import Path
 from typing import Callable, Dict, List, Optional, Union
 
-import joblib
 import numpy as np
 import pandas as pd
 import torch
@@ -18,11 +17,11 @@ from collie_recs.model.base import (BasePipeline,
                                     INTERACTIONS_LIKE_INPUT,
                                     ScaledEmbedding)
 from collie_recs.model.matrix_factorization import MatrixFactorizationModel
-from collie_recs.utils import get_init_arguments, merge_docstrings
+from collie_recs.utils import get_init_arguments, lazy_merge_docstrings
 
 
 class HybridPretrainedModel(BasePipeline):
-    # NOTE: the full docstring is merged in with ``BasePipeline``'s using ``merge_docstrings``.
+    # NOTE: the full docstring is merged in with ``BasePipeline``'s using ``lazy_merge_docstrings``.
     # Only the description of new or changed parameters are included in this docstring
     """
     Training pipeline for a hybrid recommendation model.
@@ -81,6 +80,11 @@ class HybridPretrainedModel(BasePipeline):
         When initializing the model, whether or not to freeze ``trained_model``'s embeddings
     dropout_p: float
         Probability of dropout
+    sparse: bool
+        Whether or not to treat embeddings as sparse tensors. If ``True``, embedding tables are
+        optimized separately from all other layers with an optimizer that only updates the rows
+        in each batch. See ``optimizer`` for details. Only applies if ``freeze_embeddings`` is
+        ``False``
     optimizer: torch.optim or str
         If a string, one of the following supported optimizers:
 
@@ -88,6 +92,14 @@ class HybridPretrainedModel(BasePipeline):
 
         * ``'adam'`` (for ``torch.optim.Adam``)
 
+        * ``'lazy_adam'`` (for ``collie_recs.model.LazyAdam``)
+
+        * ``'adagrad'`` (for ``torch.optim.Adagrad``)
+
+        If ``sparse`` is ``True``, ``'sparse_adam'`` (for ``torch.optim.SparseAdam``) is also
+        supported, and embedding tables are optimized separately from all other layers. For
+        ``'adam'``, embeddings are optimized with ``LazyAdam``, while all other layers are
+        optimized with ``torch.optim.Adam``
     """
     def __init__(self,
                  train: INTERACTIONS_LIKE_INPUT = None,
@@ -98,6 +110,7 @@ class HybridPretrainedModel(BasePipeline):
                  combined_layers_dims: List[int] = [128, 64, 32],
                  freeze_embeddings: bool = True,
                  dropout_p: float = 0.0,
+                 sparse: bool = False,
                  lr: float = 1e-3,
                  lr_scheduler_func: Optional[Callable] = partial(ReduceLROnPlateau,
                                                                  patience=1,
@@ -107,6 +120,7 @@ class HybridPretrainedModel(BasePipeline):
                  loss: Union[str, Callable] = 'hinge',
                  metadata_for_loss: Optional[Dict[str, torch.tensor]] = None,
                  metadata_for_loss_weights: Optional[Dict[str, float]] = None,
+                 memory_efficient_loss: bool = False,
                  # y_range: Optional[Tuple[float, float]] = None,
                  load_model_path: Optional[str] = None,
                  map_location: Optional[str] = None):
@@ -129,9 +143,11 @@ class HybridPretrainedModel(BasePipeline):
         super().__init__(**get_init_arguments(),
                          item_metadata_num_cols=item_metadata_num_cols)
 
-    __doc__ = merge_docstrings(BasePipeline, __doc__, __init__)
+    __doc__ = lazy_merge_docstrings(BasePipeline, __doc__, __init__)
 
     def _load_model_init_helper(self, load_model_path: str, map_location: str, **kwargs) -> None:
+        import joblib
+
         self.item_metadata = joblib.load(os.path.join(load_model_path, 'metadata.pkl'))
         super()._load_model_init_helper(load_model_path=os.path.join(load_model_path, 'model.pth'),
                                         map_location=map_location)
@@ -155,6 +171,8 @@ class HybridPretrainedModel(BasePipeline):
                 copy.deepcopy(self._trained_model.user_embeddings),
                 copy.deepcopy(self._trained_model.item_embeddings)
             )
+            self.embeddings[0].sparse = self.hparams.sparse
+            self.embeddings[1].sparse = self.hparams.sparse
 
             if self.hparams.freeze_embeddings:
                 self.freeze_embeddings()
@@ -170,8 +188,12 @@ class HybridPretrainedModel(BasePipeline):
             # assume we are loading in a previously-saved model
             # set up dummy embeddings with the correct dimensions so we can load weights in
             self.embeddings = nn.Sequential(
-                ScaledEmbedding(self.hparams.user_num_embeddings, self.hparams.user_embeddings_dim),
-                ScaledEmbedding(self.hparams.item_num_embeddings, self.hparams.item_embeddings_dim)
+                ScaledEmbedding(self.hparams.user_num_embeddings,
+                                self.hparams.user_embeddings_dim,
+                                sparse=self.hparams.sparse),
+                ScaledEmbedding(self.hparams.item_num_embeddings,
+                                self.hparams.item_embeddings_dim,
+                                sparse=self.hparams.sparse),
             )
 
         self.dropout = nn.Dropout(p=self.hparams.dropout_p)
@@ -296,6 +318,8 @@ class HybridPretrainedModel(BasePipeline):
             if os.listdir(path) and overwrite is False:
                 raise ValueError(f'Data exists in ``path`` at {path} and ``overwrite`` is False.')
 
+        import joblib
+
         Path(path).mkdir(parents=True, exist_ok=True)
         joblib.dump(self.item_metadata, os.path.join(path, 'metadata.pkl'))
 
@@ -312,6 +336,15 @@ class HybridPretrainedModel(BasePipeline):
         dict_to_save = {'state_dict': state_dict_to_save, 'hparams': self.hparams}
         torch.save(dict_to_save, os.path.join(path, 'model.pth'))
 
+    def _get_inference_tables(self) -> Dict[str, torch.tensor]:
+        """Tensors needed to score the model outside of PyTorch, including the item metadata."""
+        inference_tables = OrderedDict(
+            (k, v) for k, v in self.state_dict().items() if '_trained_model' not in k
+        )
+        inference_tables['item_metadata'] = self.item_metadata
+
+        return inference_tables
+
     def load_from_hybrid_model(self, hybrid_model) -> None:
         """
         Copy hyperparameters and state dictionary from an existing ``HybridPretrainedModel``
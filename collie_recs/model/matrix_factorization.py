@@ -10,11 +10,11 @@ from collie_recs.model.base import (BasePipeline,
                                     INTERACTIONS_LIKE_INPUT,
                                     ScaledEmbedding,
                                     ZeroEmbedding)
-from collie_recs.utils import get_init_arguments, merge_docstrings
+from collie_recs.utils import get_init_arguments, lazy_merge_docstrings
 
 
 class MatrixFactorizationModel(BasePipeline):
-    # NOTE: the full docstring is merged in with ``BasePipeline``'s using ``merge_docstrings``.
+    # NOTE: the full docstring is merged in with ``BasePipeline``'s using ``lazy_merge_docstrings``.
     # Only the description of new or changed parameters are included in this docstring
     """
     Training pipeline for the matrix factorization model.
@@ -60,8 +60,9 @@ class MatrixFactorizationModel(BasePipeline):
     dropout_p: float
         Probability of dropout
     sparse: bool
-        Whether or not to treat embeddings as sparse tensors. If ``True``, cannot use weight decay
-        on the optimizer
+        Whether or not to treat embeddings as sparse tensors. If ``True``, embedding tables are
+        optimized separately from all other layers with an optimizer that only updates the rows
+        in each batch. See ``optimizer`` for details
     bias_lr: float
         Bias terms learning rate. If 'infer', will set equal to ``lr``
     bias_optimizer: torch.optim or str
@@ -91,12 +92,13 @@ class MatrixFactorizationModel(BasePipeline):
                  loss: Union[str, Callable] = 'hinge',
                  metadata_for_loss: Optional[Dict[str, torch.tensor]] = None,
                  metadata_for_loss_weights: Optional[Dict[str, float]] = None,
+                 memory_efficient_loss: bool = False,
                  y_range: Optional[Tuple[float, float]] = None,
                  load_model_path: Optional[str] = None,
                  map_location: Optional[str] = None):
         super().__init__(**get_init_arguments())
 
-    __doc__ = merge_docstrings(BasePipeline, __doc__, __init__)
+    __doc__ = lazy_merge_docstrings(BasePipeline, __doc__, __init__)
 
     def _setup_model(self, **kwargs) -> None:
         """
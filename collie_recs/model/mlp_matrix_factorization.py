@@ -10,11 +10,11 @@ from collie_recs.model.base import (BasePipeline,
                                     INTERACTIONS_LIKE_INPUT,
                                     ScaledEmbedding,
                                     ZeroEmbedding)
-from collie_recs.utils import get_init_arguments, merge_docstrings
+from collie_recs.utils import get_init_arguments, lazy_merge_docstrings
 
 
 class MLPMatrixFactorizationModel(BasePipeline):
-    # NOTE: the full docstring is merged in with ``BasePipeline``'s using ``merge_docstrings``.
+    # NOTE: the full docstring is merged in with ``BasePipeline``'s using ``lazy_merge_docstrings``.
     # Only the description of new or changed parameters are included in this docstring
     """
     Training pipeline for the matrix factorization model with MLP layers instead of a final dot
@@ -54,6 +54,10 @@ class MLPMatrixFactorizationModel(BasePipeline):
         the formula ``embedding_dim * (2 ** (``num_layers`` - ``current_layer_number``))``
     dropout_p: float
         Probability of dropout on the linear layers
+    sparse: bool
+        Whether or not to treat embeddings as sparse tensors. If ``True``, embedding tables are
+        optimized separately from all other layers with an optimizer that only updates the rows
+        in each batch. See ``optimizer`` for details
     bias_lr: float
         Bias terms learning rate. If 'infer', will set equal to ``lr``
     optimizer: torch.optim or str
@@ -63,6 +67,14 @@ class MLPMatrixFactorizationModel(BasePipeline):
 
         * ``'adam'`` (for ``torch.optim.Adam``)
 
+        * ``'lazy_adam'`` (for ``collie_recs.model.LazyAdam``)
+
+        * ``'adagrad'`` (for ``torch.optim.Adagrad``)
+
+        If ``sparse`` is ``True``, ``'sparse_adam'`` (for ``torch.optim.SparseAdam``) is also
+        supported, and embedding tables are optimized separately from all other layers. For
+        ``'adam'``, embeddings are optimized with ``LazyAdam``, while all other layers are
+        optimized with ``torch.optim.Adam``
     bias_optimizer: torch.optim or str
         Optimizer for the bias terms. This supports the same string options as ``optimizer``, with
         the addition of ``infer``, which will set the optimizer equal to ``optimizer``. If
@@ -79,6 +91,7 @@ class MLPMatrixFactorizationModel(BasePipeline):
                  embedding_dim: int = 30,
                  num_layers: int = 3,
                  dropout_p: float = 0.0,
+                 sparse: bool = False,
                  lr: float = 1e-3,
                  bias_lr: Optional[Union[float, str]] = 1e-2,
                  lr_scheduler_func: Optional[Callable] = partial(ReduceLROnPlateau,
@@ -90,12 +103,13 @@ class MLPMatrixFactorizationModel(BasePipeline):
                  loss: Union[str, Callable] = 'hinge',
                  metadata_for_loss: Optional[Dict[str, torch.tensor]] = None,
                  metadata_for_loss_weights: Optional[Dict[str, float]] = None,
+                 memory_efficient_loss: bool = False,
                  y_range: Optional[Tuple[float, float]] = None,
                  load_model_path: Optional[str] = None,
                  map_location: Optional[str] = None):
         super().__init__(**get_init_arguments())
 
-    __doc__ = merge_docstrings(BasePipeline, __doc__, __init__)
+    __doc__ = lazy_merge_docstrings(BasePipeline, __doc__, __init__)
 
     def _setup_model(self, **kwargs) -> None:
         """
@@ -105,13 +119,17 @@ class MLPMatrixFactorizationModel(BasePipeline):
 
         """
         self.user_biases = ZeroEmbedding(num_embeddings=self.hparams.num_users,
-                                         embedding_dim=1)
+                                         embedding_dim=1,
+                                         sparse=self.hparams.sparse)
         self.item_biases = ZeroEmbedding(num_embeddings=self.hparams.num_items,
-                                         embedding_dim=1)
+                                         embedding_dim=1,
+                                         sparse=self.hparams.sparse)
         self.user_embeddings = ScaledEmbedding(num_embeddings=self.hparams.num_users,
-                                               embedding_dim=self.hparams.embedding_dim)
+                                               embedding_dim=self.hparams.embedding_dim,
+                                               sparse=self.hparams.sparse)
         self.item_embeddings = ScaledEmbedding(num_embeddings=self.hparams.num_items,
-                                               embedding_dim=self.hparams.embedding_dim)
+                                               embedding_dim=self.hparams.embedding_dim,
+                                               sparse=self.hparams.sparse)
 
         mlp_modules = []
         input_size = self.hparams.embedding_dim * 2
@@ -8,11 +8,11 @@ import torch.nn.functional as F
 from torch.optim.lr_scheduler import ReduceLROnPlateau
 
 from collie_recs.model.base import BasePipeline, INTERACTIONS_LIKE_INPUT, ScaledEmbedding
-from collie_recs.utils import get_init_arguments, merge_docstrings, trunc_normal
+from collie_recs.utils import get_init_arguments, lazy_merge_docstrings, trunc_normal
 
 
 class NeuralCollaborativeFiltering(BasePipeline):
-    # NOTE: the full docstring is merged in with ``BasePipeline``'s using ``merge_docstrings``.
+    # NOTE: the full docstring is merged in with ``BasePipeline``'s using ``lazy_merge_docstrings``.
     # Only the description of new or changed parameters are included in this docstring
     """
     Training pipeline for a neural matrix factorization model.
@@ -70,6 +70,10 @@ class NeuralCollaborativeFiltering(BasePipeline):
 
     dropout_p: float
         Probability of dropout on the MLP layers
+    sparse: bool
+        Whether or not to treat embeddings as sparse tensors. If ``True``, embedding tables are
+        optimized separately from all other layers with an optimizer that only updates the rows
+        in each batch. See ``optimizer`` for details
     optimizer: torch.optim or str
         If a string, one of the following supported optimizers:
 
@@ -77,6 +81,14 @@ class NeuralCollaborativeFiltering(BasePipeline):
 
         * ``'adam'`` (for ``torch.optim.Adam``)
 
+        * ``'lazy_adam'`` (for ``collie_recs.model.LazyAdam``)
+
+        * ``'adagrad'`` (for ``torch.optim.Adagrad``)
+
+        If ``sparse`` is ``True``, ``'sparse_adam'`` (for ``torch.optim.SparseAdam``) is also
+        supported, and embedding tables are optimized separately from all other layers. For
+        ``'adam'``, embeddings are optimized with ``LazyAdam``, while all other layers are
+        optimized with ``torch.optim.Adam``
     References
     ----------
     .. [2] Xiangnan et al. "Neural Collaborative Filtering." Neural Collaborative Filtering |
@@ -91,6 +103,7 @@ class NeuralCollaborativeFiltering(BasePipeline):
                  num_layers: int = 3,
                  final_layer: Optional[Union[str, Callable]] = None,
                  dropout_p: float = 0.0,
+                 sparse: bool = False,
                  lr: float = 1e-3,
                  lr_scheduler_func: Optional[Callable] = partial(ReduceLROnPlateau,
                                                                  patience=1,
@@ -100,12 +113,13 @@ class NeuralCollaborativeFiltering(BasePipeline):
                  loss: Union[str, Callable] = 'hinge',
                  metadata_for_loss: Optional[Dict[str, torch.tensor]] = None,
                  metadata_for_loss_weights: Optional[Dict[str, float]] = None,
+                 memory_efficient_loss: bool = False,
                  # y_range: Optional[Tuple[float, float]] = None,
                  load_model_path: Optional[str] = None,
                  map_location: Optional[str] = None):
         super().__init__(**get_init_arguments())
 
-    __doc__ = merge_docstrings(BasePipeline, __doc__, __init__)
+    __doc__ = lazy_merge_docstrings(BasePipeline, __doc__, __init__)
 
     def _setup_model(self, **kwargs) -> None:
         """
@@ -115,18 +129,22 @@ class NeuralCollaborativeFiltering(BasePipeline):
 
         """
         self.user_embeddings_cf = ScaledEmbedding(num_embeddings=self.hparams.num_users,
-                                                  embedding_dim=self.hparams.embedding_dim)
+                                                  embedding_dim=self.hparams.embedding_dim,
+                                                  sparse=self.hparams.sparse)
         self.item_embeddings_cf = ScaledEmbedding(num_embeddings=self.hparams.num_items,
-                                                  embedding_dim=self.hparams.embedding_dim)
+                                                  embedding_dim=self.hparams.embedding_dim,
+                                                  sparse=self.hparams.sparse)
 
         mlp_embedding_dim = self.hparams.embedding_dim * (2 ** (self.hparams.num_layers - 1))
         self.user_embeddings_mlp = ScaledEmbedding(
             num_embeddings=self.hparams.num_users,
             embedding_dim=mlp_embedding_dim,
+            sparse=self.hparams.sparse,
         )
         self.item_embeddings_mlp = ScaledEmbedding(
             num_embeddings=self.hparams.num_items,
             embedding_dim=mlp_embedding_dim,
+            sparse=self.hparams.sparse,
         )
 
         mlp_modules = []
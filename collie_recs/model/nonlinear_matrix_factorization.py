@@ -11,11 +11,11 @@ from collie_recs.model.base import (BasePipeline,
                                     INTERACTIONS_LIKE_INPUT,
                                     ScaledEmbedding,
                                     ZeroEmbedding)
-from collie_recs.utils import get_init_arguments, merge_docstrings
+from collie_recs.utils import get_init_arguments, lazy_merge_docstrings
 
 
 class NonlinearMatrixFactorizationModel(BasePipeline):
-    # NOTE: the full docstring is merged in with ``BasePipeline``'s using ``merge_docstrings``.
+    # NOTE: the full docstring is merged in with ``BasePipeline``'s using ``lazy_merge_docstrings``.
     # Only the description of new or changed parameters are included in this docstring
     """
     Training pipeline for a nonlinear matrix factorization model.
@@ -71,6 +71,10 @@ class NonlinearMatrixFactorizationModel(BasePipeline):
         Probability of dropout on the embedding layers
     dense_dropout_p: float
         Probability of dropout on the dense layers
+    sparse: bool
+        Whether or not to treat embeddings as sparse tensors. If ``True``, embedding tables are
+        optimized separately from all other layers with an optimizer that only updates the rows
+        in each batch. See ``optimizer`` for details
     bias_lr: float
         Bias terms learning rate. If 'infer', will set equal to ``lr``
     optimizer: torch.optim or str
@@ -80,6 +84,14 @@ class NonlinearMatrixFactorizationModel(BasePipeline):
 
         * ``'adam'`` (for ``torch.optim.Adam``)
 
+        * ``'lazy_adam'`` (for ``collie_recs.model.LazyAdam``)
+
+        * ``'adagrad'`` (for ``torch.optim.Adagrad``)
+
+        If ``sparse`` is ``True``, ``'sparse_adam'`` (for ``torch.optim.SparseAdam``) is also
+        supported, and embedding tables are optimized separately from all other layers. For
+        ``'adam'``, embeddings are optimized with ``LazyAdam``, while all other layers are
+        optimized with ``torch.optim.Adam``
     bias_optimizer: torch.optim or str
         Optimizer for the bias terms. This supports the same string options as ``optimizer``, with
         the addition of ``infer``, which will set the optimizer equal to ``optimizer``. If
@@ -99,6 +111,7 @@ class NonlinearMatrixFactorizationModel(BasePipeline):
                  item_dense_layers_dims: List[float] = [48, 32],
                  embedding_dropout_p: float = 0.0,
                  dense_dropout_p: float = 0.0,
+                 sparse: bool = False,
                  lr: float = 1e-3,
                  bias_lr: Optional[Union[float, str]] = 1e-2,
                  lr_scheduler_func: Optional[Callable] = partial(ReduceLROnPlateau,
@@ -110,12 +123,13 @@ class NonlinearMatrixFactorizationModel(BasePipeline):
                  loss: Union[str, Callable] = 'hinge',
                  metadata_for_loss: Optional[Dict[str, torch.tensor]] = None,
                  metadata_for_loss_weights: Optional[Dict[str, float]] = None,
+                 memory_efficient_loss: bool = False,
                  y_range: Optional[Tuple[float, float]] = None,
                  load_model_path: Optional[str] = None,
                  map_location: Optional[str] = None):
         super().__init__(**get_init_arguments())
 
-    __doc__ = merge_docstrings(BasePipeline, __doc__, __init__)
+    __doc__ = lazy_merge_docstrings(BasePipeline, __doc__, __init__)
 
     def _setup_model(self, **kwargs) -> None:
         """
@@ -125,13 +139,17 @@ class NonlinearMatrixFactorizationModel(BasePipeline):
 
         """
         self.user_biases = ZeroEmbedding(num_embeddings=self.hparams.num_users,
-                                         embedding_dim=1)
+                                         embedding_dim=1,
+                                         sparse=self.hparams.sparse)
         self.item_biases = ZeroEmbedding(num_embeddings=self.hparams.num_items,
-                                         embedding_dim=1)
+                                         embedding_dim=1,
+                                         sparse=self.hparams.sparse)
         self.user_embeddings = ScaledEmbedding(num_embeddings=self.hparams.num_users,
-                                               embedding_dim=self.hparams.user_embedding_dim)
+                                               embedding_dim=self.hparams.user_embedding_dim,
+                                               sparse=self.hparams.sparse)
         self.item_embeddings = ScaledEmbedding(num_embeddings=self.hparams.num_items,
-                                               embedding_dim=self.hparams.item_embedding_dim)
+                                               embedding_dim=self.hparams.item_embedding_dim,
+                                               sparse=self.hparams.sparse)
 
         self.embedding_dropout = nn.Dropout(p=self.hparams.embedding_dropout_p)
         self.dense_dropout = nn.Dropout(p=self.hparams.dense_dropout_p)
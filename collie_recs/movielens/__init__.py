@@ -1,3 +1,16 @@
-from collie_recs.movielens.get_data import *
-from collie_recs.movielens.run import *
-from collie_recs.movielens.visualize import *
+from collie_recs import _lazy
+
+
+__getattr__, __dir__, __all__ = _lazy.attach(
+    __name__,
+    {
+        'get_data': [
+            'read_movielens_df',
+            'read_movielens_df_item',
+            'read_movielens_posters_df',
+            'get_movielens_metadata',
+        ],
+        'run': ['run_movielens_example'],
+        'visualize': ['get_recommendation_visualizations'],
+    },
+)
@@ -1,14 +1,19 @@
+import contextlib
 from datetime import datetime
+import functools
 import inspect
+import os
 from pathlib import Path
 import re
+import sys
+import threading
 import time
-from typing import Any, Dict, Iterable, List, Optional, Union
+import tracemalloc
+from typing import Any, Callable, ContextManager, Dict, Iterable, List, Optional, Union
+import warnings
 
-import docstring_parser
 import numpy as np
 import pandas as pd
-import pytorch_lightning
 from scipy.sparse import coo_matrix
 import torch
 
@@ -231,8 +236,10 @@ def get_init_arguments(exclude: Optional[Iterable[str]] = [],
     an empty dictionary.
 
     """
+    from pytorch_lightning.utilities.parsing import get_init_args
+
     frame = inspect.currentframe().f_back
-    init_args = pytorch_lightning.utilities.parsing.get_init_args(frame)
+    init_args = get_init_args(frame)
 
     if exclude:
         for exclude_arg in exclude:
@@ -431,6 +438,300 @@ class Timer(object):
         return total_time
 
 
+class StageProfiler(Timer):
+    """
+    ``Timer`` that also tracks the peak memory used by named stages of a job.
+
+    For each stage, records the time elapsed along with three views of memory:
+
+    * ``peak_rss``: peak resident set size of the process, in bytes, sampled in a background
+      thread every ``sample_interval`` seconds while the stage runs
+
+    * ``peak_python``: peak memory allocated by Python during the stage, in bytes, as reported
+      by ``tracemalloc``. This is ``None`` if ``trace_python_allocations = False``
+
+    * ``peak_torch``: peak memory allocated by PyTorch's CUDA caching allocator during the stage,
+      in bytes. This is ``None`` when CUDA is not available
+
+    Stages may be nested, in which case the peaks of an outer stage include those of every stage
+    inside it.
+
+    Any function, such as ``Interactions``, ``stratified_split``, or ``evaluate_in_batches``, can
+    be profiled by wrapping it in a stage. Each epoch of a ``CollieMinimalTrainer`` can be
+    profiled by passing a ``StageProfiler`` as its ``stage_profiler`` argument.
+
+    Parameters
+    ----------
+    memory_budget: int
+        If provided, a warning is raised whenever the peak resident set size or peak PyTorch
+        allocation of a stage exceeds this many bytes
+    trace_python_allocations: bool
+        Whether to trace Python allocations with ``tracemalloc`` during stages. Note that this can
+        slow down allocation-heavy code considerably
+    sample_interval: float
+        Seconds between samples of the resident set size during a stage
+    verbose: bool
+        Print the time and peak memory of each stage as it finishes
+
+    Attributes
+    ----------
+    stages: dict
+        Keys are stage names and values are dictionaries with keys ``time`` (in minutes, to match
+        ``Timer``), ``start_rss``, ``end_rss``, ``peak_rss``, ``peak_python``, and ``peak_torch``.
+        A stage run more than once keeps only its latest result
+
+    Examples
+    --------
+    .. code-block:: python
+
+        from collie_recs.cross_validation import stratified_split
+        from collie_recs.interactions import Interactions
+        from collie_recs.metrics import evaluate_in_batches, mapk
+        from collie_recs.utils import StageProfiler
+
+
+        profiler = StageProfiler(memory_budget=8 * 1024 ** 3)
+
+        with profiler.stage('interactions'):
+            interactions = Interactions(users=users, items=items)
+
+        train, test = profiler.wrap(stratified_split, 'split')(interactions)
+
+        ...
+
+        profiler.wrap(evaluate_in_batches, 'evaluate')([mapk], test, model)
+
+        print(profiler.summary())
+
+    """
+    def __init__(self,
+                 memory_budget: Optional[int] = None,
+                 trace_python_allocations: bool = True,
+                 sample_interval: float = 0.01,
+                 verbose: bool = True):
+        super().__init__()
+
+        self.memory_budget = memory_budget
+        self.trace_python_allocations = trace_python_allocations
+        self.sample_interval = sample_interval
+        self.verbose = verbose
+
+        self.stages = dict()
+        self._stack = list()
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterable[None]:
+        """
+        Context manager to profile the code run inside it as stage ``name``.
+
+        Parameters
+        ----------
+        name: str
+            Name of the stage
+
+        """
+        record = {'start_rss': _get_current_rss(), 'peak_python': None, 'peak_torch': None}
+        record['peak_rss'] = record['start_rss']
+
+        # peak counters are global, so fold the peaks seen so far into the enclosing stage before
+        # resetting them for this one
+        self._fold_peaks_into_parent()
+
+        started_tracemalloc = False
+        if self.trace_python_allocations:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracemalloc = True
+            elif hasattr(tracemalloc, 'reset_peak'):
+                tracemalloc.reset_peak()
+            record['peak_python'] = 0
+
+        if torch.cuda.is_available():
+            torch.cuda.reset_peak_memory_stats()
+            record['peak_torch'] = 0
+
+        stop_sampling = threading.Event()
+
+        def _sample_rss() -> None:
+            while not stop_sampling.wait(self.sample_interval):
+                record['peak_rss'] = max(record['peak_rss'], _get_current_rss())
+
+        sampler = threading.Thread(target=_sample_rss, daemon=True)
+        sampler.start()
+
+        self._stack.append(record)
+        start_time = time.time()
+
+        try:
+            yield
+        finally:
+            elapsed_time = (time.time() - start_time) / 60.0
+
+            stop_sampling.set()
+            sampler.join()
+
+            self._stack.pop()
+
+            record['end_rss'] = _get_current_rss()
+            record['peak_rss'] = max(record['peak_rss'], record['end_rss'])
+            if record['peak_python'] is not None:
+                record['peak_python'] = max(record['peak_python'],
+                                            tracemalloc.get_traced_memory()[1])
+                if started_tracemalloc:
+                    tracemalloc.stop()
+            if record['peak_torch'] is not None:
+                record['peak_torch'] = max(record['peak_torch'],
+                                           torch.cuda.max_memory_allocated())
+
+            if self._stack:
+                parent = self._stack[-1]
+                for key in ['peak_rss', 'peak_python', 'peak_torch']:
+                    if parent[key] is not None and record[key] is not None:
+                        parent[key] = max(parent[key], record[key])
+
+            self.stages[name] = {
+                'time': elapsed_time,
+                'start_rss': record['start_rss'],
+                'end_rss': record['end_rss'],
+                'peak_rss': record['peak_rss'],
+                'peak_python': record['peak_python'],
+                'peak_torch': record['peak_torch'],
+            }
+            self.current_time = time.time()
+
+            if self.verbose:
+                print(self._format_stage(name))
+
+            self._check_memory_budget(name)
+
+    def wrap(self, function: Callable, name: Optional[str] = None) -> Callable:
+        """
+        Wrap ``function`` so every call to it is profiled as a stage.
+
+        Parameters
+        ----------
+        function: function
+            Function to profile
+        name: str
+            Name of the stage. If ``None``, the name of ``function`` will be used
+
+        Returns
+        -------
+        wrapped_function: function
+
+        """
+        name = name or function.__name__
+
+        @functools.wraps(function)
+        def _wrapped_function(*args, **kwargs) -> Any:
+            with self.stage(name):
+                return function(*args, **kwargs)
+
+        return _wrapped_function
+
+    def summary(self) -> pd.DataFrame:
+        """Get the time and peak memory of every stage profiled so far as a DataFrame."""
+        return pd.DataFrame.from_dict(
+            self.stages,
+            orient='index',
+            columns=['time', 'start_rss', 'end_rss', 'peak_rss', 'peak_python', 'peak_torch'],
+        )
+
+    def _fold_peaks_into_parent(self) -> None:
+        """Record peaks reached so far by the enclosing stage before its counters are reset."""
+        if not self._stack:
+            return
+
+        parent = self._stack[-1]
+        if parent['peak_python'] is not None and tracemalloc.is_tracing():
+            parent['peak_python'] = max(parent['peak_python'], tracemalloc.get_traced_memory()[1])
+        if parent['peak_torch'] is not None:
+            parent['peak_torch'] = max(parent['peak_torch'], torch.cuda.max_memory_allocated())
+
+    def _format_stage(self, name: str) -> str:
+        """Format the results of a stage for printing."""
+        stage = self.stages[name]
+
+        details = [
+            '{0:.2f} min'.format(stage['time']),
+            f'peak RSS {_format_bytes(stage["peak_rss"])}',
+        ]
+        if stage['peak_python'] is not None:
+            details.append(f'peak Python {_format_bytes(stage["peak_python"])}')
+        if stage['peak_torch'] is not None:
+            details.append(f'peak PyTorch {_format_bytes(stage["peak_torch"])}')
+
+        return f'{name} ({", ".join(details)})'
+
+    def _check_memory_budget(self, name: str) -> None:
+        """Warn if a stage used more memory than ``memory_budget``."""
+        if self.memory_budget is None:
+            return
+
+        stage = self.stages[name]
+        peak = max(stage['peak_rss'], stage['peak_torch'] or 0)
+
+        if peak > self.memory_budget:
+            warnings.warn(
+                f'Stage ``{name}`` peaked at {_format_bytes(peak)}, exceeding the memory budget of'
+                f' {_format_bytes(self.memory_budget)}.',
+                ResourceWarning,
+                stacklevel=3,
+            )
+
+
+def _get_current_rss() -> int:
+    """Get the current resident set size of this process in bytes."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+
+    # without ``/proc``, fall back to the high-water mark of the process, which ``ru_maxrss``
+    # reports in bytes on macOS and kilobytes elsewhere
+    import resource
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+
+def _format_bytes(num_bytes: int) -> str:
+    """Format a number of bytes with a human-readable unit."""
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if abs(num_bytes) < 1024:
+            return f'{num_bytes:.2f} {unit}'
+        num_bytes /= 1024
+
+    return f'{num_bytes:.2f} TB'
+
+
+def record_function(name: str) -> ContextManager:
+    """
+    Label a region of code with ``name`` in a ``torch.profiler`` trace, only if a profiler is
+    currently running.
+
+    ``torch.profiler.record_function`` has a small cost even when nothing is being profiled, which
+    adds up in tight training and evaluation loops. This returns a no-op context manager instead
+    when profiling is disabled.
+
+    Parameters
+    ----------
+    name: str
+        Label for the region in profiler traces and tables
+
+    Returns
+    -------
+    context_manager: context manager
+
+    """
+    if getattr(torch.autograd.profiler, '_is_profiler_enabled', True):
+        return torch.profiler.record_function(name)
+
+    return contextlib.nullcontext()
+
+
 def merge_docstrings(parent_class, child_docstring, child_class__init__):
     """
     Merge docstrings for Collie models to reduce the amount of repeated, shared docstrings.
@@ -466,6 +767,8 @@ def merge_docstrings(parent_class, child_docstring, child_class__init__):
       with a line of `-` the length of the title. If not, it will be filtered out.
 
     """
+    import docstring_parser
+
     # get parent class documentation
     parent_docstring = parent_class.__doc__
 
@@ -590,3 +893,48 @@ def merge_docstrings(parent_class, child_docstring, child_class__init__):
     final_docstring += NEWLINE_CHARACTER_FOUR_SPACES
 
     return final_docstring
+
+
+class lazy_merge_docstrings(object):
+    """
+    Descriptor that defers ``merge_docstrings`` until a model's ``__doc__`` is first accessed.
+
+    Merging docstrings requires parsing every model's docstring, which would otherwise happen at
+    import time for every model, even if no docstring is ever read. The merged docstring is cached
+    after it is first computed.
+
+    Parameters
+    ----------
+    parent_class: class
+        Class to merge the docstring of, typically ``BasePipeline``
+    child_docstring: str
+        Docstring of the child class
+    child_class__init__: function
+        ``__init__`` function of the child class
+
+    Example
+    -------
+    .. code-block:: python
+
+        class MatrixFactorizationModel(BasePipeline):
+            '''Short description.'''
+            def __init__(self, ...):
+                ...
+
+            __doc__ = lazy_merge_docstrings(BasePipeline, __doc__, __init__)
+
+    """
+    def __init__(self, parent_class, child_docstring, child_class__init__):
+        self.parent_class = parent_class
+        self.child_docstring = child_docstring
+        self.child_class__init__ = child_class__init__
+        self.docstring = None
+
+    def __get__(self, instance, owner=None) -> str:
+        """Merge docstrings on first access and return the cached result."""
+        if self.docstring is None:
+            self.docstring = merge_docstrings(parent_class=self.parent_class,
+                                              child_docstring=self.child_docstring,
+                                              child_class__init__=self.child_class__init__)
+
+        return self.docstring
@@ -22,7 +22,7 @@ setup(
     data_files=[('', ['LICENSE'])],
     packages=find_packages(exclude=('tests', 'docs')),
     keywords=['deep learning', 'pytorch', 'recommender'],
-    python_requires='>=3.6',
+    python_requires='>=3.7',
     install_requires=[
         'docstring_parser',
         'fire',
@@ -69,7 +69,6 @@ setup(
         'License :: OSI Approved :: BSD License',
         'Operating System :: OS Independent',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.6',
         'Programming Language :: Python :: 3.7',
         'Programming Language :: Python :: 3.8',
         'Programming Language :: Python :: 3.9',
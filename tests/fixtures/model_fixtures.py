@@ -79,22 +79,26 @@ def untrained_implicit_model_no_val_data(train_val_implicit_data):
                         'sparse_collaborative_metric_learning',
                         'mlp_mf',
                         'mlp_mf_with_y_range',
+                        'sparse_mlp_mf',
                         'sparse_mf',
                         'mf_no_val',
                         'mf_non_approximate',
                         'mf_approximate',
                         'nonlinear_mf',
                         'nonlinear_mf_with_y_range',
+                        'sparse_nonlinear_mf',
                         'neucf',
                         'neucf_sigmoid',
                         'neucf_relu',
                         'neucf_leaky_rulu',
                         'neucf_custom',
+                        'sparse_neucf',
                         'deep_fm',
                         'deep_fm_sigmoid',
                         'deep_fm_relu',
                         'deep_fm_leaky_rulu',
                         'deep_fm_custom',
+                        'sparse_deep_fm',
                         'hybrid_pretrained',
                         'hybrid_pretrained_metadata_layers'])
 def models_trained_for_one_step(request,
@@ -228,6 +232,18 @@ def models_trained_for_one_step(request,
         model = MLPMatrixFactorizationModel(train=train,
                                             val=val,
                                             y_range=(0, 2))
+    elif request.param == 'sparse_mlp_mf':
+        model = MLPMatrixFactorizationModel(train=train,
+                                            val=val,
+                                            embedding_dim=15,
+                                            num_layers=3,
+                                            lr=1e-1,
+                                            bias_lr=1e-2,
+                                            optimizer='adam',
+                                            bias_optimizer='sgd',
+                                            weight_decay=1e-7,
+                                            loss='hinge',
+                                            sparse=True)
     elif request.param == 'nonlinear_mf':
         model = NonlinearMatrixFactorizationModel(train=train,
                                                   val=val,
@@ -247,6 +263,17 @@ def models_trained_for_one_step(request,
         model = NonlinearMatrixFactorizationModel(train=train,
                                                   val=val,
                                                   y_range=(0, 4))
+    elif request.param == 'sparse_nonlinear_mf':
+        model = NonlinearMatrixFactorizationModel(train=train,
+                                                  val=val,
+                                                  user_embedding_dim=15,
+                                                  item_embedding_dim=15,
+                                                  user_dense_layers_dims=[15, 10],
+                                                  item_dense_layers_dims=[15, 10],
+                                                  optimizer='adagrad',
+                                                  bias_optimizer='sgd',
+                                                  loss='bpr',
+                                                  sparse=True)
     elif request.param == 'neucf':
         model = NeuralCollaborativeFiltering(train=train,
                                              val=val,
@@ -273,6 +300,14 @@ def models_trained_for_one_step(request,
         model = NeuralCollaborativeFiltering(train=train,
                                              val=val,
                                              final_layer=torch.tanh)
+    elif request.param == 'sparse_neucf':
+        model = NeuralCollaborativeFiltering(train=train,
+                                             val=val,
+                                             embedding_dim=10,
+                                             num_layers=1,
+                                             optimizer='sparse_adam',
+                                             loss='adaptive',
+                                             sparse=True)
     elif request.param == 'deep_fm':
         model = DeepFM(train=train,
                        val=val,
@@ -300,6 +335,16 @@ def models_trained_for_one_step(request,
         model = DeepFM(train=train,
                        val=val,
                        final_layer=torch.tanh)
+    elif request.param == 'sparse_deep_fm':
+        model = DeepFM(train=train,
+                       val=val,
+                       embedding_dim=10,
+                       num_layers=1,
+                       weight_decay=1e-7,
+                       optimizer='lazy_adam',
+                       bias_optimizer='infer',
+                       loss='hinge',
+                       sparse=True)
     elif (
         request.param == 'hybrid_pretrained' or request.param == 'hybrid_pretrained_metadata_layers'
     ):
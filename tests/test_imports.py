@@ -0,0 +1,113 @@
+import subprocess
+import sys
+
+import pytest
+
+
+def _modules_imported_by(statement):
+    output = subprocess.run(
+        [sys.executable, '-c', f'import sys; {statement}; print(" ".join(sys.modules))'],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+
+    return set(output.split())
+
+
+@pytest.mark.parametrize('statement,unexpected_modules', [
+    ('import collie_recs', [
+        'collie_recs.model.base.base_pipeline',
+        'docstring_parser',
+        'joblib',
+        'pytorch_lightning',
+        'sklearn',
+        'torch',
+        'torchmetrics',
+        'tqdm',
+    ]),
+    ('import collie_recs.inference', ['pytorch_lightning', 'torch']),
+    ('from collie_recs import InferenceModel', ['pytorch_lightning', 'torch']),
+    ('from collie_recs.metrics import mapk', [
+        'collie_recs.model.base.base_pipeline',
+        'pytorch_lightning',
+        'sklearn',
+        'torchmetrics',
+    ]),
+    ('from collie_recs import MatrixFactorizationModel', ['docstring_parser', 'sklearn']),
+])
+def test_lazy_imports(statement, unexpected_modules):
+    imported_modules = _modules_imported_by(statement)
+
+    for module in unexpected_modules:
+        assert module not in imported_modules
+
+
+def test_lazy_imports_public_api():
+    import collie_recs
+
+    for name in collie_recs.__all__:
+        assert getattr(collie_recs, name) is not None
+
+    assert 'MatrixFactorizationModel' in dir(collie_recs)
+    assert collie_recs.model.MatrixFactorizationModel is collie_recs.MatrixFactorizationModel
+    assert collie_recs.model.base.BasePipeline is collie_recs.BasePipeline
+
+    with pytest.raises(AttributeError):
+        collie_recs.not_a_real_attribute
+
+
+def test_import_time():
+    # ``-X importtime`` writes one ``self [us] | cumulative [us] | package`` line per import
+    output = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import collie_recs'],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stderr
+
+    cumulative_microseconds = {}
+    for line in output.splitlines():
+        if line.startswith('import time:') and '|' in line and 'cumulative' not in line:
+            _, cumulative, package = line[len('import time:'):].split('|')
+            cumulative_microseconds[package.strip()] = int(cumulative)
+
+    for module in ['pytorch_lightning', 'sklearn', 'torch', 'torchmetrics']:
+        assert module not in cumulative_microseconds
+
+    # importing heavy dependencies would take seconds, so this is a generous upper bound
+    assert cumulative_microseconds['collie_recs'] < 1_000_000
+
+
+def _public_submodule_names():
+    import pkgutil
+
+    import collie_recs
+
+    return [
+        module_info.name
+        for module_info in pkgutil.walk_packages(collie_recs.__path__, prefix='collie_recs.')
+        if not module_info.name.rsplit('.', 1)[-1].startswith('_')
+    ]
+
+
+@pytest.mark.parametrize('module_name', _public_submodule_names())
+def test_lazy_imports_public_api_is_complete(module_name):
+    import importlib
+    import inspect
+
+    module = importlib.import_module(module_name)
+    parent_package = importlib.import_module(module_name.rsplit('.', 1)[0])
+
+    # every public function and class should be exported by the package the module is in, and
+    # subpackages' exports should be exported by their parent package in turn
+    if hasattr(module, '__path__'):
+        assert set(module.__all__) <= set(parent_package.__all__)
+    else:
+        for name, value in vars(module).items():
+            if (
+                not name.startswith('_')
+                and (inspect.isfunction(value) or inspect.isclass(value))
+                and value.__module__ == module.__name__
+            ):
+                assert name in parent_package.__all__
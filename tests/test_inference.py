@@ -0,0 +1,121 @@
+import os
+
+import numpy as np
+from numpy.testing import assert_allclose, assert_array_equal
+import pytest
+import torch
+
+from collie_recs.inference import InferenceModel
+
+
+def test_exported_models_match_torch_models(models_trained_for_one_step, tmpdir):
+    model = models_trained_for_one_step.cpu()
+    model.eval()
+
+    export_path = os.path.join(str(tmpdir), 'exported_model')
+
+    if callable(model.hparams.get('final_layer')):
+        with pytest.raises(ValueError):
+            model.export_inference(export_path)
+
+        return
+
+    model.export_inference(export_path)
+    inference_model = InferenceModel(export_path)
+
+    users = torch.arange(min(model.hparams.num_users, 25)).repeat_interleave(4)
+    items = torch.randint(model.hparams.num_items, size=(len(users),))
+
+    with torch.no_grad():
+        expected = model(users, items).cpu().numpy()
+
+    actual = inference_model.score(users=users.numpy(), items=items.numpy())
+
+    assert_allclose(actual, expected, rtol=1e-4, atol=1e-5)
+
+
+@pytest.mark.parametrize('dtype', ['int8', 'float16'])
+def test_exported_quantized_model_matches_quantized_torch_model(models_trained_for_one_step,
+                                                                dtype,
+                                                                tmpdir):
+    quantized_model = models_trained_for_one_step.cpu().quantize(dtype=dtype)
+
+    export_path = os.path.join(str(tmpdir), 'exported_model')
+
+    if callable(quantized_model.hparams.get('final_layer')):
+        with pytest.raises(ValueError):
+            quantized_model.export_inference(export_path)
+
+        return
+
+    quantized_model.export_inference(export_path)
+    inference_model = InferenceModel(export_path)
+
+    assert any(table.dtype == np.dtype(dtype) for table in inference_model.tables.values())
+
+    users = torch.arange(min(quantized_model.hparams.num_users, 25)).repeat_interleave(4)
+    items = torch.randint(quantized_model.hparams.num_items, size=(len(users),))
+
+    with torch.no_grad():
+        expected = quantized_model(users, items).numpy()
+
+    actual = inference_model.score(users=users.numpy(), items=items.numpy())
+
+    assert_allclose(actual, expected, rtol=1e-4, atol=1e-5)
+
+
+def test_exported_model_score_all_items_and_recommend(implicit_model_no_lightning, tmpdir):
+    export_path = os.path.join(str(tmpdir), 'exported_model')
+    implicit_model_no_lightning.export_inference(export_path)
+
+    inference_model = InferenceModel(export_path)
+
+    expected_preds = implicit_model_no_lightning.get_item_predictions(user_id=42, sort_values=True)
+
+    all_item_scores = inference_model.score_all_items(user_ids=[42, 43])
+
+    assert all_item_scores.shape == (2, implicit_model_no_lightning.hparams.num_items)
+    assert_allclose(all_item_scores[0, expected_preds.index.values],
+                    expected_preds.values,
+                    rtol=1e-4,
+                    atol=1e-5)
+
+    item_ids, scores = inference_model.recommend(user_ids=[42], k=10)
+
+    assert item_ids.shape == (1, 10)
+    assert_array_equal(item_ids[0], expected_preds.index.values[:10])
+    assert np.all(np.diff(scores[0]) <= 0)
+
+
+def test_exported_model_is_memory_mapped(implicit_model_no_lightning, tmpdir):
+    export_path = os.path.join(str(tmpdir), 'exported_model')
+    implicit_model_no_lightning.export_inference(export_path)
+
+    assert isinstance(InferenceModel(export_path).tables['user_embeddings.weight'], np.memmap)
+    assert not isinstance(
+        InferenceModel(export_path, mmap=False).tables['user_embeddings.weight'], np.memmap
+    )
+
+
+def test_bad_export_inference(implicit_model_no_lightning, tmpdir):
+    export_path = os.path.join(str(tmpdir), 'exported_model')
+    implicit_model_no_lightning.export_inference(export_path)
+
+    # we shouldn't be able to overwrite an existing export unless we specifically say
+    with pytest.raises(ValueError):
+        implicit_model_no_lightning.export_inference(export_path)
+
+    implicit_model_no_lightning.export_inference(export_path, overwrite=True)
+
+
+def test_bad_inference_scoring(implicit_model_no_lightning, tmpdir):
+    export_path = os.path.join(str(tmpdir), 'exported_model')
+    implicit_model_no_lightning.export_inference(export_path)
+
+    inference_model = InferenceModel(export_path)
+
+    with pytest.raises(ValueError):
+        inference_model.score(users=[0, 1], items=[0])
+
+    with pytest.raises(ValueError):
+        inference_model.recommend(user_ids=[0], k=implicit_model_no_lightning.hparams.num_items + 1)
@@ -1,14 +1,21 @@
+import math
 import sys
+from unittest import mock
 
 import numpy as np
 import pandas as pd
 import pytest
 
-from collie_recs.interactions import (ApproximateNegativeSamplingInteractionsDataLoader,
+from collie_recs.interactions import (ApproximateNegativeSampler,
+                                      ApproximateNegativeSamplingInteractionsDataLoader,
                                       HDF5Interactions,
                                       HDF5InteractionsDataLoader,
+                                      HDF5Sampler,
                                       Interactions,
-                                      InteractionsDataLoader)
+                                      InteractionsDataLoader,
+                                      PrecomputedInteractionsDataLoader,
+                                      PrefetchedNegativesInteractionsDataLoader,
+                                      TensorInteractionsDataLoader)
 
 
 NUM_NEGATIVE_SAMPLES = 3
@@ -474,7 +481,9 @@ class TestHDF5InteractionsHeadTail:
 
 
 @pytest.mark.parametrize('data_loader_class', [InteractionsDataLoader,
-                                               ApproximateNegativeSamplingInteractionsDataLoader])
+                                               ApproximateNegativeSamplingInteractionsDataLoader,
+                                               TensorInteractionsDataLoader,
+                                               PrefetchedNegativesInteractionsDataLoader])
 def test_instantiate_data_loaders(ratings_matrix_for_interactions,
                                   sparse_ratings_matrix_for_interactions,
                                   df_for_interactions,
@@ -661,3 +670,328 @@ def test_all_data_loaders_output_equal(df_for_interactions, hdf5_pandas_df_path,
     assert len(interactions_batches[-1][0][0]) < interactions_dl.batch_size
     assert len(approximate_batches[-1][0][0]) < approx_dl.approximate_negative_sampler.batch_size
     assert len(hdf5_batches[-1][0][0]) < hdf5_interactions_dl.hdf5_sampler.batch_size
+
+
+@pytest.mark.parametrize('shuffle', [True, False])
+def test_ApproximateNegativeSampler_partitions_batches(interactions_pandas, shuffle):
+    samplers = [
+        ApproximateNegativeSampler(interactions=interactions_pandas,
+                                   batch_size=2,
+                                   shuffle=shuffle,
+                                   seed=42,
+                                   num_replicas=3,
+                                   rank=rank)
+        for rank in range(3)
+    ]
+
+    for epoch in range(2):
+        all_idxs = list()
+        for sampler in samplers:
+            sampler.set_epoch(epoch)
+            batches = list(sampler)
+
+            assert len(batches) == len(sampler)
+
+            all_idxs += [idx for batch in batches for idx in batch]
+
+        # every interaction should be returned by at least one replica, with batches repeated to
+        # pad out the last replicas
+        assert set(all_idxs) == set(range(len(interactions_pandas)))
+
+    # every replica should return the same number of batches
+    expected_len = math.ceil(
+        len(ApproximateNegativeSampler(interactions=interactions_pandas, batch_size=2)) / 3
+    )
+    assert [len(sampler) for sampler in samplers] == [expected_len] * 3
+
+
+@pytest.mark.parametrize('shuffle', [True, False])
+def test_TensorInteractionsDataLoader(df_for_interactions, shuffle):
+    interactions_dl = InteractionsDataLoader(users=df_for_interactions['user_id'],
+                                             items=df_for_interactions['item_id'],
+                                             num_negative_samples=3,
+                                             batch_size=5)
+    tensor_dl = TensorInteractionsDataLoader(users=df_for_interactions['user_id'],
+                                             items=df_for_interactions['item_id'],
+                                             num_negative_samples=3,
+                                             batch_size=5,
+                                             shuffle=shuffle)
+
+    assert str(tensor_dl) == (
+        'TensorInteractionsDataLoader object with 12 interactions between 6 users and 10 items,'
+        f' returning 3 negative samples per interaction in {"" if shuffle else "non-"}shuffled'
+        ' batches of size 5.'
+    )
+    # no positive item lookup set should be built for an ``Interactions`` created here
+    assert tensor_dl.interactions.positive_items == {}
+
+    batches = list(tensor_dl)
+
+    assert len(batches) == len(tensor_dl) == len(interactions_dl) == 3
+    assert [len(users) for (users, _), _ in batches] == [5, 5, 2]
+
+    all_pairs = [
+        (user, item)
+        for (users, items), _ in batches
+        for user, item in zip(users.tolist(), items.tolist())
+    ]
+    expected_pairs = list(zip(interactions_dl.mat.row.tolist(), interactions_dl.mat.col.tolist()))
+
+    if shuffle:
+        assert sorted(all_pairs) == sorted(expected_pairs)
+    else:
+        assert all_pairs == expected_pairs
+
+    # with exact negative sampling, no negative item should be a positive item for its user
+    for (users, _), negative_items in batches:
+        assert negative_items.shape == (len(users), 3)
+
+        for user, user_negative_items in zip(users.tolist(), negative_items.tolist()):
+            for negative_item in user_negative_items:
+                assert (user, negative_item) not in expected_pairs
+
+
+def test_TensorInteractionsDataLoader_approximate_negative_samples(interactions_pandas):
+    tensor_dl = TensorInteractionsDataLoader(interactions=interactions_pandas,
+                                             batch_size=4,
+                                             max_number_of_samples_to_consider=0,
+                                             drop_last=True)
+
+    assert tensor_dl.positive_keys is None
+    assert len(tensor_dl) == 3
+
+    for (users, items), negative_items in tensor_dl:
+        assert len(users) == len(items) == 4
+        assert negative_items.shape == (4, interactions_pandas.num_negative_samples)
+        assert negative_items.min() >= 0
+        assert negative_items.max() < interactions_pandas.num_items
+
+
+@pytest.mark.parametrize('shuffle', [True, False])
+def test_TensorInteractionsDataLoader_partitions_batches(interactions_pandas, shuffle):
+    dataloaders = [
+        TensorInteractionsDataLoader(interactions=interactions_pandas,
+                                     batch_size=2,
+                                     shuffle=shuffle,
+                                     num_replicas=3,
+                                     rank=rank)
+        for rank in range(3)
+    ]
+
+    for epoch in range(2):
+        all_pairs = list()
+        for dataloader in dataloaders:
+            dataloader.set_epoch(epoch)
+            batches = list(dataloader)
+
+            assert len(batches) == len(dataloader)
+
+            all_pairs += [
+                (user, item)
+                for (users, items), _ in batches
+                for user, item in zip(users.tolist(), items.tolist())
+            ]
+
+        # every interaction should be returned by at least one replica, with batches repeated to
+        # pad out the last replicas
+        assert set(all_pairs) == set(
+            zip(interactions_pandas.mat.row.tolist(), interactions_pandas.mat.col.tolist())
+        )
+
+    # every replica should return the same number of batches
+    expected_len = math.ceil(
+        len(TensorInteractionsDataLoader(interactions=interactions_pandas, batch_size=2)) / 3
+    )
+    assert [len(dataloader) for dataloader in dataloaders] == [expected_len] * 3
+
+
+@pytest.mark.parametrize('cache', [True, False])
+def test_PrecomputedInteractionsDataLoader(interactions_pandas, tmpdir, cache):
+    cache_path = str(tmpdir.join('cache')) if cache else None
+
+    precomputed_dl = PrecomputedInteractionsDataLoader(interactions_pandas,
+                                                       batch_size=5,
+                                                       cache_path=cache_path)
+
+    assert str(precomputed_dl) == (
+        'PrecomputedInteractionsDataLoader object with 12 interactions between 6 users and 10'
+        ' items, returning 10 precomputed negative samples per interaction in non-shuffled'
+        ' batches of size 5.'
+    )
+    assert precomputed_dl.batch_offsets.tolist() == [0, 5, 10, 12]
+    assert precomputed_dl.users.tolist() == interactions_pandas.mat.row.tolist()
+    assert precomputed_dl.items.tolist() == interactions_pandas.mat.col.tolist()
+
+    if cache:
+        negative_items_path = str(tmpdir.join('cache', 'negative_items.npy'))
+        assert isinstance(np.load(negative_items_path, mmap_mode='r'), np.memmap)
+
+    first_pass = list(precomputed_dl)
+    second_pass = list(precomputed_dl)
+
+    assert len(first_pass) == len(precomputed_dl) == 3
+
+    # the exact same batches should be replayed every time
+    for ((users, items), negative_items), ((users_2, items_2), negative_items_2) in zip(
+        first_pass, second_pass
+    ):
+        assert users.tolist() == users_2.tolist()
+        assert items.tolist() == items_2.tolist()
+        assert negative_items.tolist() == negative_items_2.tolist()
+        assert negative_items.shape == (len(users), interactions_pandas.num_negative_samples)
+
+
+def test_PrecomputedInteractionsDataLoader_from_dataloader(interactions_pandas):
+    approx_dl = ApproximateNegativeSamplingInteractionsDataLoader(interactions=interactions_pandas,
+                                                                  batch_size=4)
+    precomputed_dl = PrecomputedInteractionsDataLoader(approx_dl)
+
+    assert precomputed_dl.interactions is interactions_pandas
+    assert len(precomputed_dl) == len(approx_dl) == 3
+    assert precomputed_dl.batch_offsets.tolist() == [0, 4, 8, 12]
+
+
+def test_PrecomputedInteractionsDataLoader_partitions_batches(interactions_pandas):
+    precomputed_dl = PrecomputedInteractionsDataLoader(interactions_pandas, batch_size=2)
+
+    num_batches = len(precomputed_dl)
+
+    all_batches = list()
+    for rank in range(4):
+        precomputed_dl.num_replicas = 4
+        precomputed_dl.rank = rank
+
+        batches = list(precomputed_dl)
+
+        # every replica should return the same number of batches
+        assert len(batches) == len(precomputed_dl) == math.ceil(num_batches / 4)
+
+        all_batches += [
+            tuple(zip(users.tolist(), items.tolist())) for (users, items), _ in batches
+        ]
+
+    # the last replicas are padded out with repeated batches
+    assert len(all_batches) == 4 * math.ceil(num_batches / 4)
+    assert len(set(all_batches)) == num_batches
+    assert sorted(user for batch in set(all_batches) for user, _ in batch) == sorted(
+        interactions_pandas.mat.row.tolist()
+    )
+
+
+@pytest.mark.parametrize('negative_sampling_distribution', ['uniform', 'popularity'])
+def test_PrefetchedNegativesInteractionsDataLoader(df_for_interactions,
+                                                   tmpdir,
+                                                   negative_sampling_distribution):
+    prefetched_dl = PrefetchedNegativesInteractionsDataLoader(
+        users=df_for_interactions['user_id'],
+        items=df_for_interactions['item_id'],
+        num_negative_samples=3,
+        batch_size=5,
+        shuffle=True,
+        negative_sampling_distribution=negative_sampling_distribution,
+        cache_path=str(tmpdir),
+        chunk_size=4,
+    )
+
+    assert str(prefetched_dl) == (
+        'PrefetchedNegativesInteractionsDataLoader object with 12 interactions between 6 users and'
+        ' 10 items, returning 3 negative samples per interaction in shuffled batches of size 5.'
+    )
+
+    expected_pairs = list(zip(prefetched_dl.mat.row.tolist(), prefetched_dl.mat.col.tolist()))
+    positive_items = set(expected_pairs)
+
+    for _ in range(3):
+        batches = list(prefetched_dl)
+
+        assert len(batches) == len(prefetched_dl) == 3
+
+        all_pairs = list()
+        for (users, items), negative_items in batches:
+            assert negative_items.shape == (len(users), 3)
+
+            for user, item, user_negative_items in zip(
+                users.tolist(), items.tolist(), negative_items.tolist()
+            ):
+                all_pairs.append((user, item))
+
+                for negative_item in user_negative_items:
+                    assert (user, negative_item) not in positive_items
+
+                    if negative_sampling_distribution == 'popularity':
+                        # items no one has interacted with are never sampled
+                        assert negative_item in prefetched_dl.mat.col
+
+        assert sorted(all_pairs) == sorted(expected_pairs)
+
+    # buffers for the next two epochs should have been written
+    assert tmpdir.join('negative_items_0.npy').exists()
+    assert tmpdir.join('negative_items_1.npy').exists()
+
+
+def test_PrefetchedNegativesInteractionsDataLoader_bad_distribution(df_for_interactions):
+    with pytest.raises(ValueError):
+        PrefetchedNegativesInteractionsDataLoader(users=df_for_interactions['user_id'],
+                                                  items=df_for_interactions['item_id'],
+                                                  negative_sampling_distribution='zipf')
+
+
+@pytest.mark.parametrize('shuffle', [True, False])
+def test_HDF5Sampler_partitions_batches(hdf5_interactions, shuffle):
+    samplers = [
+        HDF5Sampler(hdf5_interactions=hdf5_interactions,
+                    batch_size=5,
+                    shuffle=shuffle,
+                    seed=42,
+                    num_replicas=2,
+                    rank=rank)
+        for rank in range(2)
+    ]
+
+    for epoch in range(2):
+        all_batches = list()
+        for sampler in samplers:
+            sampler.set_epoch(epoch)
+            batches = list(sampler)
+
+            assert len(batches) == len(sampler)
+
+            all_batches += batches
+
+        # every batch should be returned by at least one replica, with batches repeated to pad
+        # out the last replica
+        expected_batches = (
+            HDF5Sampler(hdf5_interactions=hdf5_interactions, batch_size=5).data_to_iterate_through
+        )
+        assert sorted(set(all_batches)) == sorted(expected_batches)
+
+    # every replica should return the same number of batches
+    assert [len(sampler) for sampler in samplers] == [math.ceil(len(expected_batches) / 2)] * 2
+
+
+def test_samplers_default_to_distributed_partitions(interactions_pandas, hdf5_interactions):
+    approximate_negative_sampler = ApproximateNegativeSampler(interactions=interactions_pandas,
+                                                              batch_size=2)
+    hdf5_sampler = HDF5Sampler(hdf5_interactions=hdf5_interactions, batch_size=2)
+
+    expected_approximate_negative_sampler_len = len(approximate_negative_sampler)
+    expected_hdf5_sampler_len = len(hdf5_sampler)
+
+    with mock.patch('torch.distributed.is_initialized', return_value=True), \
+            mock.patch('torch.distributed.get_world_size', return_value=2), \
+            mock.patch('torch.distributed.get_rank', return_value=1):
+        assert len(approximate_negative_sampler) == math.ceil(
+            expected_approximate_negative_sampler_len / 2
+        )
+        assert len(list(approximate_negative_sampler)) == len(approximate_negative_sampler)
+
+        assert len(hdf5_sampler) == math.ceil(expected_hdf5_sampler_len / 2)
+        assert len(list(hdf5_sampler)) == len(hdf5_sampler)
+
+
+def test_bad_sampler_partitions(interactions_pandas):
+    with pytest.raises(ValueError):
+        ApproximateNegativeSampler(interactions=interactions_pandas, num_replicas=0, rank=0)
+
+    with pytest.raises(ValueError):
+        ApproximateNegativeSampler(interactions=interactions_pandas, num_replicas=2, rank=2)
@@ -1,3 +1,5 @@
+import math
+
 from numpy.testing import assert_almost_equal, assert_array_equal
 import pytest
 import torch
@@ -8,6 +10,7 @@ from collie_recs.loss import (
     bpr_loss,
     hinge_loss,
     ideal_difference_from_metadata,
+    MetadataPartialCredit,
     warp_loss,
 )
 
@@ -78,6 +81,76 @@ def test_ideal_difference_from_metadata_a_and_b(
     assert_array_equal(ideal_diff, metadata_a_and_2_diff)
 
 
+def test_metadata_partial_credit_error(metadata_a, metadata_b):
+    with pytest.raises(ValueError) as err:
+        MetadataPartialCredit(metadata={'a': metadata_a, 'b': metadata_b},
+                              metadata_weights={'a': .2, 'b': .9})
+
+    assert str(err.value) == 'sum of metadata weights was 1.1, must be <=1'
+
+
+@pytest.mark.parametrize('max_table_size', [0, 2 ** 20])
+def test_metadata_partial_credit_a_and_b(
+    positive_items,
+    many_negative_items,
+    metadata_a,
+    metadata_b,
+    metadata_a_and_2_diff,
+    max_table_size,
+):
+    metadata_lookup = MetadataPartialCredit(
+        metadata={'a': metadata_a, 'b': metadata_b.float()},
+        metadata_weights={'a': .2, 'b': .3},
+        max_table_size=max_table_size,
+    )
+
+    assert len(metadata_lookup) == 2
+    assert (metadata_lookup.table is None) == (max_table_size == 0)
+
+    ideal_diff = ideal_difference_from_metadata(
+        positive_items=positive_items.repeat(4, 1),
+        negative_items=many_negative_items,
+        metadata=metadata_lookup,
+        metadata_weights=None,
+    )
+
+    assert_almost_equal(ideal_diff.numpy(), metadata_a_and_2_diff.numpy(), decimal=6)
+
+
+@pytest.mark.parametrize('loss_function', [adaptive_bpr_loss, adaptive_hinge_loss, warp_loss])
+def test_metadata_partial_credit_loss_matches_dictionary(
+    positive_scores,
+    many_negative_scores,
+    positive_items,
+    many_negative_items,
+    metadata_a,
+    metadata_b,
+    loss_function,
+):
+    metadata = {'a': metadata_a, 'b': metadata_b}
+    metadata_weights = {'a': 0.2, 'b': 0.3}
+
+    expected = loss_function(
+        positive_scores=positive_scores,
+        many_negative_scores=many_negative_scores,
+        num_items=4,
+        positive_items=positive_items,
+        negative_items=many_negative_items,
+        metadata=metadata,
+        metadata_weights=metadata_weights,
+    )
+    actual = loss_function(
+        positive_scores=positive_scores,
+        many_negative_scores=many_negative_scores,
+        num_items=4,
+        positive_items=positive_items,
+        negative_items=many_negative_items,
+        metadata=MetadataPartialCredit(metadata=metadata, metadata_weights=metadata_weights),
+    )
+
+    assert_almost_equal(actual.item(), expected.item(), decimal=5)
+
+
 def test_bpr_loss(positive_scores, negative_scores):
     actual = bpr_loss(positive_scores, negative_scores)
     expected = (1.93074 + 1.36897) / 4
@@ -113,6 +186,84 @@ def test_warp_loss(positive_scores, many_negative_scores):
     assert_almost_equal(actual.item(), expected, decimal=3)
 
 
+def _reference_warp_loss(positive_scores, many_negative_scores, num_items, ideal_difference=None):
+    """Compute WARP loss one row at a time as a reference for ``warp_loss``."""
+    if ideal_difference is None:
+        ideal_difference = torch.ones_like(many_negative_scores)
+
+    total_loss = 0.0
+    for row in range(len(positive_scores)):
+        for number_of_tries in range(1, many_negative_scores.shape[0] + 1):
+            hinge = (
+                ideal_difference[number_of_tries - 1, row]
+                - positive_scores[row]
+                + many_negative_scores[number_of_tries - 1, row]
+            )
+
+            if hinge > 0:
+                loss = math.log(num_items / number_of_tries) * hinge.item()
+                total_loss += loss + loss ** 2
+                break
+
+    return total_loss / len(positive_scores)
+
+
+@pytest.mark.parametrize('num_negative_samples', [1, 10, 100])
+def test_warp_loss_matches_reference(num_negative_samples):
+    torch.manual_seed(42)
+
+    positive_scores = torch.randn(64, requires_grad=True)
+    many_negative_scores = torch.randn(num_negative_samples, 64, requires_grad=True)
+
+    actual = warp_loss(positive_scores, many_negative_scores, num_items=1000)
+    expected = _reference_warp_loss(positive_scores.detach(),
+                                    many_negative_scores.detach(),
+                                    num_items=1000)
+
+    assert actual.item() == pytest.approx(expected, rel=1e-5)
+
+    # gradients should only flow to the first violating negative score of each row
+    actual.backward()
+
+    num_nonzero_gradients_per_row = (many_negative_scores.grad != 0).sum(dim=0)
+    assert num_nonzero_gradients_per_row.max() <= 1
+    assert (
+        (positive_scores.grad != 0) == (num_nonzero_gradients_per_row == 1)
+    ).all()
+
+
+def test_warp_loss_no_violations():
+    positive_scores = torch.tensor([5.0, 6.0], requires_grad=True)
+    many_negative_scores = torch.tensor([[0.0, 1.0], [2.0, 3.0]], requires_grad=True)
+
+    actual = warp_loss(positive_scores, many_negative_scores, num_items=10)
+    actual.backward()
+
+    assert actual.item() == 0
+    assert (many_negative_scores.grad == 0).all()
+
+
+def test_warp_loss_no_violations_infinite_scores():
+    # rows without a violation should not count ``-inf`` negative scores, as used for unselected
+    # negative items with ``memory_efficient_loss``, as ``-inf * 0 = NaN`` loss
+    positive_scores = torch.tensor([5.0, 0.0], requires_grad=True)
+    many_negative_scores = torch.tensor(
+        [[-float('inf'), 0.5], [-float('inf'), -float('inf')], [1.0, -float('inf')]],
+        requires_grad=True,
+    )
+
+    actual = warp_loss(positive_scores, many_negative_scores, num_items=10)
+    actual.backward()
+
+    expected = _reference_warp_loss(positive_scores.detach(),
+                                    many_negative_scores.detach(),
+                                    num_items=10)
+
+    assert actual.item() == pytest.approx(expected)
+    assert torch.isfinite(positive_scores.grad).all()
+    assert torch.isfinite(many_negative_scores.grad).all()
+
+
 def test_bpr_loss_metadata(
     positive_scores,
     negative_scores,
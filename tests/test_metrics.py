@@ -1,20 +1,37 @@
 from functools import partial
+from pathlib import Path
 from unittest import mock
 
 import numpy as np
+import pandas as pd
 import pytest
+from scipy.sparse import csr_matrix
 from sklearn.metrics import roc_auc_score
 import torch
 
+from collie_recs.interactions import HDF5Interactions, Interactions
 from collie_recs.metrics import (
+    _corrected_sampled_metric,
+    _estimate_bytes_per_user,
     _get_labels,
     _get_user_item_pairs,
     auc,
+    coverage,
+    DeviceTargets,
     evaluate_in_batches,
+    evaluate_quantization_drift,
+    evaluate_sampled,
+    EvaluationBatch,
     get_preds,
+    hit_ratek,
     mapk,
     mrr,
+    ndcgk,
+    precisionk,
+    recallk,
+    sample_evaluation_negatives,
 )
+from collie_recs.utils import pandas_df_to_hdf5
 
 
 def get_model_scores(user, item, scores):
@@ -95,6 +112,41 @@ def test_get_labels_k(targets, test_implicit_recs, test_implicit_labels, device)
     assert torch.equal(actual_labels, expected_labels)
 
 
+def test_device_targets(targets, test_implicit_recs, test_implicit_labels, device):
+    device_targets = DeviceTargets(targets, device=device)
+    user_ids = torch.tensor([2, 0], device=device)
+
+    actual_labels = device_targets.contains(user_ids, test_implicit_recs[[2, 0], :].to(device))
+    expected_labels = test_implicit_labels[[2, 0], :].bool().to(device)
+
+    assert torch.equal(actual_labels, expected_labels)
+    assert torch.equal(device_targets.n_targets(user_ids).cpu(), torch.tensor([2, 3]))
+
+    rows, positions, items, is_positive = device_targets.row_entries(user_ids)
+
+    assert rows.tolist() == [0, 0, 1, 1, 1]
+    assert positions.tolist() == [0, 1, 0, 1, 2]
+    assert items.tolist() == [0, 2, 0, 1, 2]
+    assert is_positive.all()
+
+
+def test_device_targets_explicit_zeros_and_unsorted_indices(device):
+    # row ``0`` stores items ``3`` and ``1`` out of order, and item ``2`` as an explicit zero
+    targets = csr_matrix(
+        (np.array([1, 1, 0, 1]), np.array([3, 1, 2, 0]), np.array([0, 3, 4])),
+        shape=(2, 4),
+    )
+    device_targets = DeviceTargets(targets, device=device)
+
+    actual = device_targets.contains(
+        torch.tensor([0, 1], device=device),
+        torch.tensor([[0, 1, 2, 3], [0, 1, 2, 3]], device=device),
+    )
+    expected = torch.tensor([[False, True, False, True], [True, False, False, False]])
+
+    assert torch.equal(actual.cpu(), expected)
+
+
 def test_map(targets, test_implicit_predicted_scores):
     user_ids = np.array([1, 2])
     actual_score = mapk(targets=targets,
@@ -134,6 +186,26 @@ def test_mrr(targets, test_implicit_predicted_scores):
     np.testing.assert_almost_equal(actual_score, (1 + 1 + 1/2) / 3)
 
 
+def test_mrr_matches_full_sort():
+    torch.manual_seed(42)
+    preds = torch.randn(50, 30)
+    dense_targets = (torch.rand(50, 30) < 0.1).numpy().astype(float)
+    # a user without any positive items should have a reciprocal rank of ``0``
+    dense_targets[0] = 0
+    targets = csr_matrix(dense_targets)
+    user_ids = np.arange(50)
+
+    actual_score = mrr(targets=targets, user_ids=user_ids, preds=preds)
+
+    expected_score = 0
+    for i in user_ids[1:]:
+        sorted_labels = dense_targets[i][preds[i].argsort(descending=True).numpy()]
+        expected_score += 1 / (sorted_labels.argmax() + 1) if sorted_labels.any() else 0
+    expected_score = expected_score / len(user_ids)
+
+    np.testing.assert_almost_equal(actual_score, expected_score)
+
+
 def test_auc(targets, test_implicit_predicted_scores):
     user_ids = np.arange(test_implicit_predicted_scores.shape[0])
     actual_score = auc(targets=targets,
@@ -151,6 +223,63 @@ def test_auc(targets, test_implicit_predicted_scores):
     np.testing.assert_almost_equal(actual_score, expected_score)
 
 
+def test_auc_with_tied_scores():
+    torch.manual_seed(42)
+    # integer scores create ties, and scores large enough to saturate ``sigmoid`` tie as well
+    preds = torch.randint(-3, 4, size=(50, 30)).float()
+    preds[:, :5] = 100
+    # every user needs at least one positive item for AUC to be defined
+    dense_targets = (torch.rand(50, 30) < 0.2).numpy().astype(float)
+    dense_targets[np.arange(50), np.arange(50) % 30] = 1
+    targets = csr_matrix(dense_targets)
+    user_ids = np.arange(50)
+
+    actual_score = auc(targets=targets, user_ids=user_ids, preds=preds)
+
+    expected_score = np.mean([
+        roc_auc_score(targets[i].toarray()[0], torch.sigmoid(preds[i]).numpy())
+        for i in user_ids
+    ])
+
+    np.testing.assert_almost_equal(actual_score, expected_score)
+
+
+@pytest.mark.parametrize('metric, expected', [
+    (mapk, (1/2 + 1 + 1/4) / 3),
+    (ndcgk, 2/3),
+    (precisionk, (1/2 + 1 + 1/2) / 3),
+    (recallk, (1/3 + 2/3 + 1/2) / 3),
+    (hit_ratek, 1),
+    (coverage, 1),
+])
+def test_top_k_metrics(targets, test_implicit_predicted_scores, metric, expected):
+    user_ids = np.arange(test_implicit_predicted_scores.shape[0])
+    actual_score = metric(targets=targets,
+                          user_ids=user_ids,
+                          preds=test_implicit_predicted_scores[user_ids, :],
+                          k=2)
+
+    np.testing.assert_almost_equal(actual_score, expected)
+
+
+def test_evaluation_batch_is_shared(targets, test_implicit_predicted_scores):
+    user_ids = np.arange(test_implicit_predicted_scores.shape[0])
+    preds = test_implicit_predicted_scores[user_ids, :]
+
+    batch = EvaluationBatch(targets=targets, user_ids=user_ids, preds=preds)
+
+    # the largest ``k`` is computed once and sliced for smaller ``k``
+    assert torch.equal(batch.topk_items(4)[:, :2], batch.topk_items(2))
+    assert batch.topk_hits(2).shape == (3, 2)
+    assert batch._topk_items.shape == (3, 4)
+
+    for metric in [mapk, mrr, auc, ndcgk, precisionk, recallk, hit_ratek, coverage]:
+        expected = metric(targets=targets, user_ids=user_ids, preds=preds, k=2)
+        actual = metric(targets=targets, user_ids=user_ids, preds=preds, k=2, batch=batch)
+
+        assert actual == expected
+
+
 @pytest.mark.parametrize('batch_size', [20, 2, 1])  # default, uneven, single
 @mock.patch('collie_recs.model.MatrixFactorizationModel')
 def test_evaluate_in_batches(
@@ -175,6 +304,62 @@ def test_evaluate_in_batches(
     np.testing.assert_almost_equal(auc_score, metrics['auc'])
 
 
+@mock.patch('collie_recs.model.MatrixFactorizationModel')
+def test_evaluate_in_batches_metric_without_name(
+    model,
+    test_implicit_interactions,
+    test_implicit_predicted_scores,
+    metrics,
+):
+    model.side_effect = partial(get_model_scores, scores=test_implicit_predicted_scores)
+
+    # ``functools.partial`` objects have no ``__name__`` to label the metric with
+    (mapk_score,) = evaluate_in_batches(
+        metric_list=[partial(mapk)],
+        test_interactions=test_implicit_interactions,
+        model=model,
+        k=4,
+    )
+
+    np.testing.assert_almost_equal(mapk_score, metrics['mapk'])
+
+
+@pytest.mark.parametrize('batch_size', [20, 1])
+@mock.patch('collie_recs.model.MatrixFactorizationModel')
+def test_evaluate_in_batches_shared_metrics(
+    model,
+    test_implicit_interactions,
+    test_implicit_predicted_scores,
+    batch_size,
+):
+    model.side_effect = partial(get_model_scores, scores=test_implicit_predicted_scores)
+
+    def custom_metric(targets, user_ids, preds, k):
+        # metrics that do not accept a ``batch`` are called the same way as before
+        return len(user_ids) / 10
+
+    scores = evaluate_in_batches(
+        metric_list=[mapk, ndcgk, precisionk, recallk, hit_ratek, coverage, custom_metric],
+        test_interactions=test_implicit_interactions,
+        model=model,
+        k=2,
+        batch_size=batch_size,
+    )
+
+    expected_scores = [
+        (1/2 + 1 + 1/4) / 3,
+        2/3,
+        (1/2 + 1 + 1/2) / 3,
+        (1/3 + 2/3 + 1/2) / 3,
+        1,
+        # coverage is computed over all users' recommendations, not averaged over batches
+        1,
+        min(batch_size, 3) / 10,
+    ]
+
+    np.testing.assert_almost_equal(scores, expected_scores)
+
+
 def test_evaluate_in_batches_logger(
     implicit_model,
     test_implicit_interactions,
@@ -205,3 +390,439 @@ def test_evaluate_in_batches_logger(
     assert auc_score == logger.metrics['auc']
 
     assert logger.step == implicit_model.hparams.num_epochs_completed
+
+
+def test_evaluate_in_batches_profile(implicit_model, test_implicit_interactions, tmpdir):
+    expected = evaluate_in_batches(
+        metric_list=[mapk, mrr],
+        test_interactions=test_implicit_interactions,
+        model=implicit_model,
+        k=4,
+        batch_size=1,
+        verbose=False,
+    )
+    actual = evaluate_in_batches(
+        metric_list=[mapk, mrr],
+        test_interactions=test_implicit_interactions,
+        model=implicit_model,
+        k=4,
+        batch_size=1,
+        verbose=False,
+        profile={'output_dir': tmpdir, 'wait': 0, 'warmup': 0, 'active': 2},
+    )
+
+    assert actual == expected
+
+    trace_paths = list(Path(tmpdir).glob('trace_step_*.json'))
+    assert len(trace_paths) == 1
+    trace = trace_paths[0].read_text()
+    for label in ['get_preds', 'metrics.mapk', 'metrics.mrr']:
+        assert f'collie_recs.{label}' in trace
+
+
+def test_evaluate_in_batches_n_jobs(implicit_model, train_val_implicit_data):
+    _, val = train_val_implicit_data
+    metric_list = [mapk, mrr, auc, coverage]
+
+    expected = evaluate_in_batches(metric_list=metric_list,
+                                   test_interactions=val,
+                                   model=implicit_model,
+                                   k=10,
+                                   batch_size=64,
+                                   verbose=False)
+    actual = evaluate_in_batches(metric_list=metric_list,
+                                 test_interactions=val,
+                                 model=implicit_model,
+                                 k=10,
+                                 batch_size=64,
+                                 verbose=False,
+                                 n_jobs=3)
+
+    np.testing.assert_almost_equal(actual, expected, decimal=5)
+
+
+def test_evaluate_in_batches_n_jobs_with_profile(implicit_model, test_implicit_interactions):
+    with pytest.raises(ValueError):
+        evaluate_in_batches(metric_list=[mapk],
+                            test_interactions=test_implicit_interactions,
+                            model=implicit_model,
+                            verbose=False,
+                            profile='profile_output',
+                            n_jobs=2)
+
+
+def test_estimate_bytes_per_user(implicit_model):
+    mapk_bytes = _estimate_bytes_per_user(model=implicit_model, num_items=100, metric_list=[mapk])
+
+    assert mapk_bytes > 0
+    assert _estimate_bytes_per_user(
+        model=implicit_model, num_items=200, metric_list=[mapk]
+    ) == 2 * mapk_bytes
+    # metrics are evaluated one at a time, so only the most expensive one counts
+    assert _estimate_bytes_per_user(
+        model=implicit_model, num_items=100, metric_list=[mapk, auc]
+    ) == _estimate_bytes_per_user(model=implicit_model, num_items=100, metric_list=[auc])
+    assert _estimate_bytes_per_user(
+        model=implicit_model, num_items=100, metric_list=[auc]
+    ) > mapk_bytes
+
+
+def test_evaluate_in_batches_memory_budget(implicit_model, train_val_implicit_data):
+    _, val = train_val_implicit_data
+
+    expected = evaluate_in_batches(metric_list=[mapk, mrr],
+                                   test_interactions=val,
+                                   model=implicit_model,
+                                   batch_size=50,
+                                   verbose=False)
+    actual = evaluate_in_batches(metric_list=[mapk, mrr],
+                                 test_interactions=val,
+                                 model=implicit_model,
+                                 verbose=False,
+                                 memory_budget=2 * 1024 ** 2)
+
+    np.testing.assert_almost_equal(actual, expected, decimal=5)
+
+
+def test_evaluate_in_batches_memory_budget_backs_off(implicit_model, test_implicit_interactions):
+    expected = evaluate_in_batches(metric_list=[mapk, mrr, coverage],
+                                   test_interactions=test_implicit_interactions,
+                                   model=implicit_model,
+                                   k=2,
+                                   verbose=False)
+
+    def get_preds_with_one_user_of_memory(model, user_ids, n_items, device):
+        if len(user_ids) > 1:
+            raise RuntimeError('CUDA out of memory. Tried to allocate 1.00 GiB')
+
+        return get_preds(model, user_ids, n_items, device)
+
+    with mock.patch('collie_recs.metrics.get_preds', new=get_preds_with_one_user_of_memory):
+        with pytest.warns(ResourceWarning):
+            actual = evaluate_in_batches(metric_list=[mapk, mrr, coverage],
+                                         test_interactions=test_implicit_interactions,
+                                         model=implicit_model,
+                                         k=2,
+                                         verbose=False,
+                                         memory_budget=1024 ** 3)
+
+        # without a ``memory_budget``, running out of memory is raised as before
+        with pytest.raises(RuntimeError, match='CUDA out of memory'):
+            evaluate_in_batches(metric_list=[mapk],
+                                test_interactions=test_implicit_interactions,
+                                model=implicit_model,
+                                k=2,
+                                verbose=False)
+
+    np.testing.assert_almost_equal(actual, expected)
+
+
+def test_auc_with_excluded_items(targets, test_implicit_predicted_scores):
+    preds = test_implicit_predicted_scores.clone()
+    # user ``2``'s only items left are a positive item ``0`` scored above negative item ``1`` and a
+    # positive item ``2`` scored below it
+    preds[2, 3] = -float('inf')
+
+    actual = auc(targets=targets, user_ids=np.array([2]), preds=preds[[2]])
+
+    assert actual == pytest.approx(0.5)
+
+
+def test_auc_with_undefined_users():
+    targets = csr_matrix(np.array([
+        [0, 1, 0, 0],
+        [1, 0, 1, 0],
+        [1, 1, 0, 0],
+    ]))
+    preds = torch.tensor([
+        # user ``0``'s only positive item is excluded
+        [0.1, -float('inf'), 0.3, 0.2],
+        [0.9, 0.4, 0.5, 0.7],
+        # user ``2`` has no negative items left
+        [0.2, 0.3, -float('inf'), -float('inf')],
+    ])
+
+    actual = auc(targets=targets, user_ids=np.arange(3), preds=preds)
+
+    # only user ``1`` has a defined AUC
+    assert actual == pytest.approx(0.75)
+
+    # no user in the batch has a defined AUC
+    assert auc(targets=targets[[0]], user_ids=np.arange(1), preds=preds[[0]]) == 0
+
+
+@pytest.mark.parametrize('n_jobs', [1, 2])
+@mock.patch('collie_recs.model.MatrixFactorizationModel')
+def test_evaluate_in_batches_exclude_interactions(
+    model,
+    test_implicit_interactions,
+    test_implicit_predicted_scores,
+    n_jobs,
+):
+    exclude_interactions = Interactions(users=[1, 2],
+                                        items=[1, 3],
+                                        num_users=3,
+                                        num_items=4,
+                                        allow_missing_ids=True,
+                                        check_num_negative_samples_is_valid=False)
+    metric_list = [mapk, ndcgk, mrr, auc, coverage]
+
+    masked_scores = test_implicit_predicted_scores.clone()
+    masked_scores[1, 1] = -float('inf')
+    masked_scores[2, 3] = -float('inf')
+
+    model.side_effect = partial(get_model_scores, scores=masked_scores)
+    expected = evaluate_in_batches(metric_list=metric_list,
+                                   test_interactions=test_implicit_interactions,
+                                   model=model,
+                                   k=2,
+                                   batch_size=2,
+                                   verbose=False)
+
+    model.side_effect = partial(get_model_scores, scores=test_implicit_predicted_scores)
+    actual = evaluate_in_batches(metric_list=metric_list,
+                                 test_interactions=test_implicit_interactions,
+                                 model=model,
+                                 k=2,
+                                 batch_size=2,
+                                 verbose=False,
+                                 n_jobs=n_jobs,
+                                 exclude_interactions=exclude_interactions)
+
+    np.testing.assert_almost_equal(actual, expected)
+
+
+@mock.patch('collie_recs.model.MatrixFactorizationModel')
+def test_evaluate_in_batches_exclude_all_of_a_users_targets(
+    model,
+    test_implicit_interactions,
+    test_implicit_predicted_scores,
+):
+    # every test item of user ``2`` is excluded, leaving it without an AUC
+    exclude_interactions = Interactions(users=[2, 2],
+                                        items=[0, 2],
+                                        num_users=3,
+                                        num_items=4,
+                                        allow_missing_ids=True,
+                                        check_num_negative_samples_is_valid=False)
+
+    model.side_effect = partial(get_model_scores, scores=test_implicit_predicted_scores)
+    (auc_score,) = evaluate_in_batches(metric_list=[auc],
+                                       test_interactions=test_implicit_interactions,
+                                       model=model,
+                                       verbose=False,
+                                       exclude_interactions=exclude_interactions)
+
+    # the average of the AUCs of users ``0`` and ``1``
+    np.testing.assert_almost_equal(auc_score, (1/3 + 1) / 2)
+
+
+def _interactions_to_hdf5(interactions, hdf5_path, ascending=True):
+    df = pd.DataFrame(
+        data={'user_id': interactions.mat.row, 'item_id': interactions.mat.col}
+    ).sort_values(by=['user_id', 'item_id'], ascending=ascending)
+
+    pandas_df_to_hdf5(df=df, out_path=hdf5_path, key='interactions')
+
+    return HDF5Interactions(hdf5_path=str(hdf5_path),
+                            user_col='user_id',
+                            item_col='item_id',
+                            num_users=interactions.num_users,
+                            num_items=interactions.num_items)
+
+
+# small chunks split users' interactions across chunks and batches across chunk boundaries
+@pytest.mark.parametrize('chunk_size', [100000, 1000, 7])
+def test_evaluate_in_batches_hdf5(implicit_model, train_val_implicit_data, tmpdir, chunk_size):
+    _, val = train_val_implicit_data
+    hdf5_val = _interactions_to_hdf5(val, Path(tmpdir) / 'val.h5')
+    metric_list = [mapk, mrr, auc, coverage]
+
+    expected = evaluate_in_batches(metric_list=metric_list,
+                                   test_interactions=val,
+                                   model=implicit_model,
+                                   k=10,
+                                   batch_size=64,
+                                   verbose=False)
+
+    with mock.patch('collie_recs.metrics._HDF5_CHUNK_SIZE', chunk_size):
+        actual = evaluate_in_batches(metric_list=metric_list,
+                                     test_interactions=hdf5_val,
+                                     model=implicit_model,
+                                     k=10,
+                                     batch_size=64,
+                                     verbose=False)
+
+    np.testing.assert_almost_equal(actual, expected, decimal=5)
+
+
+def test_evaluate_in_batches_hdf5_unsorted(implicit_model, train_val_implicit_data, tmpdir):
+    _, val = train_val_implicit_data
+    hdf5_val = _interactions_to_hdf5(val, Path(tmpdir) / 'val.h5', ascending=False)
+
+    with pytest.raises(ValueError):
+        with mock.patch('collie_recs.metrics._HDF5_CHUNK_SIZE', 1000):
+            evaluate_in_batches(metric_list=[mapk],
+                                test_interactions=hdf5_val,
+                                model=implicit_model,
+                                verbose=False)
+
+
+@pytest.mark.parametrize('dtype', ['int8', 'float16'])
+def test_evaluate_quantization_drift(implicit_model, train_val_implicit_data, dtype):
+    _, val = train_val_implicit_data
+
+    quantized_model = implicit_model.quantize(dtype=dtype)
+
+    drift_report = evaluate_quantization_drift(model=implicit_model,
+                                               quantized_model=quantized_model,
+                                               test_interactions=val,
+                                               metric_list=[mapk, mrr],
+                                               k=10,
+                                               batch_size=512,
+                                               verbose=False)
+
+    assert list(drift_report.keys()) == ['mapk', 'mrr']
+
+    for metric_report in drift_report.values():
+        np.testing.assert_almost_equal(
+            metric_report['difference'],
+            metric_report['quantized'] - metric_report['original'],
+        )
+        assert abs(metric_report['relative_difference']) < 0.05
+
+
+def test_sample_evaluation_negatives(test_implicit_interactions, tmpdir):
+    save_path = Path(tmpdir) / 'negatives.npy'
+
+    negative_items = sample_evaluation_negatives(test_implicit_interactions,
+                                                 num_negative_samples=3,
+                                                 seed=42,
+                                                 save_path=save_path)
+
+    # one row for each test interaction, ordered by user ID and then item ID
+    assert negative_items.shape == (8, 3)
+    assert (negative_items[:3] == 3).all()
+    assert (negative_items[3:6] == 0).all()
+    assert np.isin(negative_items[6:], [1, 3]).all()
+
+    np.testing.assert_array_equal(np.load(save_path), negative_items)
+    np.testing.assert_array_equal(
+        sample_evaluation_negatives(test_implicit_interactions, num_negative_samples=3, seed=42),
+        negative_items,
+    )
+
+
+def test_sample_evaluation_negatives_exclude_interactions(train_val_implicit_data):
+    train, val = train_val_implicit_data
+
+    negative_items = sample_evaluation_negatives(val,
+                                                 num_negative_samples=10,
+                                                 seed=42,
+                                                 exclude_interactions=train)
+
+    val_targets = val.mat.tocsr()
+    users = np.repeat(np.arange(val_targets.shape[0]), np.diff(val_targets.indptr))
+    positive_pairs = set(zip(train.mat.row, train.mat.col)) | set(zip(val.mat.row, val.mat.col))
+
+    assert negative_items.shape == (val_targets.nnz, 10)
+    assert not any(
+        (user, item) in positive_pairs
+        for user, row in zip(users, negative_items)
+        for item in row
+    )
+
+
+@mock.patch('collie_recs.model.MatrixFactorizationModel')
+def test_evaluate_sampled(model, test_implicit_interactions, test_implicit_predicted_scores):
+    model.side_effect = partial(get_model_scores, scores=test_implicit_predicted_scores)
+
+    def custom_mrr(targets, user_ids, preds, k):
+        # other metrics are called with the positive item of each test interaction as item ``0``
+        return mrr(targets=targets, user_ids=user_ids, preds=preds, k=k)
+
+    negative_items = np.array([[3], [3], [3], [0], [0], [0], [1], [3]])
+    # the positive item of each test interaction has a sampled rank of:
+    ranks = np.array([1, 2, 2, 1, 1, 1, 1, 2])
+
+    scores = evaluate_sampled(
+        # ``functools.partial`` objects have no ``__name__`` to label the metric with
+        metric_list=[mrr, custom_mrr, partial(mrr), hit_ratek, ndcgk, auc],
+        test_interactions=test_implicit_interactions,
+        model=model,
+        negative_items=negative_items,
+        k=1,
+        batch_size=3,
+        verbose=False,
+    )
+
+    expected_scores = [
+        (1 / ranks).mean(),
+        (1 / ranks).mean(),
+        (1 / ranks).mean(),
+        (ranks == 1).mean(),
+        (ranks == 1).mean(),
+        (ranks == 1).mean(),
+    ]
+
+    np.testing.assert_almost_equal(scores, expected_scores)
+
+
+@mock.patch('collie_recs.model.MatrixFactorizationModel')
+def test_evaluate_sampled_errors(model, test_implicit_interactions):
+    negative_items = np.zeros((8, 1), dtype=np.int64)
+
+    with pytest.raises(ValueError):
+        evaluate_sampled(metric_list=[coverage],
+                         test_interactions=test_implicit_interactions,
+                         model=model,
+                         negative_items=negative_items,
+                         verbose=False)
+
+    with pytest.raises(ValueError):
+        evaluate_sampled(metric_list=[mrr, lambda targets, user_ids, preds, k: 0],
+                         test_interactions=test_implicit_interactions,
+                         model=model,
+                         negative_items=negative_items,
+                         corrected=True,
+                         verbose=False)
+
+    with pytest.raises(ValueError):
+        evaluate_sampled(metric_list=[mrr],
+                         test_interactions=test_implicit_interactions,
+                         model=model,
+                         negative_items=negative_items[:5],
+                         verbose=False)
+
+
+def test_corrected_sampled_metric():
+    num_negative_samples = 10
+
+    def rank_auc(ranks, k, num_candidates):
+        return (num_candidates - ranks) / (num_candidates - 1)
+
+    corrected_auc = _corrected_sampled_metric(
+        rank_metric=rank_auc,
+        k=None,
+        num_negative_samples=num_negative_samples,
+        num_items=100_000,
+    )
+
+    # with a uniform prior, the probability of being outranked by a sampled negative item given
+    # ``r - 1`` of ``n`` higher-scoring negative items is ``Beta(r, n - r + 2)`` distributed
+    num_higher = np.arange(num_negative_samples + 1)
+    np.testing.assert_almost_equal(
+        corrected_auc.numpy(),
+        1 - (num_higher + 1) / (num_negative_samples + 2),
+        decimal=4,
+    )
+
+    corrected_hit_rate = _corrected_sampled_metric(
+        rank_metric=lambda ranks, k, num_candidates: (ranks <= k).double(),
+        k=10,
+        num_negative_samples=num_negative_samples,
+        num_items=100_000,
+    )
+
+    assert (corrected_hit_rate[1:] <= corrected_hit_rate[:-1]).all()
+    assert corrected_hit_rate[0] < 0.01
@@ -1,9 +1,12 @@
 from contextlib import suppress
 import copy
 from functools import partial
+import math
 import os
+from pathlib import Path
 from unittest import mock
 
+import numpy as np
 import pandas as pd
 import pytest
 import pytorch_lightning
@@ -12,11 +15,16 @@ from pytorch_lightning.utilities import rank_zero_only
 import torch
 from torch.optim.lr_scheduler import ReduceLROnPlateau, StepLR
 
-from collie_recs.interactions import HDF5InteractionsDataLoader
+from collie_recs.interactions import (ApproximateNegativeSamplingInteractionsDataLoader,
+                                      HDF5InteractionsDataLoader,
+                                      InteractionsDataLoader,
+                                      PrecomputedInteractionsDataLoader,
+                                      TensorInteractionsDataLoader)
 from collie_recs.loss import (adaptive_bpr_loss,
                               adaptive_hinge_loss,
                               bpr_loss,
                               hinge_loss,
+                              MetadataPartialCredit,
                               warp_loss)
 from collie_recs.metrics import evaluate_in_batches, mapk
 from collie_recs.model import (BasePipeline,
@@ -24,8 +32,15 @@ from collie_recs.model import (BasePipeline,
                                CollieTrainer,
                                DeepFM,
                                HybridPretrainedModel,
+                               LazyAdam,
                                MatrixFactorizationModel,
-                               NeuralCollaborativeFiltering)
+                               MultiOptimizer,
+                               NeuralCollaborativeFiltering,
+                               PhaseTimingCallback,
+                               QuantizedEmbedding,
+                               ScaledEmbedding)
+from collie_recs.model.base.trainer import _shard_dataloader
+from collie_recs.utils import StageProfiler
 
 
 def test_CollieTrainer_no_val_data(untrained_implicit_model_no_val_data):
@@ -65,6 +80,35 @@ def test_CollieTrainer_on_cpu(is_available_mock, untrained_implicit_model):
     assert trainer.gpus == 0
 
 
+def test_CollieTrainer_phase_timing_callback(train_val_implicit_sample_data, tmpdir):
+    train, val = train_val_implicit_sample_data
+    model = MatrixFactorizationModel(train=train, val=val)
+
+    logger = pytorch_lightning.loggers.CSVLogger(str(tmpdir))
+    timing_callback = PhaseTimingCallback(log_every_n_steps=1)
+    trainer = CollieTrainer(model=model,
+                            logger=logger,
+                            checkpoint_callback=False,
+                            callbacks=[timing_callback],
+                            max_epochs=2)
+    trainer.fit(model)
+
+    summary = timing_callback.timings.summary()
+
+    assert len(timing_callback.timings.epochs) == 2
+    assert summary['steps'] == 2 * len(model.train_loader)
+    assert summary['samples'] == 2 * model.train_loader.num_interactions
+    assert summary['forward_time'] > 0
+    assert summary['backward_time'] > 0
+
+    # the wrapped ``training_step`` should be removed once training ends
+    assert 'training_step' not in vars(model)
+
+    logged_metrics = pd.read_csv(os.path.join(logger.log_dir, 'metrics.csv'))
+    assert 'train_forward_time_step' in logged_metrics.columns
+    assert 'train_samples_per_second_epoch' in logged_metrics.columns
+
+
 def test_basepipeline_does_not_initialize(train_val_implicit_data):
     train, val = train_val_implicit_data
 
@@ -541,6 +585,253 @@ class TestCollieMinimalTrainer():
         out, _ = capfd.readouterr()
         assert out == ''
 
+    @pytest.mark.parametrize('model_class', [MatrixFactorizationModel,
+                                             NeuralCollaborativeFiltering])
+    def test_bfloat16_precision(self, train_val_implicit_sample_data, model_class):
+        train, val = train_val_implicit_sample_data
+
+        torch.manual_seed(42)
+        model_fp32 = model_class(train=train, val=val, lr_scheduler_func=None)
+        torch.manual_seed(42)
+        model_bf16 = model_class(train=train, val=val, lr_scheduler_func=None)
+
+        trainer_fp32 = CollieMinimalTrainer(model=model_fp32, max_epochs=2, verbosity=0)
+        trainer_fp32.fit(model_fp32)
+
+        trainer_bf16 = CollieMinimalTrainer(model=model_bf16,
+                                            max_epochs=2,
+                                            verbosity=0,
+                                            precision='bf16')
+        trainer_bf16.fit(model_bf16)
+
+        # master weights should still be kept in full precision
+        for parameter in model_bf16.parameters():
+            assert parameter.dtype == torch.float32
+
+        with trainer_bf16._autocast(model_bf16):
+            # only embedding tables are left in full precision
+            for module in model_bf16.modules():
+                expected_dtype = (
+                    torch.float32 if isinstance(module, torch.nn.Embedding) else torch.bfloat16
+                )
+                for parameter in module.parameters(recurse=False):
+                    assert parameter.dtype == expected_dtype
+
+            batch = next(iter(model_bf16.train_dataloader()))
+            assert model_bf16._calculate_loss(batch).dtype in (torch.float32, torch.bfloat16)
+
+        for parameter in model_bf16.parameters():
+            assert parameter.dtype == torch.float32
+
+        assert trainer_bf16.best_epoch_loss[1] == pytest.approx(trainer_fp32.best_epoch_loss[1],
+                                                                rel=0.05)
+
+    def test_bad_precision(self, untrained_implicit_model):
+        with pytest.raises(ValueError):
+            CollieMinimalTrainer(model=untrained_implicit_model, precision=64)
+
+        with pytest.raises(ValueError):
+            CollieMinimalTrainer(model=untrained_implicit_model, gpus=0, precision=16)
+
+    @pytest.mark.parametrize('data_loader_class', [
+        InteractionsDataLoader,
+        ApproximateNegativeSamplingInteractionsDataLoader,
+        TensorInteractionsDataLoader,
+    ])
+    def test_hogwild_training(self, train_val_implicit_sample_data, data_loader_class):
+        train, val = train_val_implicit_sample_data
+        # approximate negative sampling modifies ``interactions`` in-place
+        train_loader = data_loader_class(interactions=copy.deepcopy(train),
+                                         batch_size=128,
+                                         shuffle=True,
+                                         num_workers=0)
+        model = MatrixFactorizationModel(train=train_loader,
+                                         val=val,
+                                         optimizer='adagrad',
+                                         sparse=True,
+                                         lr=1e-2)
+        initial_item_embeddings = model.item_embeddings.weight.detach().clone()
+
+        trainer = CollieMinimalTrainer(model=model,
+                                       max_epochs=2,
+                                       gpus=0,
+                                       num_processes=2,
+                                       early_stopping_patience=None)
+        trainer.fit(model)
+
+        # updates made in the worker processes must be visible in the main process' model
+        assert model.item_embeddings.weight.is_shared()
+        assert not torch.equal(model.item_embeddings.weight.detach(), initial_item_embeddings)
+
+        assert model.hparams.num_epochs_completed == 2
+        assert trainer.train_steps == 2 * len(model.train_loader)
+        assert trainer._hogwild_workers == []
+
+        trainer_single_process = CollieMinimalTrainer(model=model,
+                                                      max_epochs=3,
+                                                      gpus=0,
+                                                      early_stopping_patience=None)
+        trainer_single_process.fit(model)
+        assert any(parameter.grad is not None for parameter in model.parameters())
+
+        # gradients left over from single process training must not be shared between workers
+        trainer_resumed = CollieMinimalTrainer(model=model,
+                                               max_epochs=4,
+                                               gpus=0,
+                                               num_processes=2,
+                                               early_stopping_patience=None)
+        trainer_resumed.fit(model)
+        assert all(parameter.grad is None for parameter in model.parameters())
+
+    def test_bad_num_processes(self, untrained_implicit_model):
+        with pytest.raises(ValueError):
+            CollieMinimalTrainer(model=untrained_implicit_model, gpus=0, num_processes=0)
+
+        with mock.patch('torch.cuda.is_available', return_value=True):
+            with pytest.raises(ValueError):
+                CollieMinimalTrainer(model=untrained_implicit_model, gpus=1, num_processes=2)
+
+    @pytest.mark.parametrize('data_loader_class', [
+        InteractionsDataLoader,
+        ApproximateNegativeSamplingInteractionsDataLoader,
+        TensorInteractionsDataLoader,
+    ])
+    def test_distributed_training(self, train_val_implicit_sample_data, data_loader_class):
+        train, val = train_val_implicit_sample_data
+        # approximate negative sampling modifies ``interactions`` in-place
+        train_loader = data_loader_class(interactions=copy.deepcopy(train),
+                                         batch_size=128,
+                                         shuffle=True,
+                                         num_workers=0)
+        model = MatrixFactorizationModel(train=train_loader,
+                                         val=val,
+                                         optimizer='adagrad',
+                                         sparse=True,
+                                         lr=1e-2)
+        initial_item_embeddings = model.item_embeddings.weight.detach().clone()
+
+        trainer = CollieMinimalTrainer(model=model,
+                                       max_epochs=2,
+                                       gpus=0,
+                                       num_processes=2,
+                                       strategy='ddp',
+                                       early_stopping_patience=None)
+        trainer.fit(model)
+
+        assert not torch.equal(model.item_embeddings.weight.detach(), initial_item_embeddings)
+        assert model.hparams.num_epochs_completed == 2
+
+        # every rank must take the same number of steps, or collective calls would deadlock
+        steps_per_rank = [
+            len(_shard_dataloader(train_loader, num_replicas=2, rank=rank)) for rank in range(2)
+        ]
+        assert steps_per_rank[0] == steps_per_rank[1] == math.ceil(len(train_loader) / 2)
+        assert trainer.train_steps == 2 * steps_per_rank[0]
+
+        # the trainer should be ready to train in a single process once done
+        assert not torch.distributed.is_initialized()
+        assert trainer.world_size == 1
+        assert trainer.train_dataloader is train_loader
+
+    def test_track_timings(self, train_val_implicit_sample_data):
+        train, val = train_val_implicit_sample_data
+        model = MatrixFactorizationModel(train=train, val=val)
+
+        logger = mock.MagicMock()
+        trainer = CollieMinimalTrainer(model=model,
+                                       max_epochs=2,
+                                       logger=logger,
+                                       log_every_n_steps=1,
+                                       track_timings=True)
+        trainer.fit(model)
+
+        summary = trainer.timings.summary()
+
+        assert len(trainer.timings.epochs) == 2
+        assert summary['steps'] == trainer.train_steps == 2 * len(model.train_loader)
+        assert summary['samples'] == 2 * model.train_loader.num_interactions
+        for phase in trainer.timings.PHASES:
+            assert summary[f'{phase}_time'] > 0
+        assert summary['total_time'] == pytest.approx(
+            sum(summary[f'{phase}_time'] for phase in trainer.timings.PHASES)
+        )
+        assert summary['samples_per_second'] == pytest.approx(
+            summary['samples'] / summary['total_time']
+        )
+
+        logged_metric_names = {
+            name for call in logger.log_metrics.call_args_list for name in call.kwargs['metrics']
+        }
+        assert 'train_data_time_step' in logged_metric_names
+        assert 'train_optimizer_step_time_epoch' in logged_metric_names
+        assert 'train_samples_per_second_epoch' in logged_metric_names
+
+    def test_timings_disabled_by_default(self, train_val_implicit_sample_data):
+        train, val = train_val_implicit_sample_data
+        model = MatrixFactorizationModel(train=train, val=val)
+        trainer = CollieMinimalTrainer(model=model, max_epochs=1)
+        trainer.fit(model)
+
+        assert trainer.timings.epochs == []
+        assert trainer.timings.last_step == {}
+        assert trainer.timings.summary()['steps'] == 0
+
+    def test_profile(self, train_val_implicit_sample_data, tmpdir):
+        train, val = train_val_implicit_sample_data
+        model = MatrixFactorizationModel(train=train, val=val)
+        trainer = CollieMinimalTrainer(model=model, max_epochs=1)
+        trainer.fit(model, profile={'output_dir': tmpdir, 'wait': 0, 'warmup': 1, 'active': 2})
+
+        trace_paths = sorted(Path(tmpdir).glob('trace_step_*.json'))
+        table_paths = sorted(Path(tmpdir).glob('top_operators_step_*.txt'))
+
+        assert len(trace_paths) == len(table_paths) == 1
+        trace = trace_paths[0].read_text()
+        for label in ['model_forward', 'loss', 'backward', 'optimizer_step']:
+            assert f'collie_recs.{label}' in trace
+        assert 'collie_recs.backward' in table_paths[0].read_text()
+        assert trainer.trace_profiler.profiler is None
+
+    def test_bad_profile(self, untrained_implicit_model, tmpdir):
+        trainer = CollieMinimalTrainer(model=untrained_implicit_model, max_epochs=1)
+        with pytest.raises(ValueError):
+            trainer.fit(untrained_implicit_model, profile=1)
+
+        trainer = CollieMinimalTrainer(model=untrained_implicit_model,
+                                       max_epochs=1,
+                                       num_processes=2)
+        with pytest.raises(ValueError):
+            trainer.fit(untrained_implicit_model, profile=str(tmpdir))
+
+    def test_precomputed_val_batches(self, train_val_implicit_sample_data):
+        train, val = train_val_implicit_sample_data
+        model = MatrixFactorizationModel(train=train,
+                                         val=PrecomputedInteractionsDataLoader(val),
+                                         dropout_p=0.0)
+        trainer = CollieMinimalTrainer(model=model, max_epochs=2, gpus=0)
+        trainer.fit(model)
+
+        model.eval()
+
+        # replaying the same negative samples makes the validation loss deterministic
+        assert trainer._val_loop_single_epoch(model) == trainer._val_loop_single_epoch(model)
+
+    def test_stage_profiler(self, train_val_implicit_sample_data):
+        train, val = train_val_implicit_sample_data
+        model = MatrixFactorizationModel(train=train, val=val)
+        stage_profiler = StageProfiler(trace_python_allocations=False, verbose=False)
+        trainer = CollieMinimalTrainer(model=model, max_epochs=2, stage_profiler=stage_profiler)
+        trainer.fit(model)
+
+        assert list(stage_profiler.stages) == [
+            'train_epoch_1', 'val_epoch_1', 'train_epoch_2', 'val_epoch_2'
+        ]
+        assert all(stage['peak_rss'] > 0 for stage in stage_profiler.stages.values())
+
+    def test_bad_strategy(self, untrained_implicit_model):
+        with pytest.raises(ValueError):
+            CollieMinimalTrainer(model=untrained_implicit_model, gpus=0, strategy='dp')
+
 
 def test_model_instantiation_no_train_data():
     with pytest.raises(TypeError):
@@ -556,12 +847,271 @@ def test_instantiation_of_sparse_model_with_weight_decay(train_val_implicit_data
                                        weight_decay=100)
     assert model_1.hparams.weight_decay == 100
 
+    # sparse embedding tables get no weight decay, but all other layers still do
+    with pytest.warns(UserWarning):
+        model_2 = NeuralCollaborativeFiltering(train=train,
+                                               val=val,
+                                               sparse=True,
+                                               optimizer='adagrad',
+                                               weight_decay=100,
+                                               lr_scheduler_func=None)
+    assert model_2.hparams.weight_decay == 100
+
+    # dense and sparse parameters share a single ``Adagrad`` optimizer with a group for each
+    dense_param_group, sparse_param_group = model_2.configure_optimizers().param_groups
+    embedding_weights = {
+        module.weight for module in model_2.modules() if isinstance(module, torch.nn.Embedding)
+    }
+    assert set(sparse_param_group['params']) == embedding_weights
+    assert dense_param_group['weight_decay'] == 100
+    assert sparse_param_group['weight_decay'] == 0
+
+    # ``adam`` optimizes sparse embeddings with ``LazyAdam``, which supports weight decay
+    model_3 = MatrixFactorizationModel(train=train,
+                                       val=val,
+                                       sparse=True,
+                                       optimizer='adam',
+                                       weight_decay=100)
+    assert model_3.hparams.weight_decay == 100
+
+    # callable optimizers are not split, so weight decay is disabled for the whole model
     with pytest.warns(UserWarning):
-        model_2 = MatrixFactorizationModel(train=train,
+        model_4 = MatrixFactorizationModel(train=train,
                                            val=val,
                                            sparse=True,
+                                           optimizer=torch.optim.SGD,
                                            weight_decay=100)
-    assert model_2.hparams.weight_decay == 0
+    assert model_4.hparams.weight_decay == 0
+
+
+def test_sparse_model_optimizers(train_val_implicit_sample_data):
+    train, val = train_val_implicit_sample_data
+
+    model = NeuralCollaborativeFiltering(train=train,
+                                         val=val,
+                                         sparse=True,
+                                         optimizer='adam',
+                                         weight_decay=1e-4,
+                                         lr_scheduler_func=None)
+    optimizer = model.configure_optimizers()
+
+    # the split optimizers are wrapped so Lightning only runs one training step per batch
+    assert isinstance(optimizer, MultiOptimizer)
+    assert isinstance(optimizer, torch.optim.Optimizer)
+
+    dense_optimizer, sparse_optimizer = optimizer.optimizers
+
+    assert type(dense_optimizer) is torch.optim.Adam
+    assert isinstance(sparse_optimizer, LazyAdam)
+    assert optimizer.param_groups == (
+        dense_optimizer.param_groups + sparse_optimizer.param_groups
+    )
+
+    dense_parameters = set(dense_optimizer.param_groups[0]['params'])
+    sparse_parameters = set(sparse_optimizer.param_groups[0]['params'])
+
+    assert dense_parameters.isdisjoint(sparse_parameters)
+    assert dense_parameters | sparse_parameters == set(model.parameters())
+    assert sparse_parameters == {
+        module.weight for module in model.modules() if isinstance(module, torch.nn.Embedding)
+    }
+    assert sparse_optimizer.param_groups[0]['weight_decay'] == 1e-4
+
+    trainer = CollieTrainer(model=model, logger=False, checkpoint_callback=False, max_steps=1)
+    trainer.fit(model)
+    assert not isinstance(model.optimizers(), list)
+
+    # the sparse split should compose with the bias optimizer split and learning rate schedulers
+    model = MatrixFactorizationModel(train=train,
+                                     val=val,
+                                     sparse=True,
+                                     optimizer='adam',
+                                     bias_optimizer='sgd',
+                                     lr_scheduler_func=partial(StepLR, step_size=1))
+    optimizers, lr_schedulers = model.configure_optimizers()
+
+    assert [type(optimizer) for optimizer in optimizers] == [LazyAdam, torch.optim.SGD]
+    assert len(lr_schedulers) == 2
+
+    trainer = CollieMinimalTrainer(model=model, max_epochs=1)
+    trainer.fit(model)
+
+    # callable optimizers still receive all model parameters
+    model = NeuralCollaborativeFiltering(train=train,
+                                         val=val,
+                                         sparse=True,
+                                         optimizer=torch.optim.Adagrad,
+                                         lr_scheduler_func=None)
+    optimizer = model.configure_optimizers()
+
+    assert set(optimizer.param_groups[0]['params']) == set(model.parameters())
+
+
+def test_multi_optimizer():
+    first_parameter = torch.nn.Parameter(torch.ones(2))
+    second_parameter = torch.nn.Parameter(torch.ones(3))
+    optimizer = MultiOptimizer([torch.optim.SGD([first_parameter], lr=1.0),
+                                torch.optim.Adagrad([second_parameter], lr=1.0)])
+    lr_scheduler = StepLR(optimizer, step_size=1, gamma=0.5)
+
+    closure_calls = []
+
+    def closure():
+        closure_calls.append(1)
+        optimizer.zero_grad()
+        loss = first_parameter.sum() + second_parameter.sum()
+        loss.backward()
+        return loss
+
+    assert optimizer.step(closure=closure).item() == 5
+    assert len(closure_calls) == 1
+    assert (first_parameter < 1).all() and (second_parameter < 1).all()
+
+    # learning rate schedulers update every wrapped optimizer's learning rate
+    lr_scheduler.step()
+    assert [optimizer.param_groups[0]['lr'] for optimizer in optimizer.optimizers] == [0.5, 0.5]
+
+    state_dict = optimizer.state_dict()
+    assert len(state_dict['optimizers']) == 2
+    optimizer.load_state_dict(state_dict)
+    assert second_parameter in optimizer.state
+
+    # new parameter groups are added to the first wrapped optimizer
+    third_parameter = torch.nn.Parameter(torch.ones(4))
+    optimizer.add_param_group({'params': [third_parameter], 'lr': 0.1})
+    assert optimizer.optimizers[0].param_groups[-1]['params'] == [third_parameter]
+    assert optimizer.param_groups[1]['params'] == [third_parameter]
+
+
+@pytest.mark.parametrize('model_class', [MatrixFactorizationModel, NeuralCollaborativeFiltering])
+@pytest.mark.parametrize('loss', ['adaptive_hinge', 'adaptive_bpr', 'warp'])
+def test_memory_efficient_loss(train_val_implicit_sample_data, model_class, loss):
+    train, val = train_val_implicit_sample_data
+
+    torch.manual_seed(42)
+    model = model_class(train=train, val=val, loss=loss, dropout_p=0.0)
+    ((users, pos_items), neg_items) = next(iter(model.train_dataloader()))
+
+    # score a single negative item far below every other item and use it for every negative
+    # sample of the first user, so that user has no ranking-violating negative items
+    no_violation_item = (pos_items[0] + 1) % train.num_items
+    neg_items[0] = no_violation_item
+    batch = ((users, pos_items), neg_items)
+
+    model_forward = model.forward
+
+    def forward_with_no_violation_item(users, items):
+        return model_forward(users, items) - 100 * (items == no_violation_item)
+
+    model.forward = forward_with_no_violation_item
+
+    def _loss_and_gradients(memory_efficient_loss):
+        model.hparams.memory_efficient_loss = memory_efficient_loss
+        model.zero_grad()
+
+        loss_value = model._calculate_loss(batch)
+        loss_value.backward()
+
+        return loss_value.item(), {
+            name: parameter.grad.clone()
+            for name, parameter in model.named_parameters()
+            if parameter.grad is not None
+        }
+
+    expected_loss, expected_gradients = _loss_and_gradients(memory_efficient_loss=False)
+    actual_loss, actual_gradients = _loss_and_gradients(memory_efficient_loss=True)
+
+    assert math.isfinite(expected_loss)
+    assert actual_loss == pytest.approx(expected_loss, rel=1e-4)
+    assert actual_gradients.keys() == expected_gradients.keys()
+    for name, gradient in expected_gradients.items():
+        torch.testing.assert_allclose(actual_gradients[name], gradient, rtol=1e-4, atol=1e-6)
+
+    # no selection is needed without gradients, e.g. in the validation loop
+    with torch.no_grad():
+        assert model._calculate_loss(batch).item() == pytest.approx(expected_loss, rel=1e-4)
+
+
+def test_metadata_for_loss_lookup(train_val_implicit_sample_data, tmpdir):
+    train, val = train_val_implicit_sample_data
+
+    torch.manual_seed(42)
+    metadata_for_loss = {'genre': torch.randint(3, size=(train.num_items,))}
+    metadata_for_loss_weights = {'genre': .4}
+
+    model = MatrixFactorizationModel(train=train,
+                                     val=val,
+                                     loss='warp',
+                                     metadata_for_loss=metadata_for_loss,
+                                     metadata_for_loss_weights=metadata_for_loss_weights)
+
+    assert isinstance(model.metadata_for_loss_lookup, MetadataPartialCredit)
+    # lookup buffers are rebuilt from ``hparams`` rather than saved with the model weights
+    assert not any('metadata_for_loss_lookup' in key for key in model.state_dict())
+
+    ((users, pos_items), neg_items) = next(iter(model.train_dataloader()))
+    pos_preds = model(users.long(), pos_items.long())
+    neg_preds = model(
+        users.long().repeat(neg_items.shape[1]), neg_items.transpose(0, 1).long().flatten()
+    ).view(neg_items.shape[1], len(users))
+
+    expected = warp_loss(pos_preds,
+                         neg_preds,
+                         num_items=train.num_items,
+                         positive_items=pos_items.long(),
+                         negative_items=neg_items.transpose(0, 1).long(),
+                         metadata=metadata_for_loss,
+                         metadata_weights=metadata_for_loss_weights)
+    actual = model._calculate_loss(((users, pos_items), neg_items))
+
+    assert actual.item() == pytest.approx(expected.item(), rel=1e-5)
+
+    save_model_path = os.path.join(str(tmpdir), 'test_metadata_for_loss_lookup.pth')
+    model.save_model(save_model_path)
+    loaded_model = MatrixFactorizationModel(load_model_path=save_model_path)
+
+    assert isinstance(loaded_model.metadata_for_loss_lookup, MetadataPartialCredit)
+    assert loaded_model.metadata_for_loss_lookup.codes.equal(model.metadata_for_loss_lookup.codes)
+
+
+def test_lazy_adam():
+    torch.manual_seed(42)
+
+    dense_weight = torch.nn.Parameter(torch.randn(10, 4))
+    sparse_weight = torch.nn.Parameter(dense_weight.detach().clone())
+
+    lazy_adam = LazyAdam([sparse_weight], lr=1e-1, weight_decay=1e-2)
+    adamw = torch.optim.AdamW([dense_weight], lr=1e-1, weight_decay=1e-2)
+
+    # when every row is in the batch, ``LazyAdam`` should match ``AdamW`` exactly
+    for _ in range(3):
+        grad = torch.randn(10, 4)
+        sparse_weight.grad = grad.to_sparse(sparse_dim=1)
+        dense_weight.grad = grad
+
+        lazy_adam.step()
+        adamw.step()
+
+        torch.testing.assert_allclose(sparse_weight, dense_weight)
+
+    # rows not in a sparse gradient should not be updated at all
+    weight_before = sparse_weight.detach().clone()
+    exp_avg_before = lazy_adam.state[sparse_weight]['exp_avg'].clone()
+
+    embeddings = torch.nn.Embedding(10, 4, sparse=True)
+    embeddings.weight = sparse_weight
+    sparse_weight.grad = None
+    embeddings(torch.tensor([1, 3, 3])).sum().backward()
+    lazy_adam.step()
+
+    untouched_rows = [0, 2, 4, 5, 6, 7, 8, 9]
+    torch.testing.assert_allclose(sparse_weight[untouched_rows], weight_before[untouched_rows])
+    torch.testing.assert_allclose(lazy_adam.state[sparse_weight]['exp_avg'][untouched_rows],
+                                  exp_avg_before[untouched_rows])
+    assert not torch.equal(sparse_weight[[1, 3]], weight_before[[1, 3]])
+
+    with pytest.raises(ValueError):
+        LazyAdam([sparse_weight], lr=-1)
 
 
 @pytest.mark.parametrize('model_type', ['with_lightning', 'no_lightning'])
@@ -670,6 +1220,21 @@ def test_different_item_metadata_types_for_hybrid_pretrained_model(implicit_mode
     assert model_2.item_metadata.equal(model_3.item_metadata)
 
 
+def test_save_model_only_on_rank_zero(implicit_model_no_lightning, tmpdir):
+    save_model_path = os.path.join(str(tmpdir), 'test_mf_model_save.pth')
+
+    with mock.patch('torch.distributed.is_initialized', return_value=True):
+        with mock.patch('torch.distributed.get_rank', return_value=1):
+            implicit_model_no_lightning.save_model(save_model_path)
+
+        assert not os.path.exists(save_model_path)
+
+        with mock.patch('torch.distributed.get_rank', return_value=0):
+            implicit_model_no_lightning.save_model(save_model_path)
+
+        assert os.path.exists(save_model_path)
+
+
 def test_loading_and_saving_implicit_model(implicit_model, untrained_implicit_model, tmpdir):
     expected = implicit_model.get_item_predictions(user_id=42, unseen_items_only=False)
 
@@ -690,6 +1255,81 @@ def test_loading_and_saving_implicit_model(implicit_model, untrained_implicit_mo
     assert not expected.equals(new_preds)
 
 
+@pytest.mark.parametrize('dtype', ['int8', 'float16'])
+def test_quantize_implicit_model(implicit_model_no_lightning, dtype, tmpdir):
+    quantized_model = implicit_model_no_lightning.quantize(dtype=dtype)
+
+    # the original model should be left untouched
+    assert isinstance(implicit_model_no_lightning.item_embeddings, ScaledEmbedding)
+    assert implicit_model_no_lightning.hparams.get('quantized_dtype') is None
+
+    assert isinstance(quantized_model.item_embeddings, QuantizedEmbedding)
+    assert isinstance(quantized_model.item_biases, QuantizedEmbedding)
+    assert quantized_model.state_dict()['item_embeddings.weight'].dtype == getattr(torch, dtype)
+    assert quantized_model.train_loader is implicit_model_no_lightning.train_loader
+
+    expected = implicit_model_no_lightning.get_item_predictions(user_id=42, sort_values=False)
+    actual = quantized_model.get_item_predictions(user_id=42, sort_values=False)
+
+    np.testing.assert_allclose(actual.values, expected.values, rtol=1e-2, atol=1e-2)
+
+    save_model_path = os.path.join(str(tmpdir), 'test_quantized_mf_model_save.pth')
+    quantized_model.save_model(save_model_path)
+    loaded_quantized_model = MatrixFactorizationModel(load_model_path=save_model_path)
+
+    assert isinstance(loaded_quantized_model.item_embeddings, QuantizedEmbedding)
+    assert actual.equals(
+        loaded_quantized_model.get_item_predictions(user_id=42, sort_values=False)
+    )
+
+
+@pytest.mark.parametrize('dtype', ['int8', 'float16'])
+def test_quantize_models(models_trained_for_one_step, dtype, tmpdir):
+    model = models_trained_for_one_step.cpu()
+    model.eval()
+
+    quantized_model = model.quantize(dtype=dtype)
+
+    # every embedding table, including those feeding MLP layers, should be quantized in the copy
+    embedding_names = [
+        name for name, module in model.named_modules() if isinstance(module, torch.nn.Embedding)
+    ]
+    assert len(embedding_names) > 0
+
+    quantized_modules = dict(quantized_model.named_modules())
+    for name in embedding_names:
+        assert isinstance(quantized_modules[name], QuantizedEmbedding)
+    assert not any(isinstance(module, torch.nn.Embedding) for module in quantized_model.modules())
+
+    expected = model.get_item_predictions(user_id=0, unseen_items_only=False, sort_values=False)
+    actual = quantized_model.get_item_predictions(user_id=0,
+                                                  unseen_items_only=False,
+                                                  sort_values=False)
+
+    np.testing.assert_allclose(actual.values, expected.values, rtol=1e-2, atol=5e-2)
+
+    save_model_path = os.path.join(str(tmpdir), 'test_quantized_model_save')
+    quantized_model.save_model(save_model_path)
+    loaded_quantized_model = type(model)(load_model_path=save_model_path)
+
+    assert any(
+        isinstance(module, QuantizedEmbedding) for module in loaded_quantized_model.modules()
+    )
+    assert actual.equals(
+        loaded_quantized_model.get_item_predictions(user_id=0,
+                                                    unseen_items_only=False,
+                                                    sort_values=False)
+    )
+
+
+def test_bad_quantize_implicit_model(implicit_model_no_lightning):
+    with pytest.raises(ValueError):
+        implicit_model_no_lightning.quantize(dtype='int4')
+
+    with pytest.raises(ValueError):
+        implicit_model_no_lightning.quantize(dtype='int8').quantize(dtype='int8')
+
+
 def test_loading_and_saving_hybrid_pretrained_model(implicit_model,
                                                     movielens_metadata_df,
                                                     train_val_implicit_data,
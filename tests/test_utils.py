@@ -1,4 +1,5 @@
 from unittest import mock
+import warnings
 
 import numpy as np
 import pandas as pd
@@ -10,6 +11,7 @@ from collie_recs.utils import (convert_to_implicit,
                                df_to_interactions,
                                get_init_arguments,
                                remove_users_with_fewer_than_n_interactions,
+                               StageProfiler,
                                Timer)
 
 
@@ -488,3 +490,60 @@ def test_time_since_start_custom_message(capsys):
 
     assert message == 'I am a test!: 1.00 min\n'
     assert actual == 1
+
+
+def test_stage_profiler_stage(capsys):
+    profiler = StageProfiler()
+
+    with profiler.stage('outer'):
+        with profiler.stage('inner'):
+            array = np.ones(1_000_000)
+        del array
+
+    out, _ = capsys.readouterr()
+    lines = out.splitlines()
+
+    assert lines[0].startswith('inner (')
+    assert lines[1].startswith('outer (')
+    assert list(profiler.stages) == ['inner', 'outer']
+
+    # the inner ``np.ones`` allocation is 8 MB, which should also count towards the outer stage
+    assert profiler.stages['inner']['peak_python'] >= 8_000_000
+    assert profiler.stages['outer']['peak_python'] >= profiler.stages['inner']['peak_python']
+    assert profiler.stages['outer']['peak_rss'] >= profiler.stages['inner']['peak_rss']
+    for stage in profiler.stages.values():
+        assert stage['peak_rss'] >= max(stage['start_rss'], stage['end_rss']) > 0
+        assert stage['time'] >= 0
+
+    summary = profiler.summary()
+
+    assert list(summary.index) == ['inner', 'outer']
+    assert summary.loc['inner', 'peak_python'] == profiler.stages['inner']['peak_python']
+
+
+def test_stage_profiler_wrap():
+    profiler = StageProfiler(trace_python_allocations=False, verbose=False)
+
+    def double(x):
+        return x * 2
+
+    assert profiler.wrap(double)(2) == 4
+    assert profiler.wrap(double, name='custom_name')(3) == 6
+
+    assert list(profiler.stages) == ['double', 'custom_name']
+    assert profiler.stages['double']['peak_python'] is None
+
+
+def test_stage_profiler_memory_budget():
+    profiler = StageProfiler(memory_budget=1, verbose=False)
+
+    with pytest.warns(ResourceWarning):
+        with profiler.stage('over_budget'):
+            pass
+
+    profiler = StageProfiler(memory_budget=1024 ** 5, verbose=False)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', ResourceWarning)
+        with profiler.stage('under_budget'):
+            pass